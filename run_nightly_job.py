@@ -20,7 +20,8 @@ def main():
     """Run the nightly job."""
     # Set up argument parser
     parser = argparse.ArgumentParser(description='Run the AWR nightly job')
-    parser.add_argument('--warehouse', '-w', type=int, help='Process only a specific warehouse ID')
+    parser.add_argument('--warehouse', '-w', type=str, help='Process only a specific warehouse ID')
+    parser.add_argument('--batch-size', type=int, help='Rows committed per transaction in bulk steps')
     parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
     
     args = parser.parse_args()
@@ -43,7 +44,7 @@ def main():
     
     try:
         # Run the nightly job
-        results = run_nightly_job(args.warehouse)
+        results = run_nightly_job(args.warehouse, batch_size=args.batch_size)
         
         # Print results
         if results.get('success', False):
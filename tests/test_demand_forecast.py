@@ -0,0 +1,29 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from warehouse_replenishment.core.demand_forecast import count_leading_zero_periods
+
+
+def test_count_leading_zero_periods_ragged_histories():
+    histories = [
+        np.array([0.0, 0.0, 5.0, 0.0]),
+        np.array([3.0, 0.0]),
+        np.array([0.0, 1.0, 0.0, 0.0, 2.0, 0.0])
+    ]
+    assert count_leading_zero_periods(histories).tolist() == [2, 0, 1]
+
+
+def test_count_leading_zero_periods_all_zero_history_counts_every_period():
+    histories = [np.zeros(4), np.array([0.0, 7.0])]
+    assert count_leading_zero_periods(histories).tolist() == [4, 1]
+
+
+def test_count_leading_zero_periods_single_period_histories():
+    histories = [np.array([0.0]), np.array([2.0])]
+    assert count_leading_zero_periods(histories).tolist() == [1, 0]
+
+
+def test_count_leading_zero_periods_no_histories():
+    assert count_leading_zero_periods([]).size == 0
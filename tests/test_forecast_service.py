@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sqlalchemy")
+
+from warehouse_replenishment.models import ForecastMethod, SystemClassCode
+from warehouse_replenishment.services.forecast_service import ForecastService
+
+
+def make_service():
+    service = ForecastService(mock.MagicMock())
+    service._company_settings = {
+        'basic_alpha_factor': 10.0,
+        'lumpy_demand_limit': 50.0,
+        'slow_mover_limit': 10.0,
+        'forecast_demand_limit': 0.0,
+        'update_frequency_impact_control': 2,
+        'forecasting_periodicity_default': 13
+    }
+    return service
+
+
+def make_item(item_id, demand_4weekly):
+    return SimpleNamespace(
+        id=item_id,
+        demand_4weekly=demand_4weekly,
+        freeze_until_date=None,
+        forecast_method=ForecastMethod.E3_REGULAR_AVS,
+        demand_profile=None,
+        system_class=SystemClassCode.REGULAR
+    )
+
+
+def test_reforecast_items_skips_missing_values():
+    service = make_service()
+    items = [make_item(1, 10.0), make_item(2, None), make_item(3, 10.0)]
+    demand_by_item = {
+        1: np.array([12.0, 8.0]),
+        2: np.array([12.0, 8.0]),
+        3: np.array([12.0, np.nan])
+    }
+    errors = []
+
+    reforecasted = service.reforecast_items(items, demand_by_item, errors=errors)
+
+    assert [item.id for item in reforecasted] == [1]
+    assert [error['item_id'] for error in errors] == [2, 3]
+    updates = service.session.bulk_update_mappings.call_args[0][1]
+    assert [update['id'] for update in updates] == [1]
+    assert not np.isnan(updates[0]['demand_4weekly'])
@@ -0,0 +1,40 @@
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("sqlalchemy")
+
+from warehouse_replenishment.services.item_service import ITEM_UPDATE_COLUMNS, ItemService
+
+
+def test_update_columns_exclude_primary_key_and_computed_columns():
+    assert 'id' not in ITEM_UPDATE_COLUMNS
+    assert 'available_balance' not in ITEM_UPDATE_COLUMNS
+    assert 'on_hand' in ITEM_UPDATE_COLUMNS
+
+
+def test_update_item_ignores_available_balance():
+    session = mock.MagicMock()
+    service = ItemService(session)
+
+    assert service.update_item(1, {'available_balance': 5.0})
+    session.execute.assert_not_called()
+
+    assert service.update_item(1, {'available_balance': 5.0, 'on_hand': 3.0})
+    statement = session.execute.call_args[0][0]
+    params = statement.compile().params
+    assert 'on_hand' in params
+    assert 'available_balance' not in params
+
+
+def test_current_balance_flushes_pending_stock_changes():
+    session = mock.MagicMock()
+    session.is_modified.return_value = True
+    item = session.query.return_value.get.return_value
+    item.available_balance = 10.0
+    item.quantity_held = 0.0
+
+    assert ItemService(session).get_current_balance(1) == 10.0
+    session.flush.assert_called_once_with()
+    session.refresh.assert_called_once_with(item, ['available_balance'])
@@ -0,0 +1,74 @@
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from warehouse_replenishment.models import (
+    DemandHistory, Order, OrderStatus, ORDER_STATUS_CODES, create_demand_history_partition
+)
+
+
+def test_demand_history_id_keeps_a_sequence_inside_composite_primary_key():
+    ddl = str(CreateTable(DemandHistory.__table__).compile(dialect=postgresql.dialect()))
+    assert 'id SERIAL NOT NULL' in ddl
+    assert 'PRIMARY KEY (id, period_year)' in ddl
+    assert 'PARTITION BY RANGE (period_year)' in ddl
+
+
+def fake_connection(scalars):
+    connection = mock.MagicMock()
+    results = iter(scalars)
+    connection.exec_driver_sql.side_effect = (
+        lambda sql: mock.MagicMock(scalar=mock.MagicMock(return_value=next(results, None)))
+    )
+    return connection
+
+
+def executed(connection):
+    return [call.args[0] for call in connection.exec_driver_sql.call_args_list]
+
+
+def test_partition_moves_rows_out_of_default_partition():
+    # partition missing, default exists, default holds rows for the year
+    connection = fake_connection([None, 'demand_history_default', True])
+    create_demand_history_partition(connection, 2024)
+
+    statements = executed(connection)[3:]
+    assert statements[0] == "ALTER TABLE demand_history DETACH PARTITION demand_history_default"
+    assert statements[1].startswith("CREATE TABLE demand_history_2024 PARTITION OF demand_history")
+    assert statements[2].startswith("INSERT INTO demand_history SELECT * FROM demand_history_default")
+    assert statements[3].startswith("DELETE FROM demand_history_default")
+    assert statements[4] == "ALTER TABLE demand_history ATTACH PARTITION demand_history_default DEFAULT"
+
+
+def test_partition_is_created_directly_when_default_has_no_rows():
+    connection = fake_connection([None, 'demand_history_default', False])
+    create_demand_history_partition(connection, 2024)
+
+    statements = executed(connection)[3:]
+    assert len(statements) == 1
+    assert statements[0].startswith("CREATE TABLE demand_history_2024 PARTITION OF demand_history")
+
+
+def test_existing_partition_is_left_alone():
+    connection = fake_connection(['demand_history_2024'])
+    create_demand_history_partition(connection, 2024)
+
+    assert len(executed(connection)) == 1
+
+
+def test_order_status_formats_as_plain_value():
+    assert f"{OrderStatus.OPEN}" == 'OPEN'
+    assert str(OrderStatus.ACCEPTED) == 'ACCEPTED'
+
+
+def test_order_status_type_round_trips_codes_and_reads_legacy_strings():
+    status_type = Order.__table__.c.status.type
+    code = status_type.process_bind_param('ACCEPTED', None)
+    assert code == ORDER_STATUS_CODES[OrderStatus.ACCEPTED]
+    assert status_type.process_result_value(code, None) is OrderStatus.ACCEPTED
+    assert status_type.process_result_value('RECEIVED', None) is OrderStatus.RECEIVED
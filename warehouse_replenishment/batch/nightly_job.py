@@ -1,5 +1,6 @@
 # warehouse_replenishment/batch/nightly_job.py
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional
 
@@ -13,7 +14,7 @@ from ..services.item_service import ItemService
 from ..exceptions import BatchProcessError
 from ..logging_setup import logger
 
-def update_stock_status(warehouse_id: Optional[int] = None) -> Dict:
+def update_stock_status(warehouse_id: Optional[str] = None) -> Dict:
     """Update stock status for all items in the specified warehouse.
     
     Args:
@@ -30,7 +31,7 @@ def update_stock_status(warehouse_id: Optional[int] = None) -> Dict:
     
     return results
 
-def calculate_lost_sales(warehouse_id: Optional[int] = None) -> Dict:
+def calculate_lost_sales(warehouse_id: Optional[str] = None) -> Dict:
     """Calculate lost sales for items in the specified warehouse.
     
     Args:
@@ -47,7 +48,7 @@ def calculate_lost_sales(warehouse_id: Optional[int] = None) -> Dict:
     
     return results
 
-def generate_orders(warehouse_id: Optional[int] = None) -> Dict:
+def generate_orders(warehouse_id: Optional[str] = None) -> Dict:
     """Generate orders for all vendors in the specified warehouse.
     
     Args:
@@ -96,21 +97,44 @@ def expire_deals() -> Dict:
     
     return results
 
-def purge_accepted_orders() -> Dict:
+def update_order_delays(warehouse_id: Optional[str] = None) -> Dict:
+    """Recalculate order delays for open orders that are not yet due.
+    
+    Args:
+        warehouse_id: Optional warehouse ID (if not provided, updates all warehouses)
+        
+    Returns:
+        Dictionary with update results
+    """
+    logger.info(f"Updating order delays for warehouse_id={warehouse_id}")
+    
+    with session_scope() as session:
+        order_service = OrderService(session)
+        results = order_service.update_order_delays(warehouse_id=warehouse_id)
+    
+    return results
+
+def purge_accepted_orders(batch_size: Optional[int] = None) -> Dict:
     """Purge accepted orders based on configuration.
     
+    Args:
+        batch_size: Optional number of orders committed per transaction
+        
     Returns:
         Dictionary with purge results
     """
     logger.info("Purging accepted orders")
     
+    if batch_size is None:
+        batch_size = config.batch_config['commit_batch_size']
+    
     with session_scope() as session:
         order_service = OrderService(session)
-        results = order_service.purge_accepted_orders()
+        results = order_service.purge_accepted_orders(batch_size=batch_size)
     
     return results
 
-def update_lead_time_forecasts(warehouse_id: Optional[int] = None) -> Dict:
+def update_lead_time_forecasts(warehouse_id: Optional[str] = None) -> Dict:
     """Update lead time forecasts for all vendors in the specified warehouse.
     
     Args:
@@ -144,7 +168,7 @@ def update_lead_time_forecasts(warehouse_id: Optional[int] = None) -> Dict:
         results = lead_time_service.update_lead_time_forecasts(warehouse_id=warehouse_id)
     
     return results
-def update_stock_status(warehouse_id: Optional[int] = None) -> Dict:
+def update_stock_status(warehouse_id: Optional[str] = None) -> Dict:
     """Update stock status for all items in the specified warehouse.
     
     Args:
@@ -161,7 +185,7 @@ def update_stock_status(warehouse_id: Optional[int] = None) -> Dict:
     
     return results
 
-def update_safety_stock(warehouse_id: Optional[int] = None) -> Dict:
+def update_safety_stock(warehouse_id: Optional[str] = None) -> Dict:
     """Update safety stock for all items in the specified warehouse.
     
     Args:
@@ -182,11 +206,104 @@ def update_safety_stock(warehouse_id: Optional[int] = None) -> Dict:
     
     return results
 
-def run_nightly_job(warehouse_id: Optional[int] = None) -> Dict:
+def _merge_process_results(total: Dict, partial: Dict) -> Dict:
+    """Merge one warehouse's process results into the combined results.
+    
+    Numeric counters are summed and lists are concatenated; any other value
+    is taken from the most recent warehouse.
+    
+    Args:
+        total: Combined results (updated in place)
+        partial: Results for a single warehouse
+        
+    Returns:
+        The combined results
+    """
+    for key, value in partial.items():
+        current = total.get(key)
+        if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                and isinstance(current, (int, float)) and not isinstance(current, bool)):
+            total[key] = current + value
+        elif isinstance(value, list) and isinstance(current, list):
+            total[key] = current + value
+        else:
+            total[key] = value
+    
+    return total
+
+def _run_warehouse_steps(steps: List, warehouse_id: Optional[str]) -> Dict:
+    """Run a sequence of per-warehouse steps for one warehouse.
+    
+    Args:
+        steps: List of (process name, step function) tuples
+        warehouse_id: Warehouse ID
+        
+    Returns:
+        Dictionary mapping process name to its results
+    """
+    return {name: step(warehouse_id) for name, step in steps}
+
+def _run_steps_for_warehouses(steps: List, warehouse_ids: List) -> Dict:
+    """Run per-warehouse steps for several warehouses concurrently.
+    
+    Each worker thread gets its own session through the scoped session
+    used by session_scope.
+    
+    Args:
+        steps: List of (process name, step function) tuples
+        warehouse_ids: Warehouse IDs to process
+        
+    Returns:
+        Dictionary mapping warehouse ID to its process results
+    """
+    if len(warehouse_ids) <= 1:
+        return {wid: _run_warehouse_steps(steps, wid) for wid in warehouse_ids}
+    
+    max_workers = min(config.batch_config['max_workers'], len(warehouse_ids))
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            wid: executor.submit(_run_warehouse_steps, steps, wid)
+            for wid in warehouse_ids
+        }
+        return {wid: future.result() for wid, future in futures.items()}
+
+def _run_steps(steps: List, warehouse_id: Optional[str], results: Dict) -> None:
+    """Run per-warehouse steps and record them in the job results.
+    
+    When no warehouse is given the steps fan out across all warehouses and the
+    per-warehouse results are merged into a single entry per process.
+    
+    Args:
+        steps: List of (process name, step function) tuples
+        warehouse_id: Optional warehouse ID
+        results: Job results (updated in place)
+    """
+    if warehouse_id is not None:
+        results['processes'].update(_run_warehouse_steps(steps, warehouse_id))
+        return
+    
+    with session_scope() as session:
+        warehouse_ids = [wid for (wid,) in session.query(Warehouse.warehouse_id)]
+    
+    warehouse_results = _run_steps_for_warehouses(steps, warehouse_ids)
+    
+    for wid, processes in warehouse_results.items():
+        results['warehouses'].setdefault(wid, {}).update(processes)
+        for name, process_result in processes.items():
+            _merge_process_results(
+                results['processes'].setdefault(name, {}), process_result
+            )
+
+def run_nightly_job(
+    warehouse_id: Optional[str] = None,
+    batch_size: Optional[int] = None
+) -> Dict:
     """Run the nightly job.
     
     Args:
         warehouse_id: Optional warehouse ID to process only a specific warehouse
+        batch_size: Optional number of rows committed per transaction in bulk steps
         
     Returns:
         Dictionary with job results
@@ -202,35 +319,40 @@ def run_nightly_job(warehouse_id: Optional[int] = None) -> Dict:
             'start_time': start_time,
             'end_time': None,
             'duration': None,
-            'processes': {}
+            'processes': {},
+            'warehouses': {}
         }
         
-        # Step 1: Update stock status
-        results['processes']['update_stock_status'] = update_stock_status(warehouse_id)
-        
-        # Step 2: Calculate lost sales
-        results['processes']['calculate_lost_sales'] = calculate_lost_sales(warehouse_id)
+        # Steps 1-3: Update stock status, calculate lost sales and
+        # update safety stock levels
+        _run_steps([
+            ('update_stock_status', update_stock_status),
+            ('calculate_lost_sales', calculate_lost_sales),
+            ('update_safety_stock', update_safety_stock)
+        ], warehouse_id, results)
         
-        # Step 3: Update safety stock levels
-        results['processes']['update_safety_stock'] = update_safety_stock(warehouse_id)
-        
-        # Step 4: Process time-based parameters
-        results['processes']['time_based_parameters'] = process_time_based_parameters()
-        
-        # Step 5: Expire deals
-        results['processes']['expire_deals'] = expire_deals()
+        # Steps 4-5: Process time-based parameters and expire deals; they are
+        # independent of each other so run them side by side
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            time_based_future = executor.submit(process_time_based_parameters)
+            expire_deals_future = executor.submit(expire_deals)
+            
+            results['processes']['time_based_parameters'] = time_based_future.result()
+            results['processes']['expire_deals'] = expire_deals_future.result()
         
         # Step 6: Update lead time forecasts (weekly)
         # Check if today is the lead time update day (typically once a week)
+        # Steps 7-8: Generate orders and update order delays for non-due orders
+        steps = []
         today = date.today()
         if today.weekday() == 0:  # Monday
-            results['processes']['lead_time_forecasts'] = update_lead_time_forecasts(warehouse_id)
-        
-        # Step 7: Generate orders
-        results['processes']['generate_orders'] = generate_orders(warehouse_id)
+            steps.append(('lead_time_forecasts', update_lead_time_forecasts))
+        steps.append(('generate_orders', generate_orders))
+        steps.append(('update_order_delays', update_order_delays))
+        _run_steps(steps, warehouse_id, results)
         
-        # Step 8: Purge accepted orders
-        results['processes']['purge_accepted_orders'] = purge_accepted_orders()
+        # Step 9: Purge accepted orders
+        results['processes']['purge_accepted_orders'] = purge_accepted_orders(batch_size)
         
         # Set end time and duration
         results['end_time'] = datetime.now()
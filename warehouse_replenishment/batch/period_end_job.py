@@ -1,5 +1,6 @@
 # warehouse_replenishment/batch/period_end_job.py
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional
 import sys
@@ -15,7 +16,10 @@ from sqlalchemy.orm import Session
 
 from warehouse_replenishment.config import config
 from warehouse_replenishment.db import session_scope
-from warehouse_replenishment.models import Company, Item, Warehouse
+from warehouse_replenishment.models import (
+    Company, Item, Warehouse, create_demand_history_partition,
+    demand_history_is_partitioned
+)
 from warehouse_replenishment.services.forecast_service import ForecastService
 from warehouse_replenishment.services.history_manager import HistoryManager
 from warehouse_replenishment.utils.date_utils import (
@@ -66,13 +70,22 @@ def process_all_warehouses() -> Dict:
     
     try:
         with session_scope() as session:
-            # Get all warehouses
-            warehouses = session.query(Warehouse).all()
-            results['total_warehouses'] = len(warehouses)
+            warehouse_ids = [wid for (wid,) in session.query(Warehouse.warehouse_id)]
+        results['total_warehouses'] = len(warehouse_ids)
+        
+        # Warehouses share no items, so they are processed concurrently, each
+        # worker thread getting its own session through session_scope.
+        # Archiving is company-wide and runs once alongside them.
+        max_workers = max(1, min(config.batch_config['max_workers'], len(warehouse_ids)))
+        
+        with ThreadPoolExecutor(max_workers=max_workers + 1) as executor:
+            archive_future = executor.submit(_archive_resolved_exceptions_job)
+            warehouse_futures = [
+                executor.submit(_process_warehouse_job, wid) for wid in warehouse_ids
+            ]
             
-            # Process each warehouse
-            for warehouse in warehouses:
-                warehouse_results = process_warehouse(warehouse.id, session)
+            for future in warehouse_futures:
+                warehouse_results = future.result()
                 
                 if warehouse_results.get('success', False):
                     results['processed_warehouses'] += 1
@@ -83,6 +96,8 @@ def process_all_warehouses() -> Dict:
                 results['processed_items'] += warehouse_results.get('processed_items', 0)
                 results['errors'] += warehouse_results.get('errors', 0)
                 results['history_exceptions'] += warehouse_results.get('history_exceptions', 0)
+            
+            results['errors'] += archive_future.result().get('errors', 0)
     
     except Exception as e:
         logger.error(f"Error during period-end processing: {str(e)}", exc_info=True)
@@ -94,12 +109,17 @@ def process_all_warehouses() -> Dict:
     
     return results
 
-def process_warehouse(warehouse_id: int, session: Optional[Session] = None) -> Dict:
+def process_warehouse(
+    warehouse_id: str,
+    session: Optional[Session] = None,
+    archive_exceptions: bool = True
+) -> Dict:
     """Process period-end for a specific warehouse.
     
     Args:
         warehouse_id: Warehouse ID
         session: Optional database session
+        archive_exceptions: Whether to also archive old resolved exceptions
         
     Returns:
         Dictionary with processing results
@@ -122,7 +142,17 @@ def process_warehouse(warehouse_id: int, session: Optional[Session] = None) -> D
         session = Session()
         close_session = True
     
+    # Archiving resolved exceptions does not depend on this period's
+    # forecasts, so run it alongside reforecasting in its own session. The
+    # worker thread is only started when there is archiving to do
+    executor = ThreadPoolExecutor(max_workers=1) if archive_exceptions else None
+    
     try:
+        archive_future = (
+            executor.submit(_archive_resolved_exceptions_job)
+            if executor is not None else None
+        )
+        
         # Reforecast all items
         reforecast_results = reforecast_items(warehouse_id, session)
         
@@ -131,7 +161,7 @@ def process_warehouse(warehouse_id: int, session: Optional[Session] = None) -> D
         results['processed_items'] = reforecast_results.get('processed', 0)
         results['errors'] += reforecast_results.get('errors', 0)
         
-        # Detect history exceptions
+        # Detect history exceptions (needs the new MADP/track values)
         exception_results = detect_history_exceptions(warehouse_id, session)
         
         # Update results
@@ -145,9 +175,10 @@ def process_warehouse(warehouse_id: int, session: Optional[Session] = None) -> D
         )
         results['errors'] += exception_results.get('errors', 0)
         
-        # Archive old resolved exceptions
-        archive_results = archive_resolved_exceptions(session)
-        results['errors'] += archive_results.get('errors', 0)
+        # Wait for the archive of old resolved exceptions
+        if archive_future is not None:
+            archive_results = archive_future.result()
+            results['errors'] += archive_results.get('errors', 0)
         
         results['success'] = True
     
@@ -156,6 +187,9 @@ def process_warehouse(warehouse_id: int, session: Optional[Session] = None) -> D
         results['errors'] += 1
     
     finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+        
         if close_session:
             session.close()
     
@@ -215,6 +249,53 @@ def archive_resolved_exceptions(session: Session) -> Dict:
     
     return results
 
+def _process_warehouse_job(warehouse_id: str) -> Dict:
+    """Process period-end for one warehouse in a dedicated session.
+    
+    Archiving is left to the caller, which runs it once for all warehouses.
+    
+    Args:
+        warehouse_id: Warehouse ID
+        
+    Returns:
+        Dictionary with processing results
+    """
+    with session_scope() as session:
+        return process_warehouse(warehouse_id, session, archive_exceptions=False)
+
+def _archive_resolved_exceptions_job() -> Dict:
+    """Archive old resolved history exceptions in a dedicated session.
+    
+    Returns:
+        Dictionary with archive results
+    """
+    with session_scope() as session:
+        return archive_resolved_exceptions(session)
+
+def ensure_demand_history_partitions(session: Session) -> None:
+    """Make sure demand history partitions exist for this year and next.
+    
+    Creating next year's partition ahead of time keeps new periods out of
+    the default partition, which would otherwise block adding it later.
+    
+    Args:
+        session: Database session
+    """
+    if session.get_bind().dialect.name != 'postgresql':
+        return
+    
+    connection = session.connection()
+    if not demand_history_is_partitioned(connection):
+        logger.warning(
+            "demand_history is not partitioned; skipping partition maintenance. "
+            "Run scripts/migrate_demand_history_partitions.py to convert it."
+        )
+        return
+    
+    current_year = date.today().year
+    for year in (current_year, current_year + 1):
+        create_demand_history_partition(connection, year)
+
 def run_period_end_job(warehouse_id: Optional[str] = None) -> Dict:
     """Run the period-end job.
     
@@ -241,6 +322,10 @@ def run_period_end_job(warehouse_id: Optional[str] = None) -> Dict:
         }
     
     try:
+        # Prepare history partitions before any period data is written
+        with session_scope() as session:
+            ensure_demand_history_partitions(session)
+        
         # Process all warehouses or a specific warehouse
         if warehouse_id is not None:
             with session_scope() as session:
@@ -12,7 +12,7 @@ parent_dir = str(Path(__file__).parent.parent.parent)
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
-from sqlalchemy import and_, func, or_
+from sqlalchemy import and_, func, or_, update
 from sqlalchemy.orm import Session
 
 from warehouse_replenishment.db import session_scope
@@ -22,6 +22,7 @@ from warehouse_replenishment.models import (
     BuyerClassCode, SystemClassCode
 )
 from warehouse_replenishment.exceptions import TimeBasedParameterError
+from warehouse_replenishment.core.demand_forecast import calculate_forecast_horizons
 
 def evaluate_expression(expression: str, item: Item = None, **variables) -> Any:
     """Evaluate a time-based parameter expression.
@@ -213,21 +214,14 @@ def process_parameter(
     
     try:
         # Handle different parameter types
-        if parameter.parameter_type == 'DEMAND_FORECAST':
-            process_demand_forecast_parameter(session, parameter, effective_date, results)
-        elif parameter.parameter_type == 'LEAD_TIME':
-            process_lead_time_parameter(session, parameter, effective_date, results)
-        elif parameter.parameter_type == 'SERVICE_LEVEL':
-            process_service_level_parameter(session, parameter, effective_date, results)
-        elif parameter.parameter_type == 'BUYER_CLASS':
-            process_buyer_class_parameter(session, parameter, effective_date, results)
-        elif parameter.parameter_type == 'PRICE_CHANGE':
-            process_price_change_parameter(session, parameter, effective_date, results)
-        else:
+        processor = PARAMETER_PROCESSORS.get(parameter.parameter_type)
+        if processor is None:
             # Unknown parameter type
             results['error'] = f"Unknown parameter type: {parameter.parameter_type}"
             return results
         
+        processor(session, parameter, effective_date, results)
+        
         # Set success flag if no errors
         if results['errors'] == 0:
             results['success'] = True
@@ -265,7 +259,9 @@ def get_items_for_parameter(
     
     # Otherwise, check if there's a buyer_id filter
     if parameter.buyer_id:
-        return session.query(Item).filter(Item.buyer_id == parameter.buyer_id).all()
+        return session.query(Item).join(Vendor, Item.vendor_id == Vendor.id).filter(
+            Vendor.buyer_id == parameter.buyer_id
+        ).all()
     
     # Parse expression as a filter if it contains filter syntax
     if ':' in parameter.expression:
@@ -323,6 +319,9 @@ def process_demand_forecast_parameter(
     items = get_items_for_parameter(session, parameter)
     results['affected_items'] = len(items)
     
+    # All items touched by this parameter share one forecast date
+    forecast_date = datetime.now()
+    
     # Process each item
     for item in items:
         try:
@@ -342,10 +341,11 @@ def process_demand_forecast_parameter(
             
             # Apply forecast changes
             item.demand_4weekly = item.demand_4weekly * multiplier
-            item.demand_weekly = item.demand_4weekly / 4
-            item.demand_monthly = item.demand_4weekly * (365/12) / (365/13)
-            item.demand_quarterly = item.demand_4weekly * 3
-            item.demand_yearly = item.demand_4weekly * 13
+            horizons = calculate_forecast_horizons(item.demand_4weekly)
+            item.demand_weekly = horizons['weekly']
+            item.demand_monthly = horizons['monthly']
+            item.demand_quarterly = horizons['quarterly']
+            item.demand_yearly = horizons['yearly']
             
             # Record the change in the parameter item
             param_item.changes = json.dumps({
@@ -356,7 +356,7 @@ def process_demand_forecast_parameter(
             })
             
             # Set forecast date
-            item.forecast_date = datetime.now()
+            item.forecast_date = forecast_date
             
             session.add(param_item)
             results['processed_items'] += 1
@@ -608,6 +608,10 @@ def process_buyer_class_parameter(
         results['errors'] += 1
         return
     
+    # Every item gets the same buyer class, so collect their IDs and apply
+    # it with a single UPDATE after the loop
+    updated_items = []
+    
     # Process each item
     for item in items:
         try:
@@ -622,8 +626,8 @@ def process_buyer_class_parameter(
             # Store original values for reference
             original_buyer_class = item.buyer_class.value if item.buyer_class else None
             
-            # Update buyer class
-            item.buyer_class = new_buyer_class
+            # Queue buyer class update
+            updated_items.append(item)
             
             # Record the change in the parameter item
             param_item.changes = json.dumps({
@@ -653,6 +657,19 @@ def process_buyer_class_parameter(
             session.add(param_item)
             
             results['errors'] += 1
+    
+    if updated_items:
+        session.execute(
+            update(Item)
+            .where(Item.id.in_([item.id for item in updated_items]))
+            .values(buyer_class=BuyerClassCode(new_buyer_class))
+            .execution_options(synchronize_session=False)
+        )
+        
+        # Reload the buyer class on next access so later parameters in this
+        # run see the new value
+        for item in updated_items:
+            session.expire(item, ['buyer_class'])
 
 def process_price_change_parameter(
     session: Session,
@@ -759,6 +776,15 @@ def process_price_change_parameter(
             
             results['errors'] += 1
 
+# Processor for each parameter type
+PARAMETER_PROCESSORS = {
+    'DEMAND_FORECAST': process_demand_forecast_parameter,
+    'LEAD_TIME': process_lead_time_parameter,
+    'SERVICE_LEVEL': process_service_level_parameter,
+    'BUYER_CLASS': process_buyer_class_parameter,
+    'PRICE_CHANGE': process_price_change_parameter
+}
+
 def run_time_based_parameters_job(
     effective_date: Optional[date] = None,
     parameter_id: Optional[int] = None
@@ -45,7 +45,11 @@ class Config:
             'database': 'warehouse_replenishment',
             'username': 'postgres',
             'password': 'postgres',
-            'echo': 'False'
+            'echo': 'False',
+            'pool_size': '10',
+            'max_overflow': '20',
+            'pool_pre_ping': 'True',
+            'pool_recycle': '1800'
         }
         
         self._config['LOGGING'] = {
@@ -54,7 +58,9 @@ class Config:
             'directory': 'logs',
             'max_size_mb': '10',
             'backup_count': '5',
-            'console_output': 'True'
+            'console_output': 'True',
+            'buffer_size_kb': '1024',
+            'flush_interval_seconds': '1.0'
         }
         
         self._config['BATCH_PROCESS'] = {
@@ -62,7 +68,8 @@ class Config:
             'weekly_update_day': '1',  # Monday
             'period_end_day': '28',   # 28th of month for monthly processing
             'max_workers': '4',
-            'timeout_minutes': '60'
+            'timeout_minutes': '60',
+            'commit_batch_size': '1000'
         }
         
         self._config['BUSINESS_RULES'] = {
@@ -136,7 +143,9 @@ class Config:
             'directory': self.get('LOGGING', 'directory', 'logs'),
             'max_size_mb': self.get_int('LOGGING', 'max_size_mb', 10),
             'backup_count': self.get_int('LOGGING', 'backup_count', 5),
-            'console_output': self.get_boolean('LOGGING', 'console_output', True)
+            'console_output': self.get_boolean('LOGGING', 'console_output', True),
+            'buffer_size_kb': self.get_int('LOGGING', 'buffer_size_kb', 1024),
+            'flush_interval_seconds': self.get_float('LOGGING', 'flush_interval_seconds', 1.0)
         }
     
     @property
@@ -147,7 +156,8 @@ class Config:
             'weekly_update_day': self.get_int('BATCH_PROCESS', 'weekly_update_day', 1),
             'period_end_day': self.get_int('BATCH_PROCESS', 'period_end_day', 28),
             'max_workers': self.get_int('BATCH_PROCESS', 'max_workers', 4),
-            'timeout_minutes': self.get_int('BATCH_PROCESS', 'timeout_minutes', 60)
+            'timeout_minutes': self.get_int('BATCH_PROCESS', 'timeout_minutes', 60),
+            'commit_batch_size': self.get_int('BATCH_PROCESS', 'commit_batch_size', 1000)
         }
     
     @property
@@ -1,11 +1,14 @@
 from .demand_forecast import (
     calculate_forecast, calculate_madp_from_history, 
-    calculate_track_from_history, apply_seasonality_to_forecast,
-    calculate_initial_forecast, calculate_regular_avs_forecast,
-    calculate_enhanced_avs_forecast, calculate_composite_line,
-    generate_seasonal_indices, detect_demand_spike,
+    calculate_track_from_history, calculate_madp_and_track,
+    calculate_madp_and_track_batch, apply_seasonality_to_forecast,
+    calculate_initial_forecast, recency_weights, calculate_regular_avs_forecast,
+    calculate_regular_avs_forecasts, calculate_forecast_horizons,
+    calculate_enhanced_avs_forecast, calculate_enhanced_avs_forecasts, calculate_composite_line,
+    generate_seasonal_indices, detect_demand_spike, detect_demand_spikes,
     detect_tracking_signal_exception, adjust_history_value,
     filter_history, calculate_lost_sales, calculate_expected_zero_periods,
+    calculate_expected_zero_periods_batch, count_leading_zero_periods,
     reforecast
 )
 from .safety_stock import calculate_safety_stock, calculate_service_level
@@ -16,18 +19,27 @@ __all__ = [
     'calculate_forecast',
     'calculate_madp_from_history',
     'calculate_track_from_history',
+    'calculate_madp_and_track',
+    'calculate_madp_and_track_batch',
     'apply_seasonality_to_forecast',
     'calculate_initial_forecast',
+    'recency_weights',
     'calculate_regular_avs_forecast',
+    'calculate_regular_avs_forecasts',
+    'calculate_forecast_horizons',
     'calculate_enhanced_avs_forecast',
+    'calculate_enhanced_avs_forecasts',
     'calculate_composite_line',
     'generate_seasonal_indices',
     'detect_demand_spike',
+    'detect_demand_spikes',
     'detect_tracking_signal_exception',
     'adjust_history_value',
     'filter_history',
     'calculate_lost_sales',
     'calculate_expected_zero_periods',
+    'calculate_expected_zero_periods_batch',
+    'count_leading_zero_periods',
     'reforecast',
     'calculate_safety_stock',
     'calculate_service_level',
@@ -3,6 +3,7 @@ import math
 from typing import List, Dict, Tuple, Optional, Union
 import numpy as np
 from scipy import stats
+from scipy.special import erf
 import sys
 import os
 from pathlib import Path
@@ -14,6 +15,25 @@ if parent_dir not in sys.path:
 
 from warehouse_replenishment.exceptions import ForecastError
 
+# Exponential recency weights exp(-0.1 * i), precomputed for typical history
+# lengths so weighted averages index a table instead of calling exp per period
+RECENCY_DECAY_RATE = 0.1
+_RECENCY_WEIGHTS = np.exp(-RECENCY_DECAY_RATE * np.arange(128))
+# recency_weights returns views of this table, so it must not be scaled in place
+_RECENCY_WEIGHTS.flags.writeable = False
+
+# Decay exp(-0.5 * i) applied to older years when building a composite line
+_YEAR_DECAY = np.exp(-0.5 * np.arange(16))
+
+# Forecast for each horizon as a multiple of the 4-weekly forecast
+# (13 four-week periods per year)
+FORECAST_HORIZON_FACTORS = {
+    'weekly': 1 / 4,
+    'monthly': (365 / 12) / (365 / 13),
+    'quarterly': 3,
+    'yearly': 13
+}
+
 def calculate_forecast(
     history: List[float], 
     periods: int = None, 
@@ -59,6 +79,20 @@ def calculate_forecast(
     
     return base_forecast
 
+def recency_weights(count: int) -> np.ndarray:
+    """Get exponential recency weights, most recent period first.
+    
+    Args:
+        count: Number of weights
+        
+    Returns:
+        Array of weights exp(-0.1 * i) for i in range(count)
+    """
+    if count <= len(_RECENCY_WEIGHTS):
+        return _RECENCY_WEIGHTS[:count]
+    
+    return np.exp(-RECENCY_DECAY_RATE * np.arange(count))
+
 def calculate_initial_forecast(history: List[float]) -> float:
     """Calculate initial forecast for a new item.
     
@@ -72,12 +106,12 @@ def calculate_initial_forecast(history: List[float]) -> float:
         return 0.0
     
     # Use exponential weighting to give more weight to recent history
-    weights = [math.exp(-0.1 * i) for i in range(len(history))]
-    weight_sum = sum(weights)
+    weights = recency_weights(len(history))
+    weight_sum = weights.sum()
     
     # Calculate weighted average
-    weighted_sum = sum(h * w for h, w in zip(history, weights))
-    forecast = weighted_sum / weight_sum if weight_sum > 0 else 0.0
+    weighted_sum = np.dot(np.asarray(history, dtype=np.float64), weights)
+    forecast = float(weighted_sum / weight_sum) if weight_sum > 0 else 0.0
     
     return forecast
 
@@ -91,27 +125,7 @@ def calculate_madp_from_history(forecast: float, history: List[float]) -> float:
     Returns:
         MADP value as percentage
     """
-    if not history:
-        return 0.0
-    
-    if forecast == 0:
-        # Avoid division by zero
-        if all(h == 0 for h in history):
-            return 0.0
-        else:
-            return 100.0
-    
-    # Calculate deviations
-    deviations = [abs(h - forecast) for h in history]
-    
-    # Calculate mean absolute deviation
-    mad = sum(deviations) / len(deviations)
-    
-    # Calculate MADP
-    madp = (mad / forecast) * 100.0
-    
-    # Limit to reasonable range
-    return min(100.0, max(0.0, madp))
+    return calculate_madp_and_track(forecast, history)[0]
 
 def calculate_track_from_history(forecast: float, history: List[float]) -> float:
     """Calculate tracking signal (track) from history.
@@ -123,33 +137,94 @@ def calculate_track_from_history(forecast: float, history: List[float]) -> float
     Returns:
         Track value as percentage
     """
-    if not history:
-        return 0.0
+    return calculate_madp_and_track(forecast, history)[1]
+
+def calculate_madp_and_track(forecast: float, history: List[float]) -> Tuple[float, float]:
+    """Calculate MADP and track from history in one vectorized pass.
+    
+    Args:
+        forecast: Forecast value
+        history: List of history values
+        
+    Returns:
+        Tuple of (MADP, track), both as percentages
+    """
+    if len(history) == 0:
+        return 0.0, 0.0
+    
+    values = np.asarray(history, dtype=np.float64)
     
     if forecast == 0:
         # Avoid division by zero
-        if all(h == 0 for h in history):
-            return 0.0
+        if not values.any():
+            return 0.0, 0.0
         else:
-            return 100.0
+            return 100.0, 100.0
     
-    # Calculate signed deviations
-    deviations = [(h - forecast) for h in history]
+    # Calculate signed and absolute deviations
+    deviations = values - forecast
+    sum_abs_deviations = np.abs(deviations).sum()
     
-    # Calculate sum of deviations (can be positive or negative)
-    sum_deviations = sum(deviations)
+    # Calculate MADP from the mean absolute deviation, limited to a reasonable range
+    mad = sum_abs_deviations / values.size
+    madp = min(100.0, max(0.0, float(mad / forecast) * 100.0))
     
-    # Calculate mean absolute deviation
-    mad = sum(abs(d) for d in deviations) / len(deviations)
+    if sum_abs_deviations == 0:
+        return madp, 0.0
     
-    if mad == 0:
-        return 0.0
+    # Track is the net deviation relative to the total absolute deviation,
+    # limited to 100%
+    track = min(100.0, abs(float(deviations.sum() / sum_abs_deviations)) * 100.0)
+    
+    return madp, track
+
+def calculate_madp_and_track_batch(
+    forecasts: np.ndarray,
+    histories: List[List[float]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Calculate MADP and track for many items at once.
     
-    # Calculate track
-    track = abs(sum_deviations / (len(deviations) * mad)) * 100.0
+    Vectorized equivalent of calculate_madp_and_track. Each item's forecast
+    is constant across its history, so deviations are taken against the
+    forecast broadcast over the item's segment of one flat history array and
+    summed per segment, without building a forecast list per item.
     
-    # Limit track to 100%
-    return min(100.0, track)
+    Args:
+        forecasts: Forecast value per item
+        histories: Non-empty list of history values per item
+        
+    Returns:
+        Tuple of (MADP array, track array), both as percentages
+    """
+    forecasts = np.asarray(forecasts, dtype=np.float64)
+    lengths = np.fromiter((len(history) for history in histories), dtype=np.intp, count=len(histories))
+    values = np.concatenate([np.asarray(history, dtype=np.float64) for history in histories])
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    
+    # Signed and absolute deviations summed per item
+    deviations = values - np.repeat(forecasts, lengths)
+    sum_abs_deviations = np.add.reduceat(np.abs(deviations), offsets)
+    sum_deviations = np.add.reduceat(deviations, offsets)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # MADP from the mean absolute deviation, limited to a reasonable range
+        madps = np.clip(sum_abs_deviations / lengths / forecasts * 100.0, 0.0, 100.0)
+        
+        # Track relative to the total absolute deviation, limited to 100%
+        tracks = np.where(
+            sum_abs_deviations > 0,
+            np.minimum(100.0, np.abs(sum_deviations / sum_abs_deviations) * 100.0),
+            0.0
+        )
+    
+    # Avoid division by zero: a zero forecast is 100% off unless there was no demand
+    zero_forecast = forecasts == 0
+    if zero_forecast.any():
+        has_demand = np.logical_or.reduceat(values != 0, offsets)
+        madps[zero_forecast] = np.where(has_demand[zero_forecast], 100.0, 0.0)
+        tracks[zero_forecast] = madps[zero_forecast]
+    
+    return madps, tracks
 
 def calculate_regular_avs_forecast(
     current_forecast: float,
@@ -185,6 +260,53 @@ def calculate_regular_avs_forecast(
     
     return max(0.0, new_forecast)
 
+def calculate_regular_avs_forecasts(
+    current_forecasts: np.ndarray,
+    latest_demands: np.ndarray,
+    tracks: np.ndarray,
+    alpha_factor: float = 10.0
+) -> np.ndarray:
+    """Calculate new forecasts for many items using E3 Regular AVS method.
+    
+    Vectorized equivalent of calculate_regular_avs_forecast.
+    
+    Args:
+        current_forecasts: Current forecast values
+        latest_demands: Latest demand values
+        tracks: Tracking signals as percentages
+        alpha_factor: Alpha factor for weighting
+        
+    Returns:
+        Array of new forecast values
+    """
+    # Convert track to decimal and apply alpha factor adjustment
+    alphas = np.asarray(tracks, dtype=np.float64) / 100.0
+    
+    if alpha_factor != 0:
+        alphas = alphas * (alpha_factor / 10.0)
+    
+    # Limit alpha between 0 and 1
+    alphas = np.clip(alphas, 0.0, 1.0)
+    
+    # Calculate new forecasts
+    new_forecasts = alphas * latest_demands + (1.0 - alphas) * current_forecasts
+    
+    return np.maximum(new_forecasts, 0.0)
+
+def calculate_forecast_horizons(forecast_4weekly):
+    """Derive weekly, monthly, quarterly and yearly forecasts from a 4-weekly forecast.
+    
+    Args:
+        forecast_4weekly: 4-weekly forecast value or array of values
+        
+    Returns:
+        Dictionary with weekly, monthly, quarterly and yearly forecasts
+    """
+    return {
+        horizon: forecast_4weekly * factor
+        for horizon, factor in FORECAST_HORIZON_FACTORS.items()
+    }
+
 def calculate_enhanced_avs_forecast(
     current_forecast: float,
     latest_demand: float,
@@ -234,6 +356,55 @@ def calculate_enhanced_avs_forecast(
     
     return new_forecast, False
 
+def calculate_enhanced_avs_forecasts(
+    current_forecasts: np.ndarray,
+    latest_demands: np.ndarray,
+    tracks: np.ndarray,
+    periods_with_zero_demand: np.ndarray,
+    expected_zero_periods: np.ndarray,
+    update_frequency_impact: int,
+    forecast_demand_limits: np.ndarray,
+    alpha_factor: float = 10.0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Calculate new forecasts for many items using E3 Enhanced AVS method.
+    
+    Vectorized equivalent of calculate_enhanced_avs_forecast.
+    
+    Args:
+        current_forecasts: Current forecast values
+        latest_demands: Latest demand values
+        tracks: Tracking signals as percentages
+        periods_with_zero_demand: Consecutive periods with zero demand per item
+        expected_zero_periods: Expected numbers of periods with zero demand
+        update_frequency_impact: Update frequency impact control
+        forecast_demand_limits: Forecast demand limit per item
+        alpha_factor: Alpha factor for weighting
+        
+    Returns:
+        Tuple with array of new forecast values and boolean mask of forced reforecasts
+    """
+    # Latest demand below the limit leaves the forecast unchanged unless
+    # enough zero-demand periods have passed to force a reforecast
+    below_limit = latest_demands < forecast_demand_limits
+    forced = below_limit & (periods_with_zero_demand >= expected_zero_periods * update_frequency_impact)
+    
+    # Regular forecast update (similar to regular AVS), only for items whose
+    # latest demand reached the limit; long-tail batches with no such item
+    # skip the update entirely
+    new_forecasts = np.array(current_forecasts, dtype=np.float64)
+    at_limit = ~below_limit
+    if at_limit.any():
+        new_forecasts[at_limit] = calculate_regular_avs_forecasts(
+            current_forecasts[at_limit], latest_demands[at_limit], tracks[at_limit], alpha_factor
+        )
+    
+    if forced.any():
+        # Decrease forecast based on time since last demand
+        time_factors = periods_with_zero_demand[forced] / update_frequency_impact
+        new_forecasts[forced] = current_forecasts[forced] / (1.0 + (0.5 * time_factors))
+    
+    return new_forecasts, forced
+
 def apply_seasonality_to_forecast(
     base_forecast: float,
     seasonal_indices: List[float],
@@ -293,42 +464,42 @@ def calculate_composite_line(
     first_year = sorted_years[0]
     periodicity = len(history_by_year[first_year])
     
-    # Initialize composite line
-    composite_line = [0.0] * periodicity
-    
     # Calculate weights for each year
-    weights = []
+    year_count = len(sorted_years)
+    weights = np.empty(year_count)
     remaining_weight = 1.0 - recent_weight
     
-    for i, year in enumerate(sorted_years):
-        if i == 0:
-            # Most recent year gets higher weight
-            weights.append(recent_weight)
+    # Most recent year gets higher weight
+    weights[0] = recent_weight
+    
+    # Distribute remaining weight exponentially, using the precomputed decay
+    if year_count > 1:
+        if year_count - 1 <= len(_YEAR_DECAY):
+            decay = _YEAR_DECAY[:year_count - 1]
         else:
-            # Distribute remaining weight exponentially
-            year_weight = remaining_weight * math.exp(-0.5 * (i - 1))
-            weights.append(year_weight)
+            decay = np.exp(-0.5 * np.arange(year_count - 1))
+        weights[1:] = remaining_weight * decay
     
     # Normalize weights
-    weight_sum = sum(weights)
+    weight_sum = weights.sum()
     if weight_sum > 0:
-        weights = [w / weight_sum for w in weights]
+        weights = weights / weight_sum
+    
+    # Lay the years out as rows; periods a year does not have carry no weight
+    values = np.zeros((year_count, periodicity))
+    valid_weights = np.zeros((year_count, periodicity))
+    for i, year in enumerate(sorted_years):
+        row = history_by_year[year][:periodicity]
+        values[i, :len(row)] = row
+        valid_weights[i, :len(row)] = weights[i]
     
     # Calculate composite line
-    for period in range(periodicity):
-        weighted_sum = 0.0
-        valid_weight_sum = 0.0
-        
-        for i, year in enumerate(sorted_years):
-            if period < len(history_by_year[year]):
-                value = history_by_year[year][period]
-                weighted_sum += value * weights[i]
-                valid_weight_sum += weights[i]
-        
-        if valid_weight_sum > 0:
-            composite_line[period] = weighted_sum / valid_weight_sum
+    weighted_sums = (values * valid_weights).sum(axis=0)
+    valid_weight_sums = valid_weights.sum(axis=0)
+    composite_line = np.zeros(periodicity)
+    np.divide(weighted_sums, valid_weight_sums, out=composite_line, where=valid_weight_sums > 0)
     
-    return composite_line
+    return composite_line.tolist()
 
 def generate_seasonal_indices(
     composite_line: List[float],
@@ -343,45 +514,34 @@ def generate_seasonal_indices(
     Returns:
         List of seasonal indices
     """
-    if not composite_line:
+    if not len(composite_line):
         return []
     
+    values = np.asarray(composite_line, dtype=np.float64)
+    
     # Calculate average
-    avg = sum(composite_line) / len(composite_line)
+    avg = values.mean()
     
     if avg == 0:
-        return [1.0] * len(composite_line)
+        return [1.0] * len(values)
     
     # Calculate initial indices
-    indices = [value / avg for value in composite_line]
+    indices = values / avg
     
-    # Apply smoothing if needed
+    # Apply smoothing if needed, using the circular neighbours of each period
     if smoothing_factor > 0:
-        smoothed_indices = []
-        n = len(indices)
-        
-        for i in range(n):
-            # Get adjacent indices (circular)
-            prev_idx = (i - 1) % n
-            next_idx = (i + 1) % n
-            
-            # Calculate smoothed value
-            smoothed = (
-                indices[i] * (1 - smoothing_factor) +
-                (indices[prev_idx] + indices[next_idx]) * (smoothing_factor / 2)
-            )
-            
-            smoothed_indices.append(smoothed)
-        
-        indices = smoothed_indices
+        indices = (
+            indices * (1 - smoothing_factor) +
+            (np.roll(indices, 1) + np.roll(indices, -1)) * (smoothing_factor / 2)
+        )
     
     # Ensure sum of indices * periods equals the number of periods
     # (i.e., average index is 1.0)
-    index_sum = sum(indices)
+    index_sum = indices.sum()
     if index_sum > 0:
-        indices = [idx * len(indices) / index_sum for idx in indices]
+        indices = indices * len(indices) / index_sum
     
-    return indices
+    return indices.tolist()
 
 def detect_demand_spike(
     forecast: float,
@@ -422,6 +582,43 @@ def detect_demand_spike(
     
     return None
 
+def detect_demand_spikes(
+    forecasts: np.ndarray,
+    actuals: np.ndarray,
+    madps: np.ndarray,
+    demand_filter_high: float,
+    demand_filter_low: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Detect demand spikes for many items at once.
+    
+    Vectorized equivalent of detect_demand_spike.
+    
+    Args:
+        forecasts: Forecast values
+        actuals: Actual demand values
+        madps: MADP values as percentages
+        demand_filter_high: Demand filter high value
+        demand_filter_low: Demand filter low value
+        
+    Returns:
+        Tuple of boolean masks (high, low)
+    """
+    zero_forecast = forecasts == 0
+    
+    # Convert MADP to absolute deviation
+    mad = (madps / 100.0) * forecasts
+    
+    with np.errstate(invalid='ignore'):
+        # A zero forecast is a high spike whenever there was any demand
+        high = np.where(zero_forecast, actuals > 0, actuals > forecasts + (mad * demand_filter_high))
+        low = (
+            ~zero_forecast & ~high &
+            (actuals < forecasts - (mad * demand_filter_low)) &
+            (actuals < forecasts)
+        )
+    
+    return high, low
+
 def detect_tracking_signal_exception(
     track: float,
     tracking_signal_limit: float
@@ -568,6 +765,64 @@ def calculate_expected_zero_periods(
     # Expected number of periods with zero demand in a year (12 periods)
     return prob_zero * 12
 
+def calculate_expected_zero_periods_batch(
+    forecasts: np.ndarray,
+    madps: np.ndarray
+) -> np.ndarray:
+    """Calculate expected number of periods with zero demand for many items.
+    
+    Vectorized equivalent of calculate_expected_zero_periods.
+    
+    Args:
+        forecasts: Forecast values
+        madps: MADP values as percentages
+        
+    Returns:
+        Array of expected numbers of periods with zero demand
+    """
+    # Convert MADP to standard deviation
+    std_devs = madps / 100.0 * forecasts * 1.25
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z_scores = np.where(std_devs > 0, forecasts / std_devs, np.inf)
+        
+        # Probability of zero demand, using normal distribution approximation
+        prob_zero = np.clip(1 - erf(z_scores / math.sqrt(2)) / 2, 0, 1)
+        
+        # Very small probability of zero demand beyond six standard deviations
+        expected = np.where(z_scores > 6, 0.0, prob_zero * 12)
+    
+    # Assume all periods will be zero without a positive forecast
+    return np.where(forecasts <= 0, 12.0, expected)
+
+def count_leading_zero_periods(histories: List[List[float]]) -> np.ndarray:
+    """Count consecutive zero-demand periods at the start of each history.
+    
+    With histories ordered newest first this is the number of periods since
+    each item last had demand. The first non-zero position is found per item
+    with a segmented minimum over one flat array instead of a Python loop.
+    
+    Args:
+        histories: History values per item, each non-empty
+        
+    Returns:
+        Array with the count of leading zero periods per item
+    """
+    if not histories:
+        return np.zeros(0, dtype=np.intp)
+    
+    lengths = np.fromiter((len(history) for history in histories), dtype=np.intp, count=len(histories))
+    values = np.concatenate([np.asarray(history, dtype=np.float64) for history in histories])
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    
+    # Position within its own history of every value; positions holding
+    # zero are replaced by the history length so all-zero histories count
+    # every period
+    positions = np.arange(values.size) - np.repeat(offsets, lengths)
+    first_nonzero = np.where(values != 0, positions, np.repeat(lengths, lengths))
+    
+    return np.minimum.reduceat(first_nonzero, offsets)
+
 def reforecast(
     current_forecast: float,
     latest_demand: float,
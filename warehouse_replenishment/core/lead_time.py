@@ -6,7 +6,7 @@ import os
 
 from typing import Dict, List, Tuple, Optional, Union
 import numpy as np
-from scipy import stats
+from scipy.special import ndtri
 
 # Add the parent directory to the path so we can import our modules
 parent_dir = str(Path(__file__).parent.parent.parent)
@@ -14,6 +14,8 @@ if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 from warehouse_replenishment.exceptions import ForecastError
+from warehouse_replenishment.core.safety_stock import service_level_z_score
+from warehouse_replenishment.core.demand_forecast import recency_weights
 
 def forecast_lead_time(
     historical_lead_times: List[float],
@@ -34,7 +36,7 @@ def forecast_lead_time(
         return current_lead_time
     
     # Use weighted average, giving more weight to recent lead times
-    weights = [math.exp(-0.1 * i) for i in range(len(historical_lead_times))]
+    weights = recency_weights(len(historical_lead_times))
     
     # Calculate weighted average
     weighted_avg = np.average(historical_lead_times, weights=weights)
@@ -54,6 +56,22 @@ def forecast_lead_time(
     
     return round(weighted_avg, 1)
 
+def _mean_and_std(values: np.ndarray) -> Tuple[float, float]:
+    """Calculate the mean and population standard deviation of an array.
+    
+    The mean is computed once and reused for the deviations, instead of
+    separate np.mean and np.std calls each reducing the data again.
+    
+    Args:
+        values: Non-empty array of values
+        
+    Returns:
+        Tuple of (mean, standard deviation)
+    """
+    mean = values.mean()
+    deviations = values - mean
+    return float(mean), math.sqrt(np.dot(deviations, deviations) / values.size)
+
 def calculate_variance(
     historical_lead_times: List[float]
 ) -> float:
@@ -68,12 +86,13 @@ def calculate_variance(
     if not historical_lead_times or len(historical_lead_times) < 2:
         return 0.0
     
-    # Calculate variance
-    variance = np.var(historical_lead_times)
-    mean = np.mean(historical_lead_times)
+    # Convert once and derive the mean and standard deviation from the
+    # same array
+    lead_times = np.asarray(historical_lead_times, dtype=np.float64)
+    mean, std_dev = _mean_and_std(lead_times)
     
     # Convert to percentage
-    variance_percentage = (math.sqrt(variance) / mean) * 100
+    variance_percentage = (std_dev / mean) * 100
     
     return round(variance_percentage, 2)
 
@@ -98,14 +117,14 @@ def detect_lead_time_anomalies(
     anomalies = []
     
     # Calculate mean and standard deviation
-    mean = np.mean(historical_lead_times)
-    std_dev = np.std(historical_lead_times)
+    lead_times = np.asarray(historical_lead_times, dtype=np.float64)
+    mean, std_dev = _mean_and_std(lead_times)
     
     # Calculate z-score for current lead time
     z_score = abs(current_lead_time - mean) / std_dev if std_dev > 0 else 0
     
     # Get critical z-value for confidence level
-    critical_z = stats.norm.ppf((1 + confidence_level) / 2)
+    critical_z = ndtri((1 + confidence_level) / 2)
     
     # Check if current lead time is an outlier
     if z_score > critical_z:
@@ -118,8 +137,8 @@ def detect_lead_time_anomalies(
         })
     
     # Detect significant changes in lead time trend
-    if len(historical_lead_times) > 2:
-        trend_slope, _ = np.polyfit(range(len(historical_lead_times)), historical_lead_times, 1)
+    if len(lead_times) > 2:
+        trend_slope, _ = np.polyfit(np.arange(len(lead_times)), lead_times, 1)
         
         if abs(trend_slope) > std_dev / 2:
             anomalies.append({
@@ -147,7 +166,7 @@ def calculate_safety_stock_adjustment(
     """
     try:
         # Convert service level to Z-score
-        z_score = stats.norm.ppf(service_level / 100.0)
+        z_score = service_level_z_score(service_level)
         
         # Variance adjustment factor
         # Higher variance requires more safety stock
@@ -213,8 +232,9 @@ def evaluate_lead_time_reliability(
         }
     
     # Calculate metrics
-    mean_actual_lt = np.mean(actual_lead_times)
-    std_dev_lt = np.std(actual_lead_times)
+    mean_actual_lt, std_dev_lt = _mean_and_std(
+        np.asarray(actual_lead_times, dtype=np.float64)
+    )
     
     # Deviation from expected lead time
     deviation_pct = abs(mean_actual_lt - expected_lead_time) / expected_lead_time * 100
@@ -1,8 +1,9 @@
 # warehouse_replenishment/core/safety_stock.py
 import math
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional, Union
 import numpy as np
-from scipy import stats
+from scipy.special import ndtr, ndtri
 import sys
 import os
 from pathlib import Path
@@ -14,6 +15,22 @@ if parent_dir not in sys.path:
 
 from warehouse_replenishment.exceptions import SafetyStockError
 
+@lru_cache(maxsize=256)
+def service_level_z_score(service_level: float) -> float:
+    """Convert a service level percentage to a standard normal Z-score.
+    
+    Uses the ndtri ufunc rather than scipy.stats.norm.ppf, which spends most
+    of its time validating arguments. Results are cached because only a
+    handful of distinct service levels are used across all items.
+    
+    Args:
+        service_level: Service level as percentage (e.g., 95.0)
+        
+    Returns:
+        Z-score for the service level
+    """
+    return float(ndtri(service_level / 100.0))
+
 def calculate_safety_stock(
     service_level_goal: float,
     madp: float,
@@ -36,7 +53,7 @@ def calculate_safety_stock(
     try:
         # Convert service level goal to Z-score
         # For example, 95% service level = 1.645 standard deviations
-        z_score = stats.norm.ppf(service_level_goal / 100.0)
+        z_score = service_level_z_score(service_level_goal)
         
         # Convert MADP to standard deviation
         # MADP is Mean Absolute Deviation as a Percentage
@@ -117,7 +134,7 @@ def calculate_service_level(
         z_score = safety_stock_days / denominator
         
         # Convert Z-score to service level
-        service_level = stats.norm.cdf(z_score) * 100.0
+        service_level = float(ndtr(z_score)) * 100.0
         
         return min(100.0, service_level)
         
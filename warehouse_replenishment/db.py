@@ -47,7 +47,14 @@ class Database:
             connection_string = config.get_db_url()
         
         echo = config.get_boolean('DATABASE', 'echo', False)
-        self._engine = create_engine(connection_string, echo=echo)
+        self._engine = create_engine(
+            connection_string,
+            echo=echo,
+            pool_size=config.get_int('DATABASE', 'pool_size', 10),
+            max_overflow=config.get_int('DATABASE', 'max_overflow', 20),
+            pool_pre_ping=config.get_boolean('DATABASE', 'pool_pre_ping', True),
+            pool_recycle=config.get_int('DATABASE', 'pool_recycle', 1800)
+        )
         self._session_factory = sessionmaker(bind=self._engine)
         self._session = scoped_session(self._session_factory)
     
@@ -86,7 +93,8 @@ class Database:
             session.rollback()
             raise e
         finally:
-            session.close()
+            # Close the thread-local session and return its connection to the pool
+            self._session.remove()
     
     def execute_raw_sql(self, sql, params=None):
         """Execute raw SQL query.
@@ -16,12 +16,12 @@ if parent_dir not in sys.path:
 from warehouse_replenishment.config import config
 from warehouse_replenishment.db import db, session_scope
 from warehouse_replenishment.logging_setup import get_logger
-from warehouse_replenishment.models import Item, BuyerClassCode, ForecastMethod
+from warehouse_replenishment.models import Item, Vendor, BuyerClassCode, ForecastMethod
 from warehouse_replenishment.services.forecast_service import ForecastService
 from warehouse_replenishment.utils.date_utils import get_current_period, get_previous_period
 from warehouse_replenishment.core.demand_forecast import (
-    calculate_forecast, calculate_madp_from_history,
-    calculate_track_from_history, apply_seasonality_to_forecast
+    calculate_forecast, calculate_madp_and_track, apply_seasonality_to_forecast,
+    calculate_forecast_horizons
 )
 
 def setup_logging():
@@ -95,14 +95,17 @@ def run_forecast(
             query = session.query(Item)
             
             # Apply filters
-            if warehouse_id:
+            if warehouse_id is not None:
                 query = query.filter(Item.warehouse_id == warehouse_id)
                 
             if vendor_id:
                 query = query.filter(Item.vendor_id == vendor_id)
                 
             if buyer_id:
-                query = query.filter(Item.buyer_id == buyer_id)
+                # Buyers are assigned at vendor level
+                query = query.join(Vendor, Item.vendor_id == Vendor.id).filter(
+                    Vendor.buyer_id == buyer_id
+                )
                 
             if item_id:
                 if isinstance(item_id, int):
@@ -143,14 +146,16 @@ def run_forecast(
                 'error_items': []
             }
             
+            # Load history and seasonal profiles for all items up front
+            history_by_item = forecast_service.prefetch_forecasting_context(
+                items, periods=periods
+            )
+            
             # Process each item
             for item in items:
                 try:
                     # Get item history
-                    history_data = forecast_service.get_item_demand_history(
-                        item.id, 
-                        periods=periods
-                    )
+                    history_data = history_by_item.get(item.id)
                     
                     if not history_data:
                         logger.warning(f"No history data for item {item.item_id}")
@@ -181,8 +186,7 @@ def run_forecast(
                     
                     # Calculate MADP and track if requested
                     if recalculate_madp:
-                        madp = calculate_madp_from_history(base_forecast, history_values)
-                        track = calculate_track_from_history(base_forecast, history_values)
+                        madp, track = calculate_madp_and_track(base_forecast, history_values)
                     else:
                         madp = item.madp
                         track = item.track
@@ -202,10 +206,11 @@ def run_forecast(
                         )
                     
                     # Calculate derived forecasts
-                    weekly_forecast = final_forecast / 4
-                    monthly_forecast = final_forecast * (365/12) / (365/13)
-                    quarterly_forecast = final_forecast * 3
-                    yearly_forecast = final_forecast * 13
+                    horizons = calculate_forecast_horizons(final_forecast)
+                    weekly_forecast = horizons['weekly']
+                    monthly_forecast = horizons['monthly']
+                    quarterly_forecast = horizons['quarterly']
+                    yearly_forecast = horizons['yearly']
                     
                     if verbose:
                         logger.info(f"Item: {item.item_id} ({item.description})")
@@ -321,14 +326,17 @@ def run_period_end_reforecasting(
             query = session.query(Item)
             
             # Apply filters
-            if warehouse_id:
+            if warehouse_id is not None:
                 query = query.filter(Item.warehouse_id == warehouse_id)
                 
             if vendor_id:
                 query = query.filter(Item.vendor_id == vendor_id)
                 
             if buyer_id:
-                query = query.filter(Item.buyer_id == buyer_id)
+                # Buyers are assigned at vendor level
+                query = query.join(Vendor, Item.vendor_id == Vendor.id).filter(
+                    Vendor.buyer_id == buyer_id
+                )
             
             # Only include active items
             query = query.filter(Item.buyer_class.in_([BuyerClassCode.REGULAR, BuyerClassCode.WATCH]))
@@ -1,6 +1,9 @@
 import os
+import atexit
 import logging
 import logging.handlers
+import queue
+import threading
 from pathlib import Path
 import time
 import traceback
@@ -8,11 +11,60 @@ from datetime import datetime
 
 from warehouse_replenishment.config import config
 
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler that coalesces writes in a large user-space buffer.
+    
+    Records are written without a per-record flush; the buffer is flushed when
+    full, on rollover, by the periodic flusher and on shutdown.
+    """
+    
+    def __init__(self, filename, buffer_size=1024 * 1024, **kwargs):
+        """Initialize the handler.
+        
+        Args:
+            filename: Log file path
+            buffer_size: Size of the write buffer in bytes
+            **kwargs: Arguments passed to RotatingFileHandler
+        """
+        self.buffer_size = buffer_size
+        self._size = 0
+        super().__init__(filename, **kwargs)
+    
+    def _open(self):
+        """Open the log file with a large write buffer."""
+        stream = open(
+            self.baseFilename, self.mode, buffering=self.buffer_size,
+            encoding=self.encoding, errors=self.errors
+        )
+        self._size = os.path.getsize(self.baseFilename)
+        return stream
+    
+    def emit(self, record):
+        """Write the record to the buffer, rolling the file over when full.
+        
+        The size is tracked locally so the rollover check does not force a
+        seek (and with it a flush) on every record.
+        """
+        try:
+            msg = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self._size + len(msg) >= self.maxBytes:
+                self.doRollover()
+            self.stream.write(msg)
+            self._size += len(msg)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
 class Logger:
     """Logging manager for the Warehouse Replenishment System."""
     
     _instance = None
     _loggers = {}
+    _listeners = []
+    _buffered_handlers = []
     
     def __new__(cls):
         """Singleton pattern implementation."""
@@ -36,6 +88,16 @@ class Logger:
         # Set up global logging configuration
         self._configure_root_logger()
         
+        # Periodically flush buffered log files
+        self._flush_stop = threading.Event()
+        self._flush_thread = threading.Thread(
+            target=self._flush_periodically, name='log-flusher', daemon=True
+        )
+        self._flush_thread.start()
+        
+        # Drain queued records to their handlers on interpreter exit
+        atexit.register(self.shutdown)
+        
         # Application logger
         self._app_logger = self.get_logger('app')
         
@@ -58,7 +120,42 @@ class Logger:
         if self._log_config['console_output']:
             console_handler = logging.StreamHandler()
             console_handler.setFormatter(logging.Formatter(self._log_config['format']))
-            root_logger.addHandler(console_handler)
+            root_logger.addHandler(self._queue_handler(console_handler))
+    
+    def _queue_handler(self, *handlers):
+        """Wrap handlers behind a queue serviced by a background listener.
+        
+        Logging calls only enqueue the record; the listener thread does the
+        formatting and the blocking write.
+        
+        Args:
+            handlers: Handlers that should receive the records
+            
+        Returns:
+            QueueHandler feeding the listener
+        """
+        log_queue = queue.Queue(-1)
+        listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        listener.start()
+        self._listeners.append(listener)
+        return logging.handlers.QueueHandler(log_queue)
+    
+    def _flush_periodically(self):
+        """Flush buffered file handlers at the configured interval."""
+        interval = self._log_config['flush_interval_seconds']
+        while not self._flush_stop.wait(interval):
+            for handler in list(self._buffered_handlers):
+                handler.flush()
+    
+    def shutdown(self):
+        """Stop the background listeners, flushing any queued records."""
+        self._flush_stop.set()
+        while self._listeners:
+            self._listeners.pop().stop()
+        for handler in self._buffered_handlers:
+            handler.flush()
     
     def get_logger(self, name):
         """Get a logger with the specified name.
@@ -82,13 +179,15 @@ class Logger:
         
         # Create log file handler with rotation
         log_file = self._log_dir / f"{name}.log"
-        file_handler = logging.handlers.RotatingFileHandler(
+        file_handler = BufferedRotatingFileHandler(
             log_file,
+            buffer_size=self._log_config['buffer_size_kb'] * 1024,
             maxBytes=self._log_config['max_size_mb'] * 1024 * 1024,
             backupCount=self._log_config['backup_count']
         )
         file_handler.setFormatter(logging.Formatter(self._log_config['format']))
-        logger.addHandler(file_handler)
+        self._buffered_handlers.append(file_handler)
+        logger.addHandler(self._queue_handler(file_handler))
         
         self._loggers[name] = logger
         return logger
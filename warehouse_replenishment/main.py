@@ -13,11 +13,6 @@ if parent_dir not in sys.path:
 from warehouse_replenishment.config import config
 from warehouse_replenishment.db import db, session_scope
 from warehouse_replenishment.logging_setup import logger, get_logger
-from warehouse_replenishment.models import Item, Company, BuyerClassCode
-from warehouse_replenishment.core.demand_forecast import (calculate_forecast, calculate_madp_from_history, 
-    calculate_track_from_history, 
-    apply_seasonality_to_forecast
-)
 
 def init_application():
     """Initialize application components."""
@@ -38,9 +33,14 @@ def generate_forecast(args):
     Args:
         args: Command-line arguments with forecast parameters
     """
-    from warehouse_replenishment.models import Item, Company, BuyerClassCode, SystemClassCode, ForecastMethod
+    # Imported here so startup and --help do not pay for numpy/scipy
+    from warehouse_replenishment.models import Item, Company, Vendor, BuyerClassCode, SystemClassCode, ForecastMethod
     from warehouse_replenishment.services.forecast_service import ForecastService
     from warehouse_replenishment.utils.date_utils import get_current_period
+    from warehouse_replenishment.core.demand_forecast import (
+        calculate_forecast, calculate_madp_and_track, apply_seasonality_to_forecast,
+        calculate_forecast_horizons
+    )
     
     log = get_logger('forecast')
     log.info(f"Starting forecast generation with parameters: {args}")
@@ -72,7 +72,10 @@ def generate_forecast(args):
                 query = query.filter(Item.warehouse_id == args.warehouse_id)
             
             if args.buyer_id:
-                query = query.filter(Item.buyer_id == args.buyer_id)
+                # Buyers are assigned at vendor level
+                query = query.join(Vendor, Item.vendor_id == Vendor.id).filter(
+                    Vendor.buyer_id == args.buyer_id
+                )
             
             # Only include active items (Regular or Watch)
             if not args.include_inactive:
@@ -99,18 +102,23 @@ def generate_forecast(args):
                 'error_items': []
             }
             
+            # Detailed output rows, written in one go after the loop
+            output_rows = []
+            
             # Get current period
             periodicity = company.forecasting_periodicity_default
             current_period, current_year = get_current_period(periodicity)
             
+            # Load history and seasonal profiles for all items up front
+            history_by_item = forecast_service.prefetch_forecasting_context(
+                items, periods=args.periods
+            )
+            
             # Process each item
             for item in items:
                 try:
                     # Get history data
-                    history_data = forecast_service.get_item_demand_history(
-                        item.id, 
-                        periods=args.periods
-                    )
+                    history_data = history_by_item.get(item.id)
                     
                     if not history_data:
                         log.warning(f"No history data for item {item.item_id}")
@@ -131,8 +139,7 @@ def generate_forecast(args):
                     )
                     
                     # Calculate MADP and track
-                    madp = calculate_madp_from_history(base_forecast, history_values)
-                    track = calculate_track_from_history(base_forecast, history_values)
+                    madp, track = calculate_madp_and_track(base_forecast, history_values)
                     
                     # Apply seasonality if needed
                     seasonality_applied = False
@@ -151,10 +158,11 @@ def generate_forecast(args):
                     if args.update:
                         # Update forecasts
                         item.demand_4weekly = final_forecast
-                        item.demand_weekly = final_forecast / 4
-                        item.demand_monthly = final_forecast * (365/12) / (365/13)
-                        item.demand_quarterly = final_forecast * 3
-                        item.demand_yearly = final_forecast * 13
+                        horizons = calculate_forecast_horizons(final_forecast)
+                        item.demand_weekly = horizons['weekly']
+                        item.demand_monthly = horizons['monthly']
+                        item.demand_quarterly = horizons['quarterly']
+                        item.demand_yearly = horizons['yearly']
                         
                         # Update MADP and track
                         item.madp = madp
@@ -183,14 +191,9 @@ def generate_forecast(args):
                         
                         results['updated'] += 1
                     
-                    # Print output if verbose
+                    # Collect output if verbose
                     if args.verbose:
-                        print(f"Item: {item.item_id}")
-                        print(f"  Current forecast: {item.demand_4weekly}")
-                        print(f"  New forecast: {final_forecast}")
-                        print(f"  MADP: {madp}")
-                        print(f"  Track: {track}")
-                        print()
+                        output_rows.append((item.item_id, item.demand_4weekly, final_forecast, madp, track))
                     
                 except Exception as e:
                     log.error(f"Error forecasting item {item.item_id}: {str(e)}")
@@ -200,6 +203,21 @@ def generate_forecast(args):
                         'error': str(e)
                     })
             
+            if output_rows:
+                if args.format == 'tsv':
+                    out = ['\t'.join(('item_id', 'current_forecast', 'new_forecast', 'madp', 'track'))]
+                    out.extend('\t'.join(map(str, row)) for row in output_rows)
+                else:
+                    out = []
+                    for item_id, current, new, row_madp, row_track in output_rows:
+                        out.append(f"Item: {item_id}")
+                        out.append(f"  Current forecast: {current}")
+                        out.append(f"  New forecast: {new}")
+                        out.append(f"  MADP: {row_madp}")
+                        out.append(f"  Track: {row_track}")
+                        out.append('')
+                sys.stdout.write('\n'.join(out) + '\n')
+            
             if args.update:
                 session.commit()
                 log.info(f"Updated forecasts for {results['updated']} items")
@@ -243,6 +261,8 @@ def main():
                                help='Ignore seasonal profiles when forecasting')
     forecast_parser.add_argument('--verbose', '-v', action='store_true',
                                help='Display detailed output')
+    forecast_parser.add_argument('--format', choices=['text', 'tsv'], default='text',
+                               help='Output format for detailed output')
     
     args = parser.parse_args()
     
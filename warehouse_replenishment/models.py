@@ -1,11 +1,22 @@
 # warehouse_replenishment/models.py
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey, Text, Enum, Index
+from sqlalchemy import event, inspect, Column, Computed, Integer, SmallInteger, String, Float, Date, DateTime, Boolean, ForeignKey, Text, Enum, Index, Numeric
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
+from sqlalchemy.types import TypeDecorator
 import enum
+from datetime import date
 
-Base = declarative_base()
+class ModelBase:
+    """Common behaviour shared by all mapped classes."""
+    
+    def __repr__(self):
+        # Only the identity key is used so a repr never triggers a lazy load
+        identity = inspect(self).identity
+        ident = identity[0] if identity and len(identity) == 1 else identity
+        return f"<{type(self).__name__} id={ident}>"
+
+Base = declarative_base(cls=ModelBase)
 
 class BuyerClassCode(enum.Enum):
     REGULAR = 'R'
@@ -37,6 +48,63 @@ class ForecastMethod(enum.Enum):
     E3_OPT_FORECAST = 'E3_OPT_FORECAST'
     E3_ALTERNATE = 'E3_ALTERNATE'
 
+class HistoryExceptionType(enum.Enum):
+    DEMAND_FILTER_HIGH = 'DEMAND_FILTER_HIGH'
+    DEMAND_FILTER_LOW = 'DEMAND_FILTER_LOW'
+    TRACKING_SIGNAL_HIGH = 'TRACKING_SIGNAL_HIGH'
+    TRACKING_SIGNAL_LOW = 'TRACKING_SIGNAL_LOW'
+    SERVICE_LEVEL_CHECK = 'SERVICE_LEVEL_CHECK'
+    INFINITY_CHECK = 'INFINITY_CHECK'
+
+# History exception types are stored as plain strings so rows load without
+# per-row enum coercion; these are the precomputed string values
+HISTORY_EXCEPTION_TYPES = tuple(t.value for t in HistoryExceptionType)
+
+class OrderStatus(str, enum.Enum):
+    OPEN = 'OPEN'
+    ACCEPTED = 'ACCEPTED'
+    RECEIVED = 'RECEIVED'
+    PURGED = 'PURGED'
+    
+    def __str__(self):
+        # Render as the plain value, as the old string column did
+        return self.value
+
+class IntEnum(TypeDecorator):
+    """Store a Python enum as a small integer code.
+    
+    Codes are the member positions in the enum's definition order, so new
+    members must only be appended. Bound values may be members or their
+    string values; loaded values are always enum members. String values
+    left in a column that has not been converted yet are still read.
+    """
+    impl = SmallInteger
+    cache_ok = True
+    
+    def __init__(self, enum_class, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.enum_class = enum_class
+        self.codes = {member: code for code, member in enumerate(enum_class)}
+        self.members = list(enum_class)
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self.codes[self.enum_class(value)]
+    
+    def process_literal_param(self, value, dialect):
+        return str(self.process_bind_param(value, dialect))
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return self.enum_class(value)
+        return self.members[value]
+
+# Integer codes stored in order.status, for raw SQL that bypasses the ORM type
+ORDER_STATUS_CODES = {status: code for code, status in enumerate(OrderStatus)}
+
 class SafetyStockType(enum.Enum):
     NEVER = 0
     LESSER_OF = 1
@@ -107,7 +175,7 @@ class Warehouse(Base):
     
     company = relationship("Company", back_populates="warehouses")
     vendors = relationship("Vendor", back_populates="warehouse")
-    items = relationship("Item", back_populates="warehouse")
+    items = relationship("Item", back_populates="warehouse", lazy="raise_on_sql")
 
 class Vendor(Base):
     __tablename__ = 'vendor'
@@ -131,7 +199,7 @@ class Vendor(Base):
     lead_time_forecast = Column(Integer)
     lead_time_variance = Column(Float)
     active_items_count = Column(Integer, default=0)
-    purchased_dollars_ytd = Column(Float, default=0.0)
+    purchased_dollars_ytd = Column(Numeric(14, 2, asdecimal=False), default=0.0)
     enable_history_adjust = Column(Boolean, default=False)
     current_bracket = Column(Integer, default=1)
     automatic_rebuild = Column(Integer, default=0)
@@ -182,8 +250,15 @@ class Vendor(Base):
     last_opa_cycle = Column(Integer)
     
     warehouse = relationship("Warehouse", back_populates="vendors")
-    brackets = relationship("VendorBracket", back_populates="vendor")
-    items = relationship("Item", back_populates="vendor")
+    brackets = relationship(
+        "VendorBracket", back_populates="vendor",
+        lazy="selectin", order_by="VendorBracket.bracket_number"
+    )
+    items = relationship("Item", back_populates="vendor", lazy="raise_on_sql")
+    member_links = relationship(
+        "SuperVendorMember", foreign_keys="SuperVendorMember.super_vendor_id",
+        back_populates="super_vendor"
+    )
     
     __table_args__ = (
         # Unique constraint for vendor_id and warehouse_id combination
@@ -243,6 +318,13 @@ class Item(Base):
     reserved = Column(Float, default=0.0)
     held_until = Column(Date)
     quantity_held = Column(Float, default=0.0)
+    # On hand + On order - Back order - Reserved, maintained by the database.
+    # Held quantity is date-bounded, so it is subtracted when read.
+    available_balance = Column(Float, Computed(
+        "COALESCE(on_hand, 0) + COALESCE(on_order, 0) "
+        "- COALESCE(customer_back_order, 0) - COALESCE(reserved, 0)",
+        persisted=True
+    ))
     
     # Lead Time
     lead_time_forecast = Column(Integer)
@@ -255,8 +337,8 @@ class Item(Base):
     
     # Item Parameters
     units_per_case = Column(Float, default=1.0)
-    weight_per_unit = Column(Float, default=0.0)
-    volume_per_unit = Column(Float, default=0.0)
+    weight_per_unit = Column(Float(precision=24), default=0.0)
+    volume_per_unit = Column(Float(precision=24), default=0.0)
     units_per_layer = Column(Float, default=0.0)
     units_per_pallet = Column(Float, default=0.0)
     buying_multiple = Column(Float, default=1.0)
@@ -284,8 +366,8 @@ class Item(Base):
     demand_quarterly = Column(Float, default=0.0)
     demand_yearly = Column(Float, default=0.0)
     forecast_date = Column(DateTime)
-    madp = Column(Float, default=0.0)
-    track = Column(Float, default=0.0)
+    madp = Column(Float(precision=24), default=0.0)
+    track = Column(Float(precision=24), default=0.0)
     sstf = Column(Float, default=0.0)  # Safety Stock Time Factor
     freeze_until_date = Column(Date)
     demand_profile = Column(String(20))
@@ -300,9 +382,9 @@ class Item(Base):
     ss_type = Column(Enum(SafetyStockType), default=SafetyStockType.NEVER)
     
     # Price information
-    purchase_price = Column(Float, default=0.0)
+    purchase_price = Column(Numeric(12, 4, asdecimal=False), default=0.0)
     purchase_price_divisor = Column(Float, default=1.0)
-    sales_price = Column(Float, default=0.0)
+    sales_price = Column(Numeric(12, 4, asdecimal=False), default=0.0)
     carrying_cost_adjustments = Column(Float, default=0.0)
     handling_cost_adjustments = Column(Float, default=0.0)
     
@@ -319,40 +401,141 @@ class Item(Base):
     item_cycle_units = Column(Float, default=0.0)  # ICYC
     item_cycle_days = Column(Float, default=0.0)
     
-    vendor = relationship("Vendor", back_populates="items")
-    warehouse = relationship("Warehouse", back_populates="items")
-    demand_history = relationship("DemandHistory", back_populates="item")
-    item_prices = relationship("ItemPrice", back_populates="item")
+    # Columns read by the history exception scan; selecting just these
+    # returns plain rows instead of hydrating full Item objects
+    forecast_columns = (
+        id, demand_4weekly, madp, track,
+        service_level_attained, service_level_goal
+    )
     
-    forecasts = relationship("ItemForecast", back_populates="item")
     vendor = relationship("Vendor", back_populates="items")
     warehouse = relationship("Warehouse", back_populates="items")
-    demand_history = relationship("DemandHistory", back_populates="item")
+    # Unbounded collections raise instead of lazy loading; query them with filters/limits
+    demand_history = relationship("DemandHistory", back_populates="item", lazy="raise_on_sql")
     item_prices = relationship("ItemPrice", back_populates="item")
+    forecasts = relationship("ItemForecast", back_populates="item", lazy="raise_on_sql")
+    order_items = relationship("OrderItem", back_populates="item")
 
     __table_args__ = (
         # Unique constraint for item_id, vendor_id and warehouse_id combination
+        # Index for item lookups by code within a vendor and warehouse
+        Index('idx_item_code_vendor_warehouse', 'item_id', 'vendor_id', 'warehouse_id'),
+        # Index for batch selection of items by warehouse and buyer class
+        Index('idx_item_warehouse_buyer_class', 'warehouse_id', 'buyer_class'),
         {'sqlite_autoincrement': True},
     )
 
 class DemandHistory(Base):
     __tablename__ = 'demand_history'
     
-    id = Column(Integer, primary_key=True)
+    # The table is range partitioned by period_year, so the partition key
+    # has to be part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
     item_id = Column(Integer, ForeignKey('item.id'))
     period_number = Column(Integer, nullable=False)
-    period_year = Column(Integer, nullable=False)
+    period_year = Column(Integer, primary_key=True)
     
-    shipped = Column(Float, default=0.0)
-    lost_sales = Column(Float, default=0.0)
-    promotional_demand = Column(Float, default=0.0)
-    total_demand = Column(Float, default=0.0)
+    shipped = Column(Float(precision=24), default=0.0)
+    lost_sales = Column(Float(precision=24), default=0.0)
+    promotional_demand = Column(Float(precision=24), default=0.0)
+    total_demand = Column(Float(precision=24), default=0.0)
     
     is_ignored = Column(Boolean, default=False)
     is_adjusted = Column(Boolean, default=False)
     out_of_stock_days = Column(Integer, default=0)
     
     item = relationship("Item", back_populates="demand_history")
+    
+    __table_args__ = (
+        # One history row per item and period; also the conflict target for
+        # upserts. Latest-first reads walk it backwards, and carrying
+        # total_demand/is_ignored lets per-period demand lookups be
+        # answered from the index alone
+        Index(
+            'idx_demand_history_item_period', 'item_id', 'period_year', 'period_number',
+            unique=True,
+            postgresql_include=['total_demand', 'is_ignored']
+        ),
+        {'postgresql_partition_by': 'RANGE (period_year)'},
+    )
+
+# Years of history partitions created up front, counting back from this year
+DEMAND_HISTORY_PARTITION_YEARS = 5
+
+def demand_history_is_partitioned(connection) -> bool:
+    """Check whether demand_history exists as a partitioned table.
+    
+    Tables created before partitioning was introduced are plain tables and
+    have to be converted with scripts/migrate_demand_history_partitions.py.
+    
+    Args:
+        connection: Database connection
+        
+    Returns:
+        True if demand_history is a partitioned table
+    """
+    return bool(connection.exec_driver_sql(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('demand_history')"
+    ).scalar())
+
+def create_demand_history_partition(connection, year: int) -> None:
+    """Create the demand history partition for one year if it does not exist.
+    
+    Rows for the year that already landed in the default partition would
+    make the new partition's bounds overlap them, so the default partition
+    is detached, the partition created, the rows moved into it and the
+    default partition attached again.
+    
+    Args:
+        connection: Database connection
+        year: Period year covered by the partition
+    """
+    partition = f"demand_history_{year:d}"
+    if connection.exec_driver_sql(f"SELECT to_regclass('{partition}')").scalar():
+        return
+    
+    has_default = connection.exec_driver_sql(
+        "SELECT to_regclass('demand_history_default')"
+    ).scalar()
+    has_default_rows = has_default and connection.exec_driver_sql(
+        f"SELECT EXISTS (SELECT 1 FROM demand_history_default WHERE period_year = {year:d})"
+    ).scalar()
+    
+    if has_default_rows:
+        connection.exec_driver_sql(
+            "ALTER TABLE demand_history DETACH PARTITION demand_history_default"
+        )
+    
+    connection.exec_driver_sql(
+        f"CREATE TABLE {partition} PARTITION OF demand_history "
+        f"FOR VALUES FROM ({year:d}) TO ({year + 1:d})"
+    )
+    
+    if has_default_rows:
+        connection.exec_driver_sql(
+            f"INSERT INTO demand_history SELECT * FROM demand_history_default "
+            f"WHERE period_year = {year:d}"
+        )
+        connection.exec_driver_sql(
+            f"DELETE FROM demand_history_default WHERE period_year = {year:d}"
+        )
+        connection.exec_driver_sql(
+            "ALTER TABLE demand_history ATTACH PARTITION demand_history_default DEFAULT"
+        )
+
+@event.listens_for(DemandHistory.__table__, 'after_create')
+def _create_demand_history_partitions(target, connection, **kw):
+    """Create yearly partitions plus a default partition for other years."""
+    if connection.dialect.name != 'postgresql':
+        return
+    
+    current_year = date.today().year
+    for year in range(current_year - DEMAND_HISTORY_PARTITION_YEARS, current_year + 2):
+        create_demand_history_partition(connection, year)
+    
+    connection.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS demand_history_default PARTITION OF demand_history DEFAULT"
+    )
 
 class ItemPrice(Base):
     __tablename__ = 'item_price'
@@ -361,7 +544,7 @@ class ItemPrice(Base):
     item_id = Column(Integer, ForeignKey('item.id'))
     bracket_number = Column(Integer, nullable=False)
     
-    price = Column(Float, default=0.0)
+    price = Column(Numeric(12, 4, asdecimal=False), default=0.0)
     
     item = relationship("Item", back_populates="item_prices")
 
@@ -381,24 +564,24 @@ class Order(Base):
     order_delay = Column(Integer, default=0)  # Days until order will be due
     
     # Order totals
-    independent_amount = Column(Float, default=0.0)
+    independent_amount = Column(Numeric(12, 4, asdecimal=False), default=0.0)
     independent_eaches = Column(Float, default=0.0)
-    independent_weight = Column(Float, default=0.0)
-    independent_volume = Column(Float, default=0.0)
+    independent_weight = Column(Float(precision=24), default=0.0)
+    independent_volume = Column(Float(precision=24), default=0.0)
     independent_dozens = Column(Float, default=0.0)
     independent_cases = Column(Float, default=0.0)
     
-    auto_adj_amount = Column(Float, default=0.0)
+    auto_adj_amount = Column(Numeric(12, 4, asdecimal=False), default=0.0)
     auto_adj_eaches = Column(Float, default=0.0)
-    auto_adj_weight = Column(Float, default=0.0)
-    auto_adj_volume = Column(Float, default=0.0)
+    auto_adj_weight = Column(Float(precision=24), default=0.0)
+    auto_adj_volume = Column(Float(precision=24), default=0.0)
     auto_adj_dozens = Column(Float, default=0.0)
     auto_adj_cases = Column(Float, default=0.0)
     
-    final_adj_amount = Column(Float, default=0.0)
+    final_adj_amount = Column(Numeric(12, 4, asdecimal=False), default=0.0)
     final_adj_eaches = Column(Float, default=0.0)
-    final_adj_weight = Column(Float, default=0.0)
-    final_adj_volume = Column(Float, default=0.0)
+    final_adj_weight = Column(Float(precision=24), default=0.0)
+    final_adj_volume = Column(Float(precision=24), default=0.0)
     final_adj_dozens = Column(Float, default=0.0)
     final_adj_cases = Column(Float, default=0.0)
     
@@ -406,7 +589,7 @@ class Order(Base):
     current_bracket = Column(Integer, default=1)
     
     # Order status
-    status = Column(String(20), default='OPEN')  # OPEN, ACCEPTED, PURGED
+    status = Column(IntEnum(OrderStatus), default=OrderStatus.OPEN)
     expected_delivery_date = Column(Date)
     approval_date = Column(DateTime)
     
@@ -419,7 +602,24 @@ class Order(Base):
     uninitialized_checks = Column(Integer, default=0)
     watch_checks = Column(Integer, default=0)
     
-    order_items = relationship("OrderItem", back_populates="order")
+    order_items = relationship("OrderItem", back_populates="order", lazy="selectin")
+    
+    __table_args__ = (
+        # Index for nightly status scans per warehouse
+        Index('idx_order_status_warehouse', 'status', 'warehouse_id'),
+        # Index for purging accepted orders by age
+        Index('idx_order_status_approval', 'status', 'approval_date'),
+        # Index for vendor order lookups by status
+        Index('idx_order_vendor_status', 'vendor_id', 'status', 'approval_date'),
+        # Partial index for the open/accepted orders that nightly jobs scan
+        Index(
+            'idx_order_active_warehouse', 'warehouse_id', 'vendor_id',
+            postgresql_where=text(
+                f"status IN ({ORDER_STATUS_CODES[OrderStatus.OPEN]}, "
+                f"{ORDER_STATUS_CODES[OrderStatus.ACCEPTED]})"
+            )
+        ),
+    )
 
 class OrderItem(Base):
     __tablename__ = 'order_item'
@@ -446,6 +646,7 @@ class OrderItem(Base):
     order_up_to_level_units = Column(Float)
     
     order = relationship("Order", back_populates="order_items")
+    item = relationship("Item", back_populates="order_items", lazy="joined")
 
 class SeasonalProfile(Base):
     __tablename__ = 'seasonal_profile'
@@ -455,7 +656,45 @@ class SeasonalProfile(Base):
     description = Column(String(255))
     periodicity = Column(Integer, nullable=False)  # 12 or 52
     
-    indices = relationship("SeasonalProfileIndex", back_populates="profile")
+    indices = relationship(
+        "SeasonalProfileIndex", back_populates="profile",
+        lazy="selectin", order_by="SeasonalProfileIndex.period_number"
+    )
+    
+    @property
+    def index_values(self):
+        """Seasonal index values ordered by period number."""
+        return [index.index_value for index in self.indices]
+    
+    @classmethod
+    def cached_index_values(cls, session, profile_id, cache):
+        """Get a profile's indices, loading each profile only once per cache.
+        
+        Args:
+            session: Database session
+            profile_id: Profile ID
+            cache: Dictionary of index values already loaded, keyed by profile ID
+            
+        Returns:
+            Seasonal indices ordered by period number, or None if the
+            profile does not exist
+        """
+        if profile_id not in cache:
+            profile = session.query(cls).filter(cls.profile_id == profile_id).first()
+            
+            # Indices are loaded with the profile, ordered by period
+            cache[profile_id] = profile.index_values if profile else None
+        
+        return cache[profile_id]
+    
+    @property
+    def as_array(self):
+        """Seasonal index values as a contiguous numpy array.
+        
+        Built on each access so in-place index edits are always reflected.
+        """
+        import numpy as np
+        return np.asarray(self.index_values, dtype=np.float64)
 
 class SeasonalProfileIndex(Base):
     __tablename__ = 'seasonal_profile_index'
@@ -466,6 +705,11 @@ class SeasonalProfileIndex(Base):
     index_value = Column(Float, nullable=False)
     
     profile = relationship("SeasonalProfile", back_populates="indices")
+    
+    __table_args__ = (
+        # Index for loading a profile's indices in period order
+        Index('idx_seasonal_profile_index_period', 'profile_id', 'period_number'),
+    )
 
 class HistoryException(Base):
     __tablename__ = 'history_exception'
@@ -489,6 +733,20 @@ class HistoryException(Base):
     resolution_date = Column(DateTime)
     resolution_action = Column(String(50))
     resolution_notes = Column(Text)
+    
+    __table_args__ = (
+        # Index for duplicate checks by item, period and type
+        Index('idx_history_exception_item_period', 'item_id', 'period_year', 'period_number', 'exception_type'),
+        # Index for listing exceptions by type and period
+        Index('idx_history_exception_type_period', 'exception_type', 'period_year'),
+        # Index for archiving old resolved exceptions
+        Index('idx_history_exception_resolved', 'is_resolved', 'resolution_date'),
+        # Partial index for duplicate checks, which only look at open exceptions
+        Index(
+            'idx_history_exception_open', 'item_id', 'period_year', 'period_number', 'exception_type',
+            postgresql_where=text('NOT is_resolved')
+        ),
+    )
 
 class ManagementException(Base):
     __tablename__ = 'management_exception'
@@ -521,6 +779,14 @@ class ManagementExceptionItem(Base):
     resolution_date = Column(DateTime)
     resolution_action = Column(String(50))
     resolution_notes = Column(Text)
+    
+    __table_args__ = (
+        # Partial index for looking up an item's open entry in an exception
+        Index(
+            'idx_management_exception_item_open', 'exception_id', 'item_id',
+            postgresql_where=text('NOT is_resolved')
+        ),
+    )
 
 class TimeBasedParameter(Base):
     __tablename__ = 'time_based_parameter'
@@ -552,6 +818,11 @@ class SuperVendorMember(Base):
     id = Column(Integer, primary_key=True)
     super_vendor_id = Column(Integer, ForeignKey('vendor.id'))
     member_vendor_id = Column(Integer, ForeignKey('vendor.id'))
+    
+    super_vendor = relationship(
+        "Vendor", foreign_keys=[super_vendor_id], back_populates="member_links"
+    )
+    member_vendor = relationship("Vendor", foreign_keys=[member_vendor_id], lazy="joined")
 
 class SubVendorItem(Base):
     __tablename__ = 'sub_vendor_item'
@@ -586,6 +857,13 @@ class ArchivedHistoryException(Base):
     
     resolution_action = Column(String(50))
     resolution_notes = Column(Text)
+    
+    __table_args__ = (
+        # Index for faster lookups by item and period
+        Index('idx_archived_exception_item_period', 'item_id', 'period_year', 'period_number'),
+        # Index for listing archived exceptions by type and period
+        Index('idx_archived_exception_type_period', 'exception_type', 'period_year'),
+    )
 
 # Add this to your models.py file
 
@@ -622,11 +900,13 @@ class ItemForecast(Base):
     item = relationship("Item", back_populates="forecasts")
     
     __table_args__ = (
-        # Index for faster lookups by item and period
-        Index('idx_item_forecast_item_period', 'item_id', 'period_year', 'period_number'),
+        # One forecast per item and period; the included columns let
+        # accuracy lookups be answered from the index alone
+        Index(
+            'idx_item_forecast_item_period', 'item_id', 'period_year', 'period_number',
+            unique=True,
+            postgresql_include=['forecast_value', 'actual_value', 'error', 'error_pct']
+        ),
         # Index for faster lookups by date
         Index('idx_item_forecast_date', 'forecast_date'),
     )
-
-# Add to the Item class
-forecasts = relationship("ItemForecast", back_populates="item")
\ No newline at end of file
@@ -293,7 +293,7 @@ def create_items(vendor_data):
                 item_order_point_days = lead_time_days + safety_stock_days
                 
                 # Get vendor order cycle
-                vendor = session.query(Vendor).filter(Vendor.id == vendor_id).first()
+                vendor = session.query(Vendor).get(vendor_id)
                 vendor_order_cycle = vendor.order_cycle if vendor else 14
                 
                 # Item cycle - simulate variance from vendor cycle
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# migrate_demand_history_partitions.py - Convert demand_history to a partitioned table
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# Add the parent directory to the path so we can import our modules
+parent_dir = str(Path(__file__).parent.parent.parent)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from warehouse_replenishment.db import db
+from warehouse_replenishment.models import (
+    DemandHistory, create_demand_history_partition, demand_history_is_partitioned
+)
+from warehouse_replenishment.logging_setup import get_logger
+
+LEGACY_TABLE = 'demand_history_legacy'
+
+def migrate_demand_history(drop_legacy: bool = False) -> bool:
+    """Convert a plain demand_history table into the range partitioned layout.
+
+    The existing table is renamed, together with its indexes and id
+    sequence, the partitioned table is created in its place with a
+    partition for every year present in the data, and the rows are copied
+    across. Everything runs in one transaction.
+
+    Args:
+        drop_legacy: If True, drop the renamed table once the rows are copied
+
+    Returns:
+        True if the migration succeeded or was not needed
+    """
+    logger = get_logger('migrate_demand_history')
+
+    try:
+        db.initialize()
+
+        with db.engine.begin() as connection:
+            if connection.dialect.name != 'postgresql':
+                logger.info("Partitioning is only used on PostgreSQL; nothing to migrate.")
+                return True
+
+            if not connection.exec_driver_sql("SELECT to_regclass('demand_history')").scalar():
+                logger.info("demand_history does not exist; creating it partitioned.")
+                DemandHistory.__table__.create(connection)
+                return True
+
+            if demand_history_is_partitioned(connection):
+                logger.info("demand_history is already partitioned; nothing to migrate.")
+                return True
+
+            # Move the plain table aside, freeing the index and sequence names
+            # the partitioned table is created with
+            logger.info(f"Renaming demand_history to {LEGACY_TABLE}...")
+            connection.exec_driver_sql(f"ALTER TABLE demand_history RENAME TO {LEGACY_TABLE}")
+
+            index_names = connection.exec_driver_sql(
+                "SELECT indexname FROM pg_indexes "
+                f"WHERE schemaname = current_schema() AND tablename = '{LEGACY_TABLE}'"
+            ).scalars().all()
+            for index_name in index_names:
+                connection.exec_driver_sql(
+                    f'ALTER INDEX "{index_name}" RENAME TO "{index_name}_legacy"'
+                )
+
+            sequence = connection.exec_driver_sql(
+                f"SELECT pg_get_serial_sequence('{LEGACY_TABLE}', 'id')"
+            ).scalar()
+            if sequence:
+                connection.exec_driver_sql(
+                    f"ALTER SEQUENCE {sequence} RENAME TO {LEGACY_TABLE}_id_seq"
+                )
+
+            # The after_create hook adds the yearly and default partitions
+            logger.info("Creating partitioned demand_history...")
+            DemandHistory.__table__.create(connection)
+
+            # Years outside the standard range get their own partition rather
+            # than landing in the default one
+            years = connection.exec_driver_sql(
+                f"SELECT DISTINCT period_year FROM {LEGACY_TABLE} ORDER BY period_year"
+            ).scalars().all()
+            for year in years:
+                create_demand_history_partition(connection, year)
+
+            columns = ', '.join(column.name for column in DemandHistory.__table__.columns)
+            result = connection.exec_driver_sql(
+                f"INSERT INTO demand_history ({columns}) SELECT {columns} FROM {LEGACY_TABLE}"
+            )
+            logger.info(f"Copied {result.rowcount} demand history rows.")
+
+            # Continue the new id sequence after the copied ids
+            connection.exec_driver_sql(
+                "SELECT setval(pg_get_serial_sequence('demand_history', 'id'), "
+                "COALESCE((SELECT MAX(id) FROM demand_history), 0) + 1, false)"
+            )
+
+            if drop_legacy:
+                logger.info(f"Dropping {LEGACY_TABLE}...")
+                connection.exec_driver_sql(f"DROP TABLE {LEGACY_TABLE}")
+
+        logger.info("demand_history migrated successfully.")
+        return True
+
+    except Exception as e:
+        logger.error(f"Error migrating demand_history: {str(e)}")
+        logger.exception(e)
+        return False
+
+def main():
+    """Migrate demand_history to the partitioned layout."""
+    parser = argparse.ArgumentParser(description='Convert demand_history to a partitioned table')
+    parser.add_argument('--drop-legacy', action='store_true', help='Drop the old table after copying its rows')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    return 0 if migrate_demand_history(args.drop_legacy) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# migrate_numeric_columns.py - Convert double precision money/analytics columns to their model types
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# Add the parent directory to the path so we can import our modules
+parent_dir = str(Path(__file__).parent.parent.parent)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from warehouse_replenishment.db import db
+from warehouse_replenishment.models import DemandHistory, Item, ItemPrice, Order, Vendor
+from warehouse_replenishment.logging_setup import get_logger
+
+# Columns that moved from Float to Numeric (money) or REAL (bulk analytics)
+MIGRATED_COLUMNS = [
+    Vendor.__table__.c.purchased_dollars_ytd,
+    Item.__table__.c.weight_per_unit,
+    Item.__table__.c.volume_per_unit,
+    Item.__table__.c.madp,
+    Item.__table__.c.track,
+    Item.__table__.c.purchase_price,
+    Item.__table__.c.sales_price,
+    DemandHistory.__table__.c.shipped,
+    DemandHistory.__table__.c.lost_sales,
+    DemandHistory.__table__.c.promotional_demand,
+    DemandHistory.__table__.c.total_demand,
+    ItemPrice.__table__.c.price,
+    Order.__table__.c.independent_amount,
+    Order.__table__.c.independent_weight,
+    Order.__table__.c.independent_volume,
+    Order.__table__.c.auto_adj_amount,
+    Order.__table__.c.auto_adj_weight,
+    Order.__table__.c.auto_adj_volume,
+    Order.__table__.c.final_adj_amount,
+    Order.__table__.c.final_adj_weight,
+    Order.__table__.c.final_adj_volume,
+]
+
+# PostgreSQL reports FLOAT(p) columns under their storage type names
+_FLOAT_ALIASES = {'float(24)': 'real', 'float(53)': 'doubleprecision'}
+
+def _normalize_type(type_name: str) -> str:
+    normalized = type_name.lower().replace(' ', '')
+    return _FLOAT_ALIASES.get(normalized, normalized)
+
+def migrate_numeric_columns() -> bool:
+    """Alter existing columns to the Numeric/REAL types declared on the models.
+
+    Columns already at their model type are left alone, so the script can
+    be re-run safely. Everything runs in one transaction.
+
+    Returns:
+        True if the migration succeeded or was not needed
+    """
+    logger = get_logger('migrate_numeric_columns')
+
+    try:
+        db.initialize()
+
+        with db.engine.begin() as connection:
+            if connection.dialect.name != 'postgresql':
+                logger.error("This migration only supports PostgreSQL.")
+                return False
+
+            altered = 0
+            for column in MIGRATED_COLUMNS:
+                table_name = column.table.name
+                current_type = connection.exec_driver_sql(
+                    "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+                    f"WHERE attrelid = to_regclass('\"{table_name}\"') "
+                    f"AND attname = '{column.name}' AND NOT attisdropped"
+                ).scalar()
+
+                if current_type is None:
+                    logger.warning(f"{table_name}.{column.name} does not exist; skipping.")
+                    continue
+
+                target_type = column.type.compile(dialect=connection.dialect)
+                if _normalize_type(current_type) == _normalize_type(target_type):
+                    continue
+
+                logger.info(f"Converting {table_name}.{column.name} from {current_type} to {target_type}...")
+                connection.exec_driver_sql(
+                    f'ALTER TABLE "{table_name}" ALTER COLUMN {column.name} '
+                    f"TYPE {target_type} USING {column.name}::{target_type}"
+                )
+                altered += 1
+
+        logger.info(f"Numeric column migration complete; {altered} columns altered.")
+        return True
+
+    except Exception as e:
+        logger.error(f"Error migrating numeric columns: {str(e)}")
+        logger.exception(e)
+        return False
+
+def main():
+    """Convert money and analytics columns to their model types."""
+    parser = argparse.ArgumentParser(description='Convert Float columns to their Numeric/REAL model types')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    return 0 if migrate_numeric_columns() else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
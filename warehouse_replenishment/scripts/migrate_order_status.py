@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# migrate_order_status.py - Convert order.status from strings to SmallInteger codes
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# Add the parent directory to the path so we can import our modules
+parent_dir = str(Path(__file__).parent.parent.parent)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from warehouse_replenishment.db import db
+from warehouse_replenishment.models import Order, ORDER_STATUS_CODES
+from warehouse_replenishment.logging_setup import get_logger
+
+def migrate_order_status() -> bool:
+    """Convert the status column of an existing order table to integer codes.
+
+    Indexes that include status are dropped before the type change and
+    recreated from the model afterwards, so the partial index predicate
+    matches the new codes. Everything runs in one transaction.
+
+    Returns:
+        True if the migration succeeded or was not needed
+    """
+    logger = get_logger('migrate_order_status')
+
+    try:
+        db.initialize()
+
+        with db.engine.begin() as connection:
+            if connection.dialect.name != 'postgresql':
+                logger.error("This migration only supports PostgreSQL.")
+                return False
+
+            data_type = connection.exec_driver_sql(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_schema = current_schema() "
+                "AND table_name = 'order' AND column_name = 'status'"
+            ).scalar()
+
+            if data_type is None:
+                logger.info("order.status does not exist; nothing to migrate.")
+                return True
+
+            if data_type == 'smallint':
+                logger.info("order.status already stores integer codes; nothing to migrate.")
+                return True
+
+            unknown = connection.exec_driver_sql(
+                'SELECT DISTINCT status::text FROM "order" '
+                'WHERE status IS NOT NULL AND status::text NOT IN ('
+                + ', '.join(f"'{status.value}'" for status in ORDER_STATUS_CODES)
+                + ')'
+            ).scalars().all()
+            if unknown:
+                logger.error(f"order.status holds unknown values {unknown}; aborting.")
+                return False
+
+            status_indexes = [
+                index for index in Order.__table__.indexes
+                if 'status' in index.columns or index.name == 'idx_order_active_warehouse'
+            ]
+            for index in status_indexes:
+                connection.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+
+            cases = ' '.join(
+                f"WHEN '{status.value}' THEN {code}"
+                for status, code in ORDER_STATUS_CODES.items()
+            )
+            logger.info(f"Converting order.status from {data_type} to smallint...")
+            connection.exec_driver_sql('ALTER TABLE "order" ALTER COLUMN status DROP DEFAULT')
+            connection.exec_driver_sql(
+                'ALTER TABLE "order" ALTER COLUMN status TYPE SMALLINT '
+                f"USING CASE status::text {cases} END"
+            )
+
+            for index in status_indexes:
+                index.create(connection, checkfirst=True)
+
+        logger.info("order.status migrated successfully.")
+        return True
+
+    except Exception as e:
+        logger.error(f"Error migrating order.status: {str(e)}")
+        logger.exception(e)
+        return False
+
+def main():
+    """Convert order.status to integer codes."""
+    parser = argparse.ArgumentParser(description='Convert order.status to SmallInteger codes')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    return 0 if migrate_order_status() else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
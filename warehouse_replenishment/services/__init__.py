@@ -1,9 +1,15 @@
-from .vendor_service import VendorService
-from .item_service import ItemService
-from .order_service import OrderService
-from .exception_service import ExceptionService
-from .reporting_service import ReportingService
-from .safety_stock_service import SafetyStockService
+import importlib
+
+# Service classes are imported on first access (PEP 562) so that importing
+# one service does not pull in every other service module and its dependencies
+_LAZY_SERVICES = {
+    'VendorService': 'vendor_service',
+    'ItemService': 'item_service',
+    'OrderService': 'order_service',
+    'ExceptionService': 'exception_service',
+    'ReportingService': 'reporting_service',
+    'SafetyStockService': 'safety_stock_service'
+}
 
 __all__ = [
     'VendorService',
@@ -12,4 +18,15 @@ __all__ = [
     'ExceptionService',
     'ReportingService',
     'SafetyStockService'
-]
\ No newline at end of file
+]
+
+def __getattr__(name):
+    if name in _LAZY_SERVICES:
+        module = importlib.import_module(f".{_LAZY_SERVICES[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_SERVICES))
@@ -6,7 +6,7 @@ import sys
 import os
 from pathlib import Path
 
-
+import numpy as np
 from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import Session
 
@@ -17,7 +17,7 @@ if parent_dir not in sys.path:
 
 
 from warehouse_replenishment.models import (
-    Item, Company, Warehouse, Vendor,
+    Item, Company, Warehouse, Vendor, BuyerClassCode,
     HistoryException, ManagementException, ManagementExceptionItem,
     ArchivedHistoryException
 )
@@ -29,6 +29,38 @@ from warehouse_replenishment.exceptions import ForecastError, OrderError
 from warehouse_replenishment.logging_setup import logger
 logger = logging.getLogger(__name__)
 
+def classify_inventory_levels(
+    on_hand: np.ndarray,
+    demand_4weekly: np.ndarray,
+    lead_time_days: np.ndarray,
+    outl_days: np.ndarray,
+    over_stock_factor: float = 1.5
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Flag out of stock, low stock and over stock items in one vector pass.
+    
+    Args:
+        on_hand: On hand units per item
+        demand_4weekly: 4-weekly demand forecast per item
+        lead_time_days: Lead time forecast in days per item
+        outl_days: Order up to level in days per item
+        over_stock_factor: Multiple of OUTL days that counts as over stock
+        
+    Returns:
+        Tuple of boolean masks (out_of_stock, low_stock, over_stock)
+    """
+    out_of_stock = on_hand <= 0
+    daily_demand = demand_4weekly / 28  # Assuming 28 days in a 4-weekly period
+    has_demand = ~out_of_stock & (daily_demand > 0)
+    
+    inventory_days = np.full(on_hand.shape, np.nan)
+    np.divide(on_hand, daily_demand, out=inventory_days, where=has_demand)
+    
+    with np.errstate(invalid='ignore'):
+        low_stock = has_demand & (inventory_days < lead_time_days)
+        over_stock = has_demand & (inventory_days > outl_days * over_stock_factor)
+    
+    return out_of_stock, low_stock, over_stock
+
 class ExceptionService:
     """Service for handling exception-related operations."""
     
@@ -167,16 +199,16 @@ class ExceptionService:
             raise ForecastError(f"Item with ID {item_id} not found")
         
         # Check if exception already exists
-        existing_exception = self.session.query(HistoryException).filter(
+        existing_exception_id = self.session.query(HistoryException.id).filter(
             HistoryException.item_id == item_id,
             HistoryException.exception_type == exception_type,
             HistoryException.period_number == period_number,
             HistoryException.period_year == period_year,
             HistoryException.is_resolved == False
-        ).first()
+        ).limit(1).scalar()
         
-        if existing_exception:
-            return existing_exception.id
+        if existing_exception_id is not None:
+            return existing_exception_id
         
         # Create new exception
         exception = HistoryException(
@@ -475,6 +507,28 @@ class ExceptionService:
         if not item:
             raise Exception(f"Item with ID {item_id} not found")
         
+        return self._add_exception_item(exception_id, item_id, value_x, value_y, notes)
+    
+    def _add_exception_item(
+        self,
+        exception_id: int,
+        item_id: int,
+        value_x: Optional[float] = None,
+        value_y: Optional[float] = None,
+        notes: Optional[str] = None
+    ) -> int:
+        """Add an item to a management exception already known to exist.
+        
+        Args:
+            exception_id: Exception ID
+            item_id: Item ID
+            value_x: Optional X value
+            value_y: Optional Y value
+            notes: Optional notes
+            
+        Returns:
+            ID of the created (or already existing) management exception item
+        """
         # Check if item is already in the exception
         existing_item = self.session.query(ManagementExceptionItem).filter(
             ManagementExceptionItem.exception_id == exception_id,
@@ -553,8 +607,14 @@ class ExceptionService:
         Returns:
             Dictionary with detection results
         """
-        # Build query to get items
-        query = self.session.query(Item)
+        # Build query to get only the stock columns the checks need
+        query = self.session.query(
+            Item.id,
+            Item.on_hand,
+            Item.demand_4weekly,
+            Item.lead_time_forecast,
+            Item.order_up_to_level_days
+        )
         
         # Apply filters
         if warehouse_id is not None:
@@ -567,12 +627,12 @@ class ExceptionService:
             query = query.filter(Item.id == item_id)
         
         # Only include active items
-        query = query.filter(Item.buyer_class.in_(['R', 'W']))
+        query = query.filter(Item.buyer_class.in_([BuyerClassCode.REGULAR, BuyerClassCode.WATCH]))
         
-        items = query.all()
+        rows = query.all()
         
         results = {
-            'total_items': len(items),
+            'total_items': len(rows),
             'out_of_stock': 0,
             'low_stock': 0,
             'over_stock': 0,
@@ -580,40 +640,33 @@ class ExceptionService:
             'errors': 0
         }
         
-        # Process each item
-        for item in items:
-            try:
-                # Check for out of stock
-                if item.on_hand <= 0:
-                    self._create_inventory_exception(item.id, 'OUT_OF_STOCK')
-                    results['out_of_stock'] += 1
-                    continue
-                
-                # Calculate available inventory in days
-                daily_demand = item.demand_4weekly / 28  # Assuming 28 days in a 4-weekly period
-                
-                if daily_demand > 0:
-                    inventory_days = item.on_hand / daily_demand
-                    
-                    # Check for low stock
-                    if inventory_days < item.lead_time_forecast:
-                        self._create_inventory_exception(item.id, 'LOW_STOCK')
-                        results['low_stock'] += 1
-                    
-                    # Check for over stock
-                    if inventory_days > (item.order_up_to_level_days * 1.5):
-                        self._create_inventory_exception(item.id, 'OVER_STOCK')
-                        results['over_stock'] += 1
-                
-                # Check for approaching shelf life
-                if item.shelf_life_days > 0:
-                    # Note: In a real implementation, we would need to track inventory age
-                    # For this example, we'll skip this check
-                    pass
-                
-            except Exception as e:
-                logger.error(f"Error detecting inventory exceptions for item {item.id}: {str(e)}")
-                results['errors'] += 1
+        if not rows:
+            return results
+        
+        # Classify every item at once on columnar arrays; missing values
+        # become NaN and never match a check
+        item_ids, on_hand, demand_4weekly, lead_time, outl_days = (
+            np.array(column, dtype=np.float64) for column in zip(*rows)
+        )
+        out_of_stock, low_stock, over_stock = classify_inventory_levels(
+            on_hand, demand_4weekly, lead_time, outl_days
+        )
+        
+        # Only flagged items need an exception written
+        # Note: approaching shelf life would need inventory age tracking,
+        # so that check is skipped
+        for exception_type, mask in (
+            ('OUT_OF_STOCK', out_of_stock),
+            ('LOW_STOCK', low_stock),
+            ('OVER_STOCK', over_stock)
+        ):
+            for flagged_id in item_ids[mask].astype(int).tolist():
+                try:
+                    self._create_inventory_exception(flagged_id, exception_type)
+                    results[exception_type.lower()] += 1
+                except Exception as e:
+                    logger.error(f"Error detecting inventory exceptions for item {flagged_id}: {str(e)}")
+                    results['errors'] += 1
         
         return results
     
@@ -650,16 +703,6 @@ class ExceptionService:
             )
             exception = self.get_management_exception(exception_id)
         
-        # Check if item is already in the exception and not resolved
-        existing_item = self.session.query(ManagementExceptionItem).filter(
-            ManagementExceptionItem.exception_id == exception.id,
-            ManagementExceptionItem.item_id == item_id,
-            ManagementExceptionItem.is_resolved == False
-        ).first()
-        
-        if existing_item:
-            return existing_item.id
-            
         # Create management exception item
         if exception_type == 'OUT_OF_STOCK':
             notes = f"Item is out of stock. On hand: {item.on_hand}, On order: {item.on_order}"
@@ -674,8 +717,10 @@ class ExceptionService:
         else:
             notes = f"Inventory exception: {exception_type}"
             
-        # Add item to management exception
-        return self.add_item_to_management_exception(
+        # Add item to management exception; the item and exception were
+        # loaded above, so skip the lookups add_item_to_management_exception
+        # repeats. Items already in the exception are returned as is.
+        return self._add_exception_item(
             exception_id=exception.id,
             item_id=item_id,
             value_x=item.on_hand,
@@ -713,12 +758,22 @@ class ExceptionService:
             query = query.filter(Item.id == item_id)
         
         # Only include active items
-        query = query.filter(Item.buyer_class.in_(['R', 'W']))
+        query = query.filter(Item.buyer_class.in_([BuyerClassCode.REGULAR, BuyerClassCode.WATCH]))
+        
+        total_items = query.count()
+        
+        # Only load items that can trip at least one of the checks below
+        lumpy_demand_limit = self.company_settings.get('lumpy_demand_limit', 50.0)
+        tracking_signal_limit = self.company_settings.get('tracking_signal_limit', 55.0)
+        query = query.filter(or_(
+            Item.madp >= min(lumpy_demand_limit, 60.0),
+            Item.track >= tracking_signal_limit
+        ))
         
         items = query.all()
         
         results = {
-            'total_items': len(items),
+            'total_items': total_items,
             'lumpy_demand': 0,
             'high_madp': 0,
             'high_track': 0,
@@ -729,18 +784,18 @@ class ExceptionService:
         for item in items:
             try:
                 # Check for lumpy demand
-                if item.madp >= self.company_settings.get('lumpy_demand_limit', 50.0):
-                    self._create_demand_pattern_exception(item.id, 'LUMPY_DEMAND')
+                if item.madp >= lumpy_demand_limit:
+                    self._create_demand_pattern_exception(item, 'LUMPY_DEMAND')
                     results['lumpy_demand'] += 1
                 
                 # Check for high MADP
                 if item.madp >= 60.0:  # Example threshold
-                    self._create_demand_pattern_exception(item.id, 'HIGH_MADP')
+                    self._create_demand_pattern_exception(item, 'HIGH_MADP')
                     results['high_madp'] += 1
                 
                 # Check for high tracking signal
-                if item.track >= self.company_settings.get('tracking_signal_limit', 55.0):
-                    self._create_demand_pattern_exception(item.id, 'HIGH_TRACK')
+                if item.track >= tracking_signal_limit:
+                    self._create_demand_pattern_exception(item, 'HIGH_TRACK')
                     results['high_track'] += 1
                 
             except Exception as e:
@@ -751,22 +806,19 @@ class ExceptionService:
     
     def _create_demand_pattern_exception(
         self,
-        item_id: int,
+        item: Item,
         exception_type: str
     ) -> int:
         """Create a management exception item for demand pattern exceptions.
         
         Args:
-            item_id: Item ID
+            item: Item already loaded by the caller
             exception_type: Exception type
             
         Returns:
             ID of the created management exception item
         """
-        # Get the item
-        item = self.session.query(Item).get(item_id)
-        if not item:
-            raise Exception(f"Item with ID {item_id} not found")
+        item_id = item.id
         
         # Get or create management exception
         exception = self.session.query(ManagementException).filter(
@@ -782,16 +834,6 @@ class ExceptionService:
             )
             exception = self.get_management_exception(exception_id)
         
-        # Check if item is already in the exception and not resolved
-        existing_item = self.session.query(ManagementExceptionItem).filter(
-            ManagementExceptionItem.exception_id == exception.id,
-            ManagementExceptionItem.item_id == item_id,
-            ManagementExceptionItem.is_resolved == False
-        ).first()
-        
-        if existing_item:
-            return existing_item.id
-            
         # Create management exception item
         if exception_type == 'LUMPY_DEMAND':
             notes = f"Lumpy demand pattern. MADP: {item.madp:.1f}%, Demand: {item.demand_4weekly:.2f}"
@@ -802,8 +844,8 @@ class ExceptionService:
         else:
             notes = f"Demand pattern exception: {exception_type}"
             
-        # Add item to management exception
-        return self.add_item_to_management_exception(
+        # Add item to management exception (item and exception already loaded)
+        return self._add_exception_item(
             exception_id=exception.id,
             item_id=item_id,
             value_x=item.madp if exception_type in ['LUMPY_DEMAND', 'HIGH_MADP'] else item.track,
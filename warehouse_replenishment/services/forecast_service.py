@@ -1,30 +1,35 @@
 # warehouse_replenishment/services/forecast_service.py
 from datetime import date, datetime, timedelta
-from typing import List, Dict, Tuple, Optional, Union, Any
+from typing import List, Dict, Set, Tuple, Optional, Union, Any
 import logging
 import uuid
 import sys
 import os
 from pathlib import Path
 
+import numpy as np
+
 # Add the parent directory to the path so we can import our modules
 parent_dir = str(Path(__file__).parent.parent.parent)
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 from sqlalchemy import and_, func, or_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from warehouse_replenishment.models import (
     Item, DemandHistory, Company, Vendor, SeasonalProfile, 
     SeasonalProfileIndex, HistoryException, ItemForecast, ForecastMethod,
-    SystemClassCode, BuyerClassCode
+    SystemClassCode, BuyerClassCode, HistoryExceptionType
 )
 from warehouse_replenishment.core.demand_forecast import (
-    calculate_forecast, calculate_madp_from_history, calculate_track_from_history,
-    apply_seasonality_to_forecast, calculate_lost_sales, adjust_history_value,
-    calculate_enhanced_avs_forecast, calculate_expected_zero_periods,
-    calculate_regular_avs_forecast, calculate_initial_forecast, detect_demand_spike, 
+    calculate_forecast, calculate_madp_and_track_batch,
+    calculate_lost_sales, adjust_history_value,
+    calculate_enhanced_avs_forecasts, calculate_expected_zero_periods_batch,
+    count_leading_zero_periods,
+    calculate_regular_avs_forecasts, calculate_forecast_horizons,
+    FORECAST_HORIZON_FACTORS,
+    calculate_initial_forecast, detect_demand_spikes, 
     detect_tracking_signal_exception, calculate_composite_line
 )
 
@@ -41,6 +46,72 @@ from warehouse_replenishment.utils.math_utils import calculate_madp
 from warehouse_replenishment.logging_setup import logger
 logger = logging.getLogger(__name__)
 
+# Exception type strings resolved once rather than per detected exception
+DEMAND_FILTER_HIGH = HistoryExceptionType.DEMAND_FILTER_HIGH.value
+DEMAND_FILTER_LOW = HistoryExceptionType.DEMAND_FILTER_LOW.value
+TRACKING_SIGNAL_HIGH = HistoryExceptionType.TRACKING_SIGNAL_HIGH.value
+TRACKING_SIGNAL_LOW = HistoryExceptionType.TRACKING_SIGNAL_LOW.value
+SERVICE_LEVEL_CHECK = HistoryExceptionType.SERVICE_LEVEL_CHECK.value
+INFINITY_CHECK = HistoryExceptionType.INFINITY_CHECK.value
+
+# Whether each forecast method is reforecast with Regular AVS, resolved once
+# so batches do a dict lookup per item; items without a method use Enhanced AVS
+USES_REGULAR_AVS = {method: method != ForecastMethod.E3_ENHANCED_AVS for method in ForecastMethod}
+USES_REGULAR_AVS[None] = False
+
+# Number of items whose history is loaded per query in period-end runs
+HISTORY_BATCH_SIZE = 1000
+
+# Item forecast columns derived from a manually entered forecast, as
+# multiples of that forecast for each forecast type
+_FOUR_WEEKS_PER_MONTH = (365 / 13) / (365 / 12)
+MANUAL_FORECAST_FACTORS = {
+    '4weekly': {
+        'demand_4weekly': 1,
+        **{f'demand_{horizon}': factor for horizon, factor in FORECAST_HORIZON_FACTORS.items()}
+    },
+    'weekly': {
+        'demand_weekly': 1,
+        'demand_4weekly': 4,
+        'demand_monthly': (365 / 12) / 7,
+        'demand_quarterly': (365 / 4) / 7,
+        'demand_yearly': 52
+    },
+    'monthly': {
+        'demand_monthly': 1,
+        'demand_4weekly': _FOUR_WEEKS_PER_MONTH,
+        'demand_weekly': _FOUR_WEEKS_PER_MONTH / 4,
+        'demand_quarterly': 3,
+        'demand_yearly': 12
+    },
+    'quarterly': {
+        'demand_quarterly': 1,
+        'demand_yearly': 4,
+        'demand_monthly': 1 / 3,
+        'demand_4weekly': _FOUR_WEEKS_PER_MONTH / 3,
+        'demand_weekly': _FOUR_WEEKS_PER_MONTH / 12
+    },
+    'yearly': {
+        'demand_yearly': 1,
+        'demand_quarterly': 1 / 4,
+        'demand_monthly': 1 / 12,
+        'demand_4weekly': _FOUR_WEEKS_PER_MONTH / 12,
+        'demand_weekly': _FOUR_WEEKS_PER_MONTH / 48
+    }
+}
+
+# Demand history columns returned as history dictionaries
+DEMAND_HISTORY_COLUMNS = (
+    DemandHistory.period_number,
+    DemandHistory.period_year,
+    DemandHistory.shipped,
+    DemandHistory.lost_sales,
+    DemandHistory.promotional_demand,
+    DemandHistory.total_demand,
+    DemandHistory.is_ignored,
+    DemandHistory.is_adjusted,
+    DemandHistory.out_of_stock_days
+)
 
 
 class ForecastService:
@@ -54,6 +125,9 @@ class ForecastService:
         """
         self.session = session
         self._company_settings = None
+        self._seasonal_profile_cache = {}
+        self._seasonal_array_cache = {}
+        self._current_period_cache = {}
     
     @property
     def company_settings(self) -> Dict:
@@ -100,7 +174,9 @@ class ForecastService:
         Returns:
             List of demand history dictionaries
         """
-        query = self.session.query(DemandHistory).filter(
+        # Select plain columns; history rows are read-only here, so there is
+        # no need to build and track a DemandHistory instance per period
+        query = self.session.query(*DEMAND_HISTORY_COLUMNS).filter(
             DemandHistory.item_id == item_id
         )
         
@@ -116,26 +192,162 @@ class ForecastService:
         if periods:
             query = query.limit(periods)
         
-        results = query.all()
-        
         # Convert to dictionaries
-        history = [
-            {
-                'period_number': record.period_number,
-                'period_year': record.period_year,
-                'shipped': record.shipped,
-                'lost_sales': record.lost_sales,
-                'promotional_demand': record.promotional_demand,
-                'total_demand': record.total_demand,
-                'is_ignored': record.is_ignored,
-                'is_adjusted': record.is_adjusted,
-                'out_of_stock_days': record.out_of_stock_days
-            }
-            for record in results
-        ]
+        history = [record._asdict() for record in query]
         
         return history
     
+    def get_demand_history_for_items(
+        self,
+        item_ids: List[int],
+        latest_only: bool = False,
+        include_ignored: bool = False,
+        periods: int = None
+    ) -> Dict[int, List[Dict]]:
+        """Get demand history for several items with a single query.
+        
+        Args:
+            item_ids: Item IDs
+            latest_only: Whether to return only the most recent period per item
+            include_ignored: Whether to include ignored periods
+            periods: Number of most recent periods to retrieve per item
+            
+        Returns:
+            Dictionary mapping item IDs to history dictionaries, most recent first
+        """
+        history_by_item = {item_id: [] for item_id in item_ids}
+        if not item_ids:
+            return history_by_item
+        
+        query = self.session.query(DemandHistory.item_id, *DEMAND_HISTORY_COLUMNS).filter(
+            DemandHistory.item_id.in_(item_ids)
+        )
+        
+        if not include_ignored:
+            query = query.filter(DemandHistory.is_ignored == False)
+        
+        if periods and not latest_only:
+            # Number each item's periods newest first and keep the first n
+            ranked = query.add_columns(
+                func.row_number().over(
+                    partition_by=DemandHistory.item_id,
+                    order_by=(DemandHistory.period_year.desc(), DemandHistory.period_number.desc())
+                ).label('period_rank')
+            ).subquery()
+            
+            query = self.session.query(
+                *[column for column in ranked.c if column.name != 'period_rank']
+            ).filter(
+                ranked.c.period_rank <= periods
+            ).order_by(
+                ranked.c.item_id,
+                ranked.c.period_rank
+            )
+        
+        else:
+            if latest_only:
+                # DISTINCT ON keeps the first row per item in the ordering below
+                query = query.distinct(DemandHistory.item_id)
+            
+            query = query.order_by(
+                DemandHistory.item_id,
+                DemandHistory.period_year.desc(),
+                DemandHistory.period_number.desc()
+            )
+        
+        for record in query:
+            period = record._asdict()
+            history_by_item[period.pop('item_id')].append(period)
+        
+        return history_by_item
+    
+    def get_demand_arrays_for_items(
+        self,
+        item_ids: List[int],
+        include_ignored: bool = False
+    ) -> Dict[int, np.ndarray]:
+        """Get total demand per period for several items as numpy arrays.
+        
+        Only the item ID and total demand columns are read, in one query
+        streamed in chunks, and the result is split into one float64 array
+        per item instead of building a dictionary per period.
+        
+        Args:
+            item_ids: Item IDs
+            include_ignored: Whether to include ignored periods
+            
+        Returns:
+            Dictionary mapping item IDs to total demand arrays, most recent first
+        """
+        demand_by_item = {item_id: np.empty(0) for item_id in item_ids}
+        if not item_ids:
+            return demand_by_item
+        
+        query = self.session.query(DemandHistory.item_id, DemandHistory.total_demand).filter(
+            DemandHistory.item_id.in_(item_ids)
+        )
+        
+        if not include_ignored:
+            query = query.filter(DemandHistory.is_ignored == False)
+        
+        rows = query.order_by(
+            DemandHistory.item_id,
+            DemandHistory.period_year.desc(),
+            DemandHistory.period_number.desc()
+        ).yield_per(1000)
+        
+        # Stream the rows straight into one structured array rather than
+        # holding the full result list alongside the arrays built from it
+        records = np.fromiter(
+            (tuple(row) for row in rows),
+            dtype=[('item_id', np.int64), ('total_demand', np.float64)]
+        )
+        
+        if not len(records):
+            return demand_by_item
+        
+        row_item_ids = records['item_id']
+        demands = records['total_demand']
+        
+        # Rows are grouped by item, so each item's periods are one contiguous slice
+        starts = np.flatnonzero(np.r_[True, row_item_ids[1:] != row_item_ids[:-1]])
+        for item_id, item_demands in zip(row_item_ids[starts].tolist(), np.split(demands, starts[1:])):
+            demand_by_item[item_id] = item_demands
+        
+        return demand_by_item
+    
+    def prefetch_forecasting_context(
+        self,
+        items: List[Item],
+        periods: int = None
+    ) -> Dict[int, List[Dict]]:
+        """Load what per-item forecasting needs for many items up front.
+        
+        Demand history is read in batches of HISTORY_BATCH_SIZE items, and the
+        seasonal profiles referenced by the items are loaded into the profile
+        cache in one query, so a forecasting loop over the items does not
+        query per item.
+        
+        Args:
+            items: Items about to be forecast
+            periods: Number of most recent history periods to retrieve per item
+            
+        Returns:
+            Dictionary mapping item IDs to history dictionaries, most recent first
+        """
+        history_by_item = {}
+        for start in range(0, len(items), HISTORY_BATCH_SIZE):
+            history_by_item.update(self.get_demand_history_for_items(
+                [item.id for item in items[start:start + HISTORY_BATCH_SIZE]],
+                periods=periods
+            ))
+        
+        self.get_seasonal_profile_arrays(
+            item.demand_profile for item in items if item.demand_profile
+        )
+        
+        return history_by_item
+    
     def get_item_demand_history_by_year(
         self, 
         item_id: int,
@@ -162,13 +374,17 @@ class ForecastService:
         # Get all history
         history = self.get_item_demand_history(item_id, include_ignored=include_ignored)
         
-        # Organize by year
+        # Organize by year. History arrives newest first, so years are added
+        # in descending order and we can stop at the first year past max_years
         history_by_year = {}
         
         for period in history:
             year = period['period_year']
             
             if year not in history_by_year:
+                if len(history_by_year) == max_years:
+                    break
+                
                 # Initialize with zeros
                 history_by_year[year] = [0] * periodicity
             
@@ -177,10 +393,7 @@ class ForecastService:
             if 1 <= period_number <= periodicity:
                 history_by_year[year][period_number - 1] = period['total_demand']
         
-        # Sort years and limit to max_years
-        sorted_years = sorted(history_by_year.keys(), reverse=True)[:max_years]
-        
-        return {year: history_by_year[year] for year in sorted_years}
+        return history_by_year
     
     def get_item_forecast_values(self, item_id: int) -> Dict:
         """Get forecast values for an item.
@@ -219,19 +432,58 @@ class ForecastService:
         Returns:
             List of seasonal indices
         """
-        profile = self.session.query(SeasonalProfile).filter(
+        # Profiles are shared by many items, so reuse previously loaded indices
+        if profile_id in self._seasonal_profile_cache:
+            return list(self._seasonal_profile_cache[profile_id])
+        
+        # Load the profile and its indices with a single JOIN
+        profile = self.session.query(SeasonalProfile).options(
+            joinedload(SeasonalProfile.indices)
+        ).filter(
             SeasonalProfile.profile_id == profile_id
         ).first()
         
         if not profile:
             return []
         
-        # Get indices ordered by period number
-        indices = self.session.query(SeasonalProfileIndex).filter(
-            SeasonalProfileIndex.profile_id == profile_id
-        ).order_by(SeasonalProfileIndex.period_number).all()
+        # Indices ordered by period number
+        self._seasonal_profile_cache[profile_id] = profile.index_values
         
-        return [index.index_value for index in indices]
+        return list(self._seasonal_profile_cache[profile_id])
+    
+    def get_seasonal_profile_arrays(self, profile_ids) -> Dict[str, np.ndarray]:
+        """Get seasonal indices for several profiles as numpy arrays.
+        
+        Profiles not loaded yet are fetched together in one query, so a batch
+        of items sharing a handful of profiles costs a single round trip.
+        
+        Args:
+            profile_ids: Profile IDs to look up
+            
+        Returns:
+            Dictionary mapping profile ID to its array of seasonal indices,
+            where element ``period - 1`` holds the index for ``period``
+        """
+        profile_ids = set(profile_ids)
+        missing = [
+            profile_id for profile_id in profile_ids
+            if profile_id not in self._seasonal_array_cache
+        ]
+        
+        if missing:
+            profiles = self.session.query(SeasonalProfile).filter(
+                SeasonalProfile.profile_id.in_(missing)
+            ).all()
+            
+            for profile in profiles:
+                self._seasonal_profile_cache[profile.profile_id] = profile.index_values
+                self._seasonal_array_cache[profile.profile_id] = profile.as_array
+        
+        return {
+            profile_id: self._seasonal_array_cache[profile_id]
+            for profile_id in profile_ids
+            if profile_id in self._seasonal_array_cache
+        }
     
     def calculate_item_composite_line(
         self,
@@ -278,11 +530,13 @@ class ForecastService:
             profile_id = f"P{uuid.uuid4().hex[:8].upper()}"
         
         # Check if profile already exists
-        existing_profile = self.session.query(SeasonalProfile).filter(
-            SeasonalProfile.profile_id == profile_id
-        ).first()
+        profile_exists = self.session.query(
+            self.session.query(SeasonalProfile.id).filter(
+                SeasonalProfile.profile_id == profile_id
+            ).exists()
+        ).scalar()
         
-        if existing_profile:
+        if profile_exists:
             raise ForecastError(f"Profile with ID {profile_id} already exists")
         
         # Create new profile
@@ -294,17 +548,23 @@ class ForecastService:
         
         self.session.add(profile)
         
-        # Create indices
-        for i, index_value in enumerate(indices, 1):
-            index = SeasonalProfileIndex(
-                profile_id=profile_id,
-                period_number=i,
-                index_value=index_value
-            )
-            self.session.add(index)
-        
         try:
+            # The profile row must exist before its indices reference it
+            self.session.flush()
+            
+            # Create indices in a single multi-row INSERT
+            self.session.bulk_insert_mappings(SeasonalProfileIndex, [
+                {
+                    'profile_id': profile_id,
+                    'period_number': i,
+                    'index_value': float(index_value)
+                }
+                for i, index_value in enumerate(indices, 1)
+            ])
+            
             self.session.commit()
+            self._seasonal_profile_cache.pop(profile_id, None)
+            self._seasonal_array_cache.pop(profile_id, None)
             return profile_id
         except Exception as e:
             self.session.rollback()
@@ -330,34 +590,32 @@ class ForecastService:
         if not item:
             raise ForecastError(f"Item with ID {item_id} not found")
         
-        # Check if profile exists
-        profile = self.session.query(SeasonalProfile).filter(
-            SeasonalProfile.profile_id == profile_id
-        ).first()
-        
-        if not profile:
+        # Check if profile exists; this also caches its indices for the
+        # forecast update below
+        if profile_id not in self.get_seasonal_profile_arrays([profile_id]):
             raise ForecastError(f"Profile with ID {profile_id} not found")
         
         # Update item
         item.demand_profile = profile_id
         
         try:
-            self.session.commit()
-            
-            # Update forecast if requested
+            # Update forecast if requested, in the same transaction
             if update_forecast:
-                self.update_seasonal_forecast(item_id)
+                self.update_seasonal_forecast(item_id, commit=False)
             
+            self.session.commit()
             return True
         except Exception as e:
             self.session.rollback()
             raise ForecastError(f"Failed to assign seasonal profile: {str(e)}")
     
-    def update_seasonal_forecast(self, item_id: int) -> bool:
+    def update_seasonal_forecast(self, item_id: int, commit: bool = True) -> bool:
         """Update forecast based on seasonality.
         
         Args:
             item_id: Item ID
+            commit: Whether to commit; pass False to batch several updates
+                into the caller's transaction
             
         Returns:
             True if forecast was updated successfully
@@ -370,34 +628,41 @@ class ForecastService:
         if not item.demand_profile:
             return False
         
-        seasonal_indices = self.get_seasonal_profile(item.demand_profile)
-        if not seasonal_indices:
+        seasonal_indices = self.get_seasonal_profile_arrays(
+            [item.demand_profile]
+        ).get(item.demand_profile)
+        if seasonal_indices is None or len(seasonal_indices) == 0:
             return False
         
         # Get current period
         periodicity = item.forecasting_periodicity or self.company_settings['forecasting_periodicity_default']
-        current_period, _ = get_current_period(periodicity)
+        current_period, _ = self.get_current_period(periodicity)
         
-        # Apply seasonality to forecast
-        base_forecast = item.demand_4weekly
+        # Seasonal index for the current period
+        current_index = seasonal_indices[(current_period - 1) % len(seasonal_indices)]
         
-        # Calculate average seasonal index to normalize
-        avg_index = sum(seasonal_indices) / len(seasonal_indices)
-        if avg_index > 0:
-            # Deseasonalize the base forecast
-            base_forecast = base_forecast / seasonal_indices[(current_period - 1) % len(seasonal_indices)] * avg_index
+        # Deseasonalizing by the current index and then reapplying the same
+        # index cancels out, leaving the forecast scaled by the average
+        # index. Non-positive current indices are ignored, as in
+        # apply_seasonality_to_forecast.
+        seasonal_forecast = item.demand_4weekly
+        avg_index = seasonal_indices.mean()
         
-        # Apply seasonality to forecast periods
-        seasonal_forecast = apply_seasonality_to_forecast(
-            base_forecast, seasonal_indices, current_period
-        )
+        if current_index > 0:
+            seasonal_forecast = float(
+                seasonal_forecast * (avg_index if avg_index > 0 else current_index)
+            )
         
         # Update forecasts
         item.demand_4weekly = seasonal_forecast
-        item.demand_weekly = seasonal_forecast / 4
-        item.demand_monthly = seasonal_forecast * (365/12) / (365/13)
-        item.demand_quarterly = seasonal_forecast * 3
-        item.demand_yearly = seasonal_forecast * 13
+        horizons = calculate_forecast_horizons(seasonal_forecast)
+        item.demand_weekly = horizons['weekly']
+        item.demand_monthly = horizons['monthly']
+        item.demand_quarterly = horizons['quarterly']
+        item.demand_yearly = horizons['yearly']
+        
+        if not commit:
+            return True
         
         try:
             self.session.commit()
@@ -409,13 +674,16 @@ class ForecastService:
     def initialize_item_forecast(
         self,
         item_id: int,
-        initial_forecast: float = None
+        initial_forecast: float = None,
+        commit: bool = True
     ) -> bool:
         """Initialize forecast for a new item.
         
         Args:
             item_id: Item ID
             initial_forecast: Optional initial forecast value
+            commit: Whether to commit; pass False to batch several items
+                into the caller's transaction
             
         Returns:
             True if forecast was initialized successfully
@@ -439,10 +707,11 @@ class ForecastService:
         
         # Update forecasts
         item.demand_4weekly = initial_forecast
-        item.demand_weekly = initial_forecast / 4
-        item.demand_monthly = initial_forecast * (365/12) / (365/13)
-        item.demand_quarterly = initial_forecast * 3
-        item.demand_yearly = initial_forecast * 13
+        horizons = calculate_forecast_horizons(initial_forecast)
+        item.demand_weekly = horizons['weekly']
+        item.demand_monthly = horizons['monthly']
+        item.demand_quarterly = horizons['quarterly']
+        item.demand_yearly = horizons['yearly']
         
         # Update system class
         item.system_class = SystemClassCode.NEW
@@ -450,6 +719,9 @@ class ForecastService:
         # Set forecast date
         item.forecast_date = datetime.now()
         
+        if not commit:
+            return True
+        
         try:
             self.session.commit()
             return True
@@ -462,7 +734,8 @@ class ForecastService:
         item_id: int,
         new_forecast: float,
         forecast_type: str = '4weekly',
-        freeze_until_date: date = None
+        freeze_until_date: date = None,
+        commit: bool = True
     ) -> bool:
         """Manually update forecast for an item.
         
@@ -471,6 +744,8 @@ class ForecastService:
             new_forecast: New forecast value
             forecast_type: Type of forecast to update (4weekly, weekly, monthly, quarterly, yearly)
             freeze_until_date: Optional date until which to freeze the forecast
+            commit: Whether to commit; pass False to batch several items
+                into the caller's transaction
             
         Returns:
             True if forecast was updated successfully
@@ -480,39 +755,13 @@ class ForecastService:
             raise ForecastError(f"Item with ID {item_id} not found")
         
         # Update forecasts based on type
-        if forecast_type == '4weekly':
-            item.demand_4weekly = new_forecast
-            item.demand_weekly = new_forecast / 4
-            item.demand_monthly = new_forecast * (365/12) / (365/13)
-            item.demand_quarterly = new_forecast * 3
-            item.demand_yearly = new_forecast * 13
-        elif forecast_type == 'weekly':
-            item.demand_weekly = new_forecast
-            item.demand_4weekly = new_forecast * 4
-            item.demand_monthly = new_forecast * (365/12) / 7
-            item.demand_quarterly = new_forecast * (365/4) / 7
-            item.demand_yearly = new_forecast * 52
-        elif forecast_type == 'monthly':
-            item.demand_monthly = new_forecast
-            item.demand_4weekly = new_forecast * (365/13) / (365/12)
-            item.demand_weekly = item.demand_4weekly / 4
-            item.demand_quarterly = new_forecast * 3
-            item.demand_yearly = new_forecast * 12
-        elif forecast_type == 'quarterly':
-            item.demand_quarterly = new_forecast
-            item.demand_yearly = new_forecast * 4
-            item.demand_monthly = new_forecast / 3
-            item.demand_4weekly = item.demand_monthly * (365/13) / (365/12)
-            item.demand_weekly = item.demand_4weekly / 4
-        elif forecast_type == 'yearly':
-            item.demand_yearly = new_forecast
-            item.demand_quarterly = new_forecast / 4
-            item.demand_monthly = new_forecast / 12
-            item.demand_4weekly = item.demand_monthly * (365/13) / (365/12)
-            item.demand_weekly = item.demand_4weekly / 4
-        else:
+        factors = MANUAL_FORECAST_FACTORS.get(forecast_type)
+        if factors is None:
             raise ForecastError(f"Invalid forecast type: {forecast_type}")
         
+        for column, factor in factors.items():
+            setattr(item, column, new_forecast * factor)
+        
         # Set freeze until date if provided
         if freeze_until_date:
             item.freeze_until_date = freeze_until_date
@@ -520,6 +769,9 @@ class ForecastService:
         # Set forecast date
         item.forecast_date = datetime.now()
         
+        if not commit:
+            return True
+        
         try:
             self.session.commit()
             return True
@@ -589,11 +841,18 @@ class ForecastService:
             self.session.rollback()
             raise ForecastError(f"Failed to adjust history: {str(e)}")
     
-    def reforecast_item(self, item_id: int) -> bool:
+    def reforecast_item(
+        self,
+        item_id: int,
+        demands: Optional[np.ndarray] = None,
+        forecast_date: Optional[datetime] = None
+    ) -> bool:
         """Reforecast an item.
         
         Args:
             item_id: Item ID
+            demands: Optional preloaded total demand per period, most recent first
+            forecast_date: Optional timestamp to record as the forecast date
             
         Returns:
             True if item was reforecasted successfully
@@ -602,109 +861,244 @@ class ForecastService:
         if not item:
             raise ForecastError(f"Item with ID {item_id} not found")
         
-        # Check if forecast is frozen
-        if item.freeze_until_date and item.freeze_until_date >= date.today():
-            return False
-        
         # Get history
-        history = self.get_item_demand_history(item_id)
-        if not history:
+        if demands is None:
+            demands = self.get_demand_arrays_for_items([item_id])[item_id]
+        
+        errors = []
+        if not self.reforecast_items([item], {item_id: demands}, forecast_date, errors=errors):
+            if errors:
+                raise ForecastError(errors[0]['error'])
             return False
         
-        # Get periodicity
-        periodicity = item.forecasting_periodicity or self.company_settings['forecasting_periodicity_default']
+        try:
+            self.session.commit()
+            return True
+        except Exception as e:
+            self.session.rollback()
+            raise ForecastError(f"Failed to reforecast item: {str(e)}")
+    
+    def reforecast_items(
+        self,
+        items: List[Item],
+        demand_by_item: Dict[int, np.ndarray],
+        forecast_date: Optional[datetime] = None,
+        errors: Optional[List[Dict]] = None
+    ) -> List[Item]:
+        """Reforecast a batch of items without committing.
+        
+        MADP/track, the Regular and Enhanced AVS forecasts and the derived
+        forecast horizons are computed for the whole batch in NumPy passes.
+        Results are written with one bulk UPDATE and the items are expired.
+        Items with a missing forecast or demand history value are skipped.
+        
+        Args:
+            items: Item objects to reforecast
+            demand_by_item: Total demand per period per item ID, most recent first
+            forecast_date: Optional timestamp to record as the forecast date;
+                defaults to the current time
+            errors: Optional list that skipped items are appended to as
+                dictionaries with 'item_id' and 'error' keys
+            
+        Returns:
+            List of items that were reforecasted
+        """
+        # Read company settings once for the whole batch rather than through
+        # the property inside per-item generators
+        settings = self.company_settings
+        
+        # Skip items with frozen forecasts or no history
+        today = date.today()
+        candidates = [
+            (item, np.asarray(demand_by_item.get(item.id, ()), dtype=np.float64))
+            for item in items
+            if not (item.freeze_until_date and item.freeze_until_date >= today)
+        ]
+        candidates = [(item, demands) for item, demands in candidates if len(demands)]
+        
+        if not candidates:
+            return []
+        
+        current_forecasts = np.fromiter(
+            (item.demand_4weekly for item, _ in candidates), dtype=np.float64, count=len(candidates)
+        )
         
-        # Get latest demand
-        latest_demand = history[0]['total_demand'] if history else 0
+        # NULL forecasts and history values arrive as NaN and would spread
+        # through every pass below, so those items are reported and dropped
+        lengths = np.fromiter((len(demands) for _, demands in candidates), dtype=np.int64, count=len(candidates))
+        history_nan = np.logical_or.reduceat(
+            np.isnan(np.concatenate([demands for _, demands in candidates])),
+            np.r_[0, np.cumsum(lengths)[:-1]]
+        )
+        invalid = np.isnan(current_forecasts) | history_nan
+        
+        if invalid.any():
+            for i in np.flatnonzero(invalid):
+                item_id = candidates[i][0].id
+                message = 'Missing forecast or demand history value'
+                logger.error(f"Error reforecasting item {item_id}: {message}")
+                if errors is not None:
+                    errors.append({'item_id': item_id, 'error': message})
+            
+            candidates = [candidate for candidate, bad in zip(candidates, invalid) if not bad]
+            current_forecasts = current_forecasts[~invalid]
+            
+            if not candidates:
+                return []
         
-        # Get history values for MADP and Track calculation
-        history_values = [period['total_demand'] for period in history]
+        count = len(candidates)
+        latest_demands = np.fromiter(
+            (demands[0] for _, demands in candidates), dtype=np.float64, count=count
+        )
+        new_forecasts = np.empty(count)
         
-        # Calculate MADP and Track
-        current_forecast = item.demand_4weekly
-        madp = calculate_madp_from_history(current_forecast, history_values)
-        track = calculate_track_from_history(current_forecast, history_values)
+        # Items not on Enhanced AVS default to Regular AVS, calculated for
+        # the whole batch below
+        is_regular_avs = np.fromiter(
+            (USES_REGULAR_AVS[item.forecast_method] for item, _ in candidates),
+            dtype=bool, count=count
+        )
         
-        # Update MADP and Track
-        item.madp = madp
-        item.track = track
+        # Calculate MADP and Track for the whole batch
+        history_values = [demands for _, demands in candidates]
+        madps, tracks = calculate_madp_and_track_batch(current_forecasts, history_values)
         
-        # Determine forecast method
-        forecast_method = item.forecast_method or ForecastMethod.E3_ENHANCED_AVS
+        # Expected zero-demand periods for every Enhanced AVS item in one pass
+        is_enhanced_avs = ~is_regular_avs
+        expected_zero_periods = np.zeros(count)
+        expected_zero_periods[is_enhanced_avs] = calculate_expected_zero_periods_batch(
+            current_forecasts[is_enhanced_avs], madps[is_enhanced_avs]
+        )
         
-        # Calculate new forecast
-        if forecast_method == ForecastMethod.E3_ENHANCED_AVS:
+        # Calculate all Enhanced AVS forecasts in one pass
+        enhanced_indices = np.flatnonzero(is_enhanced_avs)
+        enhanced_items = [candidates[i][0] for i in enhanced_indices]
+        if enhanced_items:
+            # Zero-demand periods before the one just closed, counted from the
+            # newest-first history. The closed period is excluded so the
+            # forced-reforecast threshold matches the running count that was
+            # kept before this period's update
+            periods_with_zero_demand = count_leading_zero_periods(
+                [history_values[i] for i in enhanced_indices]
+            ) - (latest_demands[is_enhanced_avs] == 0)
+            
             # Get Enhanced AVS specific parameters
-            periods_with_zero_demand = getattr(item, 'periods_with_zero_demand', 0)
-            expected_zero_periods = calculate_expected_zero_periods(current_forecast, madp)
-            update_frequency_impact = self.company_settings['update_frequency_impact_control']
-            forecast_demand_limit = getattr(
-                item, 'forecasting_demand_limit', 
-                self.company_settings['forecast_demand_limit']
+            forecast_demand_limits = np.fromiter(
+                (
+                    getattr(item, 'forecasting_demand_limit', settings['forecast_demand_limit'])
+                    for item in enhanced_items
+                ),
+                dtype=np.float64, count=len(enhanced_items)
             )
             
-            new_forecast, was_forced = calculate_enhanced_avs_forecast(
-                current_forecast,
-                latest_demand,
-                track,
+            new_forecasts[is_enhanced_avs], _ = calculate_enhanced_avs_forecasts(
+                current_forecasts[is_enhanced_avs],
+                latest_demands[is_enhanced_avs],
+                tracks[is_enhanced_avs],
                 periods_with_zero_demand,
-                expected_zero_periods,
-                update_frequency_impact,
-                forecast_demand_limit,
-                self.company_settings['basic_alpha_factor']
-            )
-            
-            # Update periods_with_zero_demand field
-            if latest_demand == 0:
-                item.periods_with_zero_demand = periods_with_zero_demand + 1
-            else:
-                item.periods_with_zero_demand = 0
-                
-        else:  # Default to Regular AVS
-            new_forecast = calculate_regular_avs_forecast(
-                current_forecast,
-                latest_demand,
-                track,
-                self.company_settings['basic_alpha_factor']
+                expected_zero_periods[is_enhanced_avs],
+                settings['update_frequency_impact_control'],
+                forecast_demand_limits,
+                settings['basic_alpha_factor']
             )
         
-        # Apply seasonality if applicable
-        if item.demand_profile:
-            seasonal_indices = self.get_seasonal_profile(item.demand_profile)
-            if seasonal_indices:
-                current_period, _ = get_current_period(periodicity)
-                new_forecast = apply_seasonality_to_forecast(
-                    new_forecast,
-                    seasonal_indices,
-                    current_period
-                )
+        # Calculate all Regular AVS forecasts in one pass
+        if is_regular_avs.any():
+            new_forecasts[is_regular_avs] = calculate_regular_avs_forecasts(
+                current_forecasts[is_regular_avs],
+                latest_demands[is_regular_avs],
+                tracks[is_regular_avs],
+                settings['basic_alpha_factor']
+            )
         
-        # Update forecasts
-        item.demand_4weekly = new_forecast
-        item.demand_weekly = new_forecast / 4
-        item.demand_monthly = new_forecast * (365/12) / (365/13)
-        item.demand_quarterly = new_forecast * 3
-        item.demand_yearly = new_forecast * 13
+        # Apply seasonality if applicable. Items sharing a profile and
+        # periodicity share a seasonal index, so each group's index is looked
+        # up once and applied to all of its items as one array operation
+        profile_arrays = self.get_seasonal_profile_arrays(
+            item.demand_profile for item, _ in candidates if item.demand_profile
+        )
+        seasonal_groups = {}
+        for i, (item, _) in enumerate(candidates):
+            if item.demand_profile in profile_arrays:
+                periodicity = item.forecasting_periodicity or settings['forecasting_periodicity_default']
+                seasonal_groups.setdefault((item.demand_profile, periodicity), []).append(i)
+        
+        seasonal_factors = np.ones(count)
+        for (profile_id, periodicity), group in seasonal_groups.items():
+            seasonal_indices = profile_arrays[profile_id]
+            if not len(seasonal_indices):
+                continue
+            
+            current_period, _ = self.get_current_period(periodicity)
+            seasonal_index = seasonal_indices[(current_period - 1) % len(seasonal_indices)]
+            
+            # Same rule as apply_seasonality_to_forecast: ignore invalid indices
+            if seasonal_index > 0:
+                seasonal_factors[group] = seasonal_index
+        
+        new_forecasts *= seasonal_factors
+        
+        # Derive the other forecast horizons for the whole batch
+        horizons = calculate_forecast_horizons(new_forecasts)
+        if forecast_date is None:
+            forecast_date = datetime.now()
+        
+        # Update system class based on madp and annual forecast. Alternate
+        # items keep their class; the rest are bucketed in one pass
+        is_alternate = np.fromiter(
+            (item.system_class == SystemClassCode.ALTERNATE for item, _ in candidates),
+            dtype=bool, count=count
+        )
+        system_classes = np.select(
+            [
+                is_alternate,
+                horizons['yearly'] <= settings['slow_mover_limit'],
+                madps >= settings['lumpy_demand_limit']
+            ],
+            [3, 0, 1],
+            default=2
+        )
+        class_codes = (
+            SystemClassCode.SLOW, SystemClassCode.LUMPY, SystemClassCode.REGULAR,
+            SystemClassCode.ALTERNATE
+        )
         
-        # Set forecast date
-        item.forecast_date = datetime.now()
+        # Collect plain update mappings rather than mutating each Item, so the
+        # batch is written as one executemany UPDATE instead of a unit-of-work
+        # flush per object
+        updates = [
+            {
+                'id': item.id,
+                'madp': madp,
+                'track': track,
+                'demand_4weekly': forecast,
+                'demand_weekly': weekly,
+                'demand_monthly': monthly,
+                'demand_quarterly': quarterly,
+                'demand_yearly': yearly,
+                'forecast_date': forecast_date,
+                'system_class': class_codes[system_class]
+            }
+            for (item, _), madp, track, forecast, weekly, monthly, quarterly, yearly, system_class in zip(
+                candidates,
+                madps.tolist(),
+                tracks.tolist(),
+                new_forecasts.tolist(),
+                horizons['weekly'].tolist(),
+                horizons['monthly'].tolist(),
+                horizons['quarterly'].tolist(),
+                horizons['yearly'].tolist(),
+                system_classes.tolist()
+            )
+        ]
         
-        # Update system class based on madp and annual forecast
-        annual_forecast = item.demand_yearly
+        self.session.bulk_update_mappings(Item, updates)
         
-        if annual_forecast <= self.company_settings['slow_mover_limit']:
-            item.system_class = SystemClassCode.SLOW
-        elif madp >= self.company_settings['lumpy_demand_limit']:
-            item.system_class = SystemClassCode.LUMPY
-        else:
-            item.system_class = SystemClassCode.REGULAR
+        # The loaded Item objects no longer match the rows
+        for item, _ in candidates:
+            self.session.expire(item)
         
-        try:
-            self.session.commit()
-            return True
-        except Exception as e:
-            self.session.rollback()
-            raise ForecastError(f"Failed to reforecast item: {str(e)}")
+        return [item for item, _ in candidates]
     
     def process_period_end_reforecasting(
         self,
@@ -722,11 +1116,11 @@ class ForecastService:
         Returns:
             Dictionary with processing results
         """
-        # Build query to get items
-        query = self.session.query(Item)
+        # Build query to get item IDs; items are loaded batch by batch below
+        query = self.session.query(Item.id)
         
         # Apply filters
-        if warehouse_id:
+        if warehouse_id is not None:
             query = query.filter(Item.warehouse_id == str(warehouse_id))
         
         if vendor_id:
@@ -744,31 +1138,58 @@ class ForecastService:
             (Item.freeze_until_date < func.current_date())
         )
         
-        items = query.all()
+        item_ids = [item_id for item_id, in query]
         
         # Process results
         results = {
-            'total_items': len(items),
+            'total_items': len(item_ids),
             'processed': 0,
             'errors': 0,
             'error_items': []
         }
         
-        # Process each item
-        for item in items:
+        # The whole run is one period-end event, so every reforecast item
+        # records the same forecast date
+        run_ts = datetime.now()
+        
+        # Process items in batches, loading each batch's items and history
+        # in one query each and committing once per batch
+        for start in range(0, len(item_ids), HISTORY_BATCH_SIZE):
+            batch_ids = item_ids[start:start + HISTORY_BATCH_SIZE]
+            demand_by_item = self.get_demand_arrays_for_items(batch_ids)
+            
             try:
-                # Call reforecast_item
-                success = self.reforecast_item(item.id)
-                
-                if success:
-                    results['processed'] += 1
+                batch_items = self.session.query(Item).filter(Item.id.in_(batch_ids)).all()
+                batch_errors = []
+                reforecasted = self.reforecast_items(
+                    batch_items, demand_by_item, run_ts, errors=batch_errors
+                )
+                self.session.commit()
+                results['processed'] += len(reforecasted)
+                results['errors'] += len(batch_errors)
+                results['error_items'].extend(batch_errors)
+                continue
             except Exception as e:
-                logger.error(f"Error reforecasting item {item.id}: {str(e)}")
-                results['errors'] += 1
-                results['error_items'].append({
-                    'item_id': item.id,
-                    'error': str(e)
-                })
+                self.session.rollback()
+                logger.warning(f"Batch reforecast failed, retrying items individually: {str(e)}")
+            
+            # Fall back to one item at a time so a bad item only fails itself
+            for item_id in batch_ids:
+                try:
+                    # Call reforecast_item
+                    success = self.reforecast_item(
+                        item_id, demands=demand_by_item[item_id], forecast_date=run_ts
+                    )
+                    
+                    if success:
+                        results['processed'] += 1
+                except Exception as e:
+                    logger.error(f"Error reforecasting item {item_id}: {str(e)}")
+                    results['errors'] += 1
+                    results['error_items'].append({
+                        'item_id': item_id,
+                        'error': str(e)
+                    })
         
         return results
     
@@ -788,8 +1209,8 @@ class ForecastService:
         Returns:
             Dictionary with exception detection results
         """
-        # Build query to get items
-        query = self.session.query(Item)
+        # Build query to get only the item columns the checks need
+        query = self.session.query(*Item.forecast_columns)
         
         # Apply filters
         if warehouse_id:
@@ -814,13 +1235,26 @@ class ForecastService:
         
         items = query.all()
         
+        # Load every item's latest history period up front instead of one
+        # query per item
+        latest_history_by_item = {}
+        for start in range(0, len(items), HISTORY_BATCH_SIZE):
+            latest_history_by_item.update(self.get_demand_history_for_items(
+                [item.id for item in items[start:start + HISTORY_BATCH_SIZE]],
+                latest_only=True
+            ))
+        
+        # Read company settings once; the flagged-item loop below reuses them
+        settings = self.company_settings
+        tracking_signal_limit = settings['tracking_signal_limit']
+        
         # Get latest period
         current_period, current_year = get_current_period(
-            self.company_settings['forecasting_periodicity_default']
+            settings['forecasting_periodicity_default']
         )
         previous_period, previous_year = get_previous_period(
             current_period, current_year, 
-            self.company_settings['forecasting_periodicity_default']
+            settings['forecasting_periodicity_default']
         )
         
         # Process results
@@ -836,105 +1270,106 @@ class ForecastService:
             'error_items': []
         }
         
-        # Process each item
-        for item in items:
+        # Pair each item with its latest history period
+        checked = [
+            (item, latest_history_by_item[item.id][0])
+            for item in items
+            if latest_history_by_item[item.id]
+        ]
+        
+        # Evaluate every check for all items in one vector pass; items are
+        # only visited below when at least one check fires
+        forecasts = np.array([item.demand_4weekly for item, _ in checked], dtype=np.float64)
+        actuals = np.array([latest['total_demand'] for _, latest in checked], dtype=np.float64)
+        madps = np.array([item.madp for item, _ in checked], dtype=np.float64)
+        tracks = np.array([item.track for item, _ in checked], dtype=np.float64)
+        service_attained = np.array([item.service_level_attained for item, _ in checked], dtype=np.float64)
+        service_goals = np.array([item.service_level_goal for item, _ in checked], dtype=np.float64)
+        
+        # Demand filter checks
+        high_mask, low_mask = detect_demand_spikes(
+            forecasts,
+            actuals,
+            madps,
+            settings['demand_filter_high'],
+            settings['demand_filter_low']
+        )
+        
+        with np.errstate(invalid='ignore'):
+            # Tracking signal checks
+            track_mask = tracks >= tracking_signal_limit
+            
+            # Service level checks
+            service_mask = service_attained < service_goals
+            
+            # Infinity checks - for items with zero forecast but demand > 0
+            infinity_mask = (forecasts == 0) & (actuals > 0)
+        
+        flagged = np.flatnonzero(high_mask | low_mask | track_mask | service_mask | infinity_mask)
+        
+        # Look up open exceptions for the flagged items once, so duplicates
+        # are skipped without a query per exception
+        existing_exceptions = self._get_open_history_exception_keys(
+            [checked[i][0].id for i in flagged]
+        )
+        
+        # Collect new exceptions and insert them in one statement below
+        new_exceptions = []
+        created_counts = {}
+        creation_date = datetime.now()
+        
+        # Process each flagged item
+        for i in flagged:
+            item, latest_history = checked[i]
             try:
-                # Get latest history
-                history = self.get_item_demand_history(item.id, periods=1)
-                if not history:
-                    continue
+                exception_types = []
                 
-                latest_history = history[0]
+                if high_mask[i]:
+                    exception_types.append((DEMAND_FILTER_HIGH, 'demand_filter_high'))
+                elif low_mask[i]:
+                    exception_types.append((DEMAND_FILTER_LOW, 'demand_filter_low'))
                 
-                # Demand filter checks
-                demand_exception = detect_demand_spike(
-                    item.demand_4weekly,
-                    latest_history['total_demand'],
-                    item.madp,
-                    self.company_settings['demand_filter_high'],
-                    self.company_settings['demand_filter_low']
-                )
+                if track_mask[i]:
+                    # Direction is decided per item by the tracking signal check
+                    if detect_tracking_signal_exception(
+                        item.track, tracking_signal_limit
+                    ) == 'HIGH':
+                        exception_types.append((TRACKING_SIGNAL_HIGH, 'tracking_signal_high'))
+                    else:
+                        exception_types.append((TRACKING_SIGNAL_LOW, 'tracking_signal_low'))
                 
-                # Tracking signal checks
-                tracking_exception = detect_tracking_signal_exception(
-                    item.track,
-                    self.company_settings['tracking_signal_limit']
-                )
+                if service_mask[i]:
+                    exception_types.append((SERVICE_LEVEL_CHECK, 'service_level_check'))
                 
-                # Create exceptions
-                if demand_exception == 'HIGH':
-                    self._create_history_exception(
-                        item.id, 'DEMAND_FILTER_HIGH', 
-                        latest_history['period_number'], 
-                        latest_history['period_year'],
-                        forecast_value=item.demand_4weekly,
-                        actual_value=latest_history['total_demand'],
-                        madp=item.madp,
-                        track=item.track
-                    )
-                    results['demand_filter_high'] += 1
-                    
-                elif demand_exception == 'LOW':
-                    self._create_history_exception(
-                        item.id, 'DEMAND_FILTER_LOW', 
-                        latest_history['period_number'], 
-                        latest_history['period_year'],
-                        forecast_value=item.demand_4weekly,
-                        actual_value=latest_history['total_demand'],
-                        madp=item.madp,
-                        track=item.track
-                    )
-                    results['demand_filter_low'] += 1
+                if infinity_mask[i]:
+                    exception_types.append((INFINITY_CHECK, 'infinity_check'))
                 
-                if tracking_exception == 'HIGH':
-                    self._create_history_exception(
-                        item.id, 'TRACKING_SIGNAL_HIGH', 
-                        latest_history['period_number'], 
-                        latest_history['period_year'],
-                        forecast_value=item.demand_4weekly,
-                        actual_value=latest_history['total_demand'],
-                        madp=item.madp,
-                        track=item.track
-                    )
-                    results['tracking_signal_high'] += 1
+                # Queue exceptions
+                for exception_type, result_key in exception_types:
+                    created_counts[result_key] = created_counts.get(result_key, 0) + 1
                     
-                elif tracking_exception == 'LOW':
-                    self._create_history_exception(
-                        item.id, 'TRACKING_SIGNAL_LOW', 
-                        latest_history['period_number'], 
-                        latest_history['period_year'],
-                        forecast_value=item.demand_4weekly,
-                        actual_value=latest_history['total_demand'],
-                        madp=item.madp,
-                        track=item.track
-                    )
-                    results['tracking_signal_low'] += 1
-                
-                # Service level checks
-                if item.service_level_attained < item.service_level_goal:
-                    self._create_history_exception(
-                        item.id, 'SERVICE_LEVEL_CHECK', 
-                        latest_history['period_number'], 
-                        latest_history['period_year'],
-                        forecast_value=item.demand_4weekly,
-                        actual_value=latest_history['total_demand'],
-                        madp=item.madp,
-                        track=item.track
-                    )
-                    results['service_level_check'] += 1
-                
-                # Infinity checks - for items with zero forecast but demand > 0
-                if item.demand_4weekly == 0 and latest_history['total_demand'] > 0:
-                    self._create_history_exception(
-                        item.id, 'INFINITY_CHECK', 
-                        latest_history['period_number'], 
-                        latest_history['period_year'],
-                        forecast_value=item.demand_4weekly,
-                        actual_value=latest_history['total_demand'],
-                        madp=item.madp,
-                        track=item.track
+                    key = (
+                        item.id, exception_type,
+                        latest_history['period_number'],
+                        latest_history['period_year']
                     )
-                    results['infinity_check'] += 1
+                    if key in existing_exceptions:
+                        continue
+                    existing_exceptions.add(key)
+                    
+                    new_exceptions.append({
+                        'item_id': item.id,
+                        'exception_type': exception_type,
+                        'creation_date': creation_date,
+                        'period_number': latest_history['period_number'],
+                        'period_year': latest_history['period_year'],
+                        'forecast_value': item.demand_4weekly,
+                        'actual_value': latest_history['total_demand'],
+                        'madp': item.madp,
+                        'track': item.track,
+                        'notes': None,
+                        'is_resolved': False
+                    })
                 
             except Exception as e:
                 logger.error(f"Error detecting exceptions for item {item.id}: {str(e)}")
@@ -944,67 +1379,47 @@ class ForecastService:
                     'error': str(e)
                 })
         
+        if new_exceptions:
+            try:
+                self.session.bulk_insert_mappings(HistoryException, new_exceptions)
+                self.session.commit()
+            except Exception as e:
+                self.session.rollback()
+                logger.error(f"Failed to create history exceptions: {str(e)}")
+                results['errors'] += 1
+                return results
+        
+        for result_key, count in created_counts.items():
+            results[result_key] += count
+        
         return results
     
-    def _create_history_exception(
-        self,
-        item_id: int,
-        exception_type: str,
-        period_number: int,
-        period_year: int,
-        forecast_value: float = None,
-        actual_value: float = None,
-        madp: float = None,
-        track: float = None,
-        notes: str = None
-    ):
-        """Create a history exception record.
+    def _get_open_history_exception_keys(self, item_ids: List[int]) -> Set[Tuple]:
+        """Get the keys of unresolved history exceptions for a set of items.
         
         Args:
-            item_id: Item ID
-            exception_type: Exception type
-            period_number: Period number
-            period_year: Period year
-            forecast_value: Forecast value
-            actual_value: Actual value
-            madp: MADP value
-            track: Track value
-            notes: Optional notes
+            item_ids: Item IDs
+            
+        Returns:
+            Set of (item_id, exception_type, period_number, period_year) tuples
         """
-        # Check if exception already exists
-        existing_exception = self.session.query(HistoryException).filter(
-            HistoryException.item_id == item_id,
-            HistoryException.exception_type == exception_type,
-            HistoryException.period_number == period_number,
-            HistoryException.period_year == period_year,
-            HistoryException.is_resolved == False
-        ).first()
-        
-        if existing_exception:
-            return
-        
-        # Create new exception
-        exception = HistoryException(
-            item_id=item_id,
-            exception_type=exception_type,
-            creation_date=datetime.now(),
-            period_number=period_number,
-            period_year=period_year,
-            forecast_value=forecast_value,
-            actual_value=actual_value,
-            madp=madp,
-            track=track,
-            notes=notes,
-            is_resolved=False
-        )
-        
-        self.session.add(exception)
+        keys = set()
+        item_ids = list(item_ids)
+        
+        for start in range(0, len(item_ids), HISTORY_BATCH_SIZE):
+            keys.update(
+                tuple(row) for row in self.session.query(
+                    HistoryException.item_id,
+                    HistoryException.exception_type,
+                    HistoryException.period_number,
+                    HistoryException.period_year
+                ).filter(
+                    HistoryException.item_id.in_(item_ids[start:start + HISTORY_BATCH_SIZE]),
+                    HistoryException.is_resolved == False
+                )
+            )
         
-        try:
-            self.session.commit()
-        except Exception as e:
-            self.session.rollback()
-            logger.error(f"Failed to create history exception: {str(e)}")
+        return keys
     
     def get_history_exceptions(
         self,
@@ -1114,14 +1529,19 @@ class ForecastService:
     def get_current_period(self, periodicity: int) -> Tuple[int, int]:
         """Get the current period number and year.
         
+        The period is resolved once per periodicity for the lifetime of the
+        service, which is a single batch run, so item loops do not recompute
+        it for every item.
+        
         Args:
             periodicity: Periodicity (12=monthly, 13=4-weekly, 52=weekly)
             
         Returns:
             Tuple with period number and year
         """
-        from ..utils.date_utils import get_current_period as get_period
-        return get_period(periodicity)
+        if periodicity not in self._current_period_cache:
+            self._current_period_cache[periodicity] = get_current_period(periodicity)
+        return self._current_period_cache[periodicity]
 
 # Add these methods to your ForecastService class in warehouse_replenishment/services/forecast_service.py
 
@@ -1279,8 +1699,16 @@ class ForecastService:
         Returns:
             Dictionary with accuracy metrics
         """
-        # Get forecasts with actual values for this item
-        forecasts = self.session.query(ItemForecast).filter(
+        # Get forecasts with actual values for this item; only the columns
+        # covered by idx_item_forecast_item_period are read
+        forecasts = self.session.query(
+            ItemForecast.period_number,
+            ItemForecast.period_year,
+            ItemForecast.forecast_value,
+            ItemForecast.actual_value,
+            ItemForecast.error,
+            ItemForecast.error_pct
+        ).filter(
             ItemForecast.item_id == item_id,
             ItemForecast.actual_value.isnot(None)
         ).order_by(
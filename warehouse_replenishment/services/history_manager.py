@@ -11,11 +11,11 @@ parent_dir = str(Path(__file__).parent.parent.parent)
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, tuple_
 from sqlalchemy.orm import Session
 
 from warehouse_replenishment.models import (
-    Item, DemandHistory, Company, SeasonalProfile, SeasonalProfileIndex, 
+    Item, DemandHistory, Company, SeasonalProfile, 
     ArchivedHistoryException
 )
 from warehouse_replenishment.core.demand_forecast import (
@@ -41,6 +41,7 @@ class HistoryManager:
         """
         self.session = session
         self._company_settings = None
+        self._seasonal_indices_cache = {}
     
     @property
     def company_settings(self) -> Dict:
@@ -88,7 +89,7 @@ class HistoryManager:
             ID of the created history period
         """
         # Check if period already exists
-        existing_period = self.session.query(DemandHistory).filter(
+        existing_period = self.session.query(DemandHistory.id).filter(
             DemandHistory.item_id == item_id,
             DemandHistory.period_number == period_number,
             DemandHistory.period_year == period_year
@@ -283,18 +284,12 @@ class HistoryManager:
         current_period_index = None
         
         if item.demand_profile:
-            # Get profile
-            profile = self.session.query(SeasonalProfile).filter(
-                SeasonalProfile.profile_id == item.demand_profile
-            ).first()
+            # Reuse the profile's indices if this manager already loaded them
+            seasonal_indices = SeasonalProfile.cached_index_values(
+                self.session, item.demand_profile, self._seasonal_indices_cache
+            )
             
-            if profile:
-                # Get indices
-                indices = self.session.query(SeasonalProfileIndex).filter(
-                    SeasonalProfileIndex.profile_id == profile.profile_id
-                ).order_by(SeasonalProfileIndex.period_number).all()
-                
-                seasonal_indices = [index.index_value for index in indices]
+            if seasonal_indices is not None:
                 current_period_index = period_number - 1  # Convert to 0-based index
         
         # Calculate lost sales
@@ -458,8 +453,17 @@ class HistoryManager:
         if not target_item:
             raise ForecastError(f"Target item with ID {target_item_id} not found")
         
-        # Get source history periods
-        query = self.session.query(DemandHistory).filter(
+        # Get source history periods - only the columns being copied are
+        # needed, so avoid building full ORM entities for the source item
+        query = self.session.query(
+            DemandHistory.period_year,
+            DemandHistory.period_number,
+            DemandHistory.shipped,
+            DemandHistory.lost_sales,
+            DemandHistory.promotional_demand,
+            DemandHistory.out_of_stock_days,
+            DemandHistory.is_ignored
+        ).filter(
             DemandHistory.item_id == source_item_id
         )
         
@@ -475,14 +479,27 @@ class HistoryManager:
             'errors': 0
         }
         
+        # Find which of the source periods the target already has in one query
+        # rather than checking period by period
+        existing_target_periods = set()
+        if source_periods:
+            existing_target_periods = set(
+                self.session.query(
+                    DemandHistory.period_year, DemandHistory.period_number
+                ).filter(
+                    DemandHistory.item_id == target_item_id,
+                    tuple_(DemandHistory.period_year, DemandHistory.period_number).in_(
+                        [(period.period_year, period.period_number) for period in source_periods]
+                    )
+                )
+            )
+        
         for source_period in source_periods:
             try:
                 # Check if target period already exists
-                target_period = self.session.query(DemandHistory).filter(
-                    DemandHistory.item_id == target_item_id,
-                    DemandHistory.period_number == source_period.period_number,
-                    DemandHistory.period_year == source_period.period_year
-                ).first()
+                target_period = (
+                    (source_period.period_year, source_period.period_number) in existing_target_periods
+                )
                 
                 # Apply multiple to values
                 new_shipped = source_period.shipped * apply_multiple
@@ -11,24 +11,44 @@ parent_dir = str(Path(__file__).parent.parent.parent)
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
-from sqlalchemy import and_, func, or_
+from sqlalchemy import and_, func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from warehouse_replenishment.models import (
     Item, DemandHistory, Company, Vendor, SeasonalProfile, 
-    SeasonalProfileIndex, HistoryException, Warehouse, Item, 
+    HistoryException, Warehouse, Item, 
+    BuyerClassCode, SystemClassCode
 )
 from warehouse_replenishment.core.demand_forecast import (
-    calculate_lost_sales, adjust_history_value
+    calculate_lost_sales, adjust_history_value, calculate_forecast_horizons
 )
 from warehouse_replenishment.core.safety_stock import (
     calculate_safety_stock, calculate_safety_stock_units
 )
+from warehouse_replenishment.utils.date_utils import get_current_period
 from warehouse_replenishment.exceptions import ItemError
 
 from warehouse_replenishment.logging_setup import logger
 logger = logging.getLogger(__name__)
 
+# Item columns update_item may write, resolved once at import rather than
+# probed per field on each call. The primary key and server-computed columns
+# such as available_balance are never written directly
+ITEM_UPDATE_COLUMNS = frozenset(
+    column.key for column in Item.__table__.columns
+    if not column.primary_key and column.computed is None
+)
+
+# DemandHistory columns returned by history lookups and carried over on transfer
+HISTORY_TRANSFER_COLUMNS = (
+    'period_number', 'period_year', 'shipped', 'lost_sales', 'promotional_demand',
+    'total_demand', 'is_ignored', 'is_adjusted', 'out_of_stock_days'
+)
+
+# Number of items whose history is loaded per IN query
+ITEM_BATCH_SIZE = 1000
+
 
 
 class ItemService:
@@ -42,6 +62,7 @@ class ItemService:
         """
         self.session = session
         self._company_settings = None
+        self._seasonal_indices_cache = {}
     
     @property
     def company_settings(self) -> Dict:
@@ -128,7 +149,10 @@ class ItemService:
             query = query.filter(Item.vendor_id == vendor_id)
             
         if buyer_id is not None:
-            query = query.filter(Item.buyer_id == buyer_id)
+            # Buyers are assigned at vendor level
+            query = query.join(Vendor, Item.vendor_id == Vendor.id).filter(
+                Vendor.buyer_id == buyer_id
+            )
             
         if item_group is not None:
             # Search within item group codes using LIKE
@@ -138,7 +162,7 @@ class ItemService:
             query = query.filter(Item.buyer_class.in_(buyer_class))
         elif active_only:
             # Default to active items (Regular or Watch)
-            query = query.filter(Item.buyer_class.in_(['R', 'W']))
+            query = query.filter(Item.buyer_class.in_([BuyerClassCode.REGULAR, BuyerClassCode.WATCH]))
             
         if system_class:
             query = query.filter(Item.system_class.in_(system_class))
@@ -182,13 +206,15 @@ class ItemService:
             ID of the created item
         """
         # Check if item already exists
-        existing_item = self.session.query(Item).filter(
-            Item.item_id == item_id,
-            Item.vendor_id == vendor_id,
-            Item.warehouse_id == warehouse_id
-        ).first()
+        item_exists = self.session.query(
+            self.session.query(Item.id).filter(
+                Item.item_id == item_id,
+                Item.vendor_id == vendor_id,
+                Item.warehouse_id == warehouse_id
+            ).exists()
+        ).scalar()
         
-        if existing_item:
+        if item_exists:
             raise ItemError(f"Item with ID {item_id} already exists for vendor {vendor_id} in warehouse {warehouse_id}")
         
         # Get vendor
@@ -245,7 +271,7 @@ class ItemService:
             # Update vendor active items count
             vendor.active_items_count = self.session.query(func.count(Item.id)).filter(
                 Item.vendor_id == vendor_id,
-                Item.buyer_class.in_(['R', 'W'])
+                Item.buyer_class.in_([BuyerClassCode.REGULAR, BuyerClassCode.WATCH])
             ).scalar() or 0
             
             self.session.commit()
@@ -273,14 +299,26 @@ class ItemService:
         if not item:
             raise ItemError(f"Item with ID {item_id} not found")
         
-        # Update fields
+        # Keep only writable columns so the changes go out as a single UPDATE
+        values = {}
         for field, value in updates.items():
-            if hasattr(item, field):
-                setattr(item, field, value)
+            if field in ITEM_UPDATE_COLUMNS:
+                values[field] = value
             else:
-                logger.warning(f"Field {field} does not exist on Item model")
+                logger.warning(f"Field {field} is not an updatable column on Item model")
         
         try:
+            if values:
+                self.session.execute(
+                    update(Item)
+                    .where(Item.id == item_id)
+                    .values(values)
+                    .execution_options(synchronize_session=False)
+                )
+                # Expire the whole item so computed columns such as
+                # available_balance are reloaded along with the new values
+                self.session.expire(item)
+            
             self.session.commit()
             return True
         except Exception as e:
@@ -322,7 +360,7 @@ class ItemService:
                 if vendor:
                     vendor.active_items_count = self.session.query(func.count(Item.id)).filter(
                         Item.vendor_id == item.vendor_id,
-                        Item.buyer_class.in_(['R', 'W'])
+                        Item.buyer_class.in_([BuyerClassCode.REGULAR, BuyerClassCode.WATCH])
                     ).scalar() or 0
                     
                     self.session.commit()
@@ -529,16 +567,14 @@ class ItemService:
         if not item:
             raise ItemError(f"Item with ID {item_id} not found")
         
-        # Calculate available balance
-        balance = item.on_hand + item.on_order
+        # The balance is generated by the database, so write any pending stock
+        # changes and reload it before reading
+        if self.session.is_modified(item):
+            self.session.flush()
+            self.session.refresh(item, ['available_balance'])
         
-        # Subtract customer back order
-        if item.customer_back_order:
-            balance -= item.customer_back_order
-        
-        # Subtract reserved quantity
-        if item.reserved:
-            balance -= item.reserved
+        # Stored balance already nets out back orders and reserved quantity
+        balance = item.available_balance or 0.0
         
         # Subtract held quantity if still within hold date
         if item.quantity_held and item.held_until and item.held_until >= date.today():
@@ -643,7 +679,7 @@ class ItemService:
             query = query.filter(Item.id == item_id)
         
         # Only include active items
-        query = query.filter(Item.buyer_class.in_(['R', 'W']))
+        query = query.filter(Item.buyer_class.in_([BuyerClassCode.REGULAR, BuyerClassCode.WATCH]))
         
         # Get all items
         items = query.all()
@@ -659,15 +695,25 @@ class ItemService:
         periodicity = self.company_settings['history_periodicity_default']
         current_period, current_year = get_current_period(periodicity)
         
+        # Load the current history period for all items up front instead of
+        # one query per item
+        history_by_item = {}
+        for start in range(0, len(items), ITEM_BATCH_SIZE):
+            batch_ids = [item.id for item in items[start:start + ITEM_BATCH_SIZE]]
+            history_by_item.update(
+                (history.item_id, history)
+                for history in self.session.query(DemandHistory).filter(
+                    DemandHistory.item_id.in_(batch_ids),
+                    DemandHistory.period_number == current_period,
+                    DemandHistory.period_year == current_year
+                )
+            )
+        
         # Process each item
         for item in items:
             try:
                 # Get history period
-                history_period = self.session.query(DemandHistory).filter(
-                    DemandHistory.item_id == item.id,
-                    DemandHistory.period_number == current_period,
-                    DemandHistory.period_year == current_year
-                ).first()
+                history_period = history_by_item.get(item.id)
                 
                 if not history_period:
                     # Create new history period if it doesn't exist
@@ -696,18 +742,12 @@ class ItemService:
                 current_period_index = None
                 
                 if item.demand_profile:
-                    # Get profile
-                    profile = self.session.query(SeasonalProfile).filter(
-                        SeasonalProfile.profile_id == item.demand_profile
-                    ).first()
+                    # Items sharing a profile reuse its already loaded indices
+                    seasonal_indices = SeasonalProfile.cached_index_values(
+                        self.session, item.demand_profile, self._seasonal_indices_cache
+                    )
                     
-                    if profile:
-                        # Get indices
-                        indices = self.session.query(SeasonalProfileIndex).filter(
-                            SeasonalProfileIndex.profile_id == profile.profile_id
-                        ).order_by(SeasonalProfileIndex.period_number).all()
-                        
-                        seasonal_indices = [index.index_value for index in indices]
+                    if seasonal_indices is not None:
                         current_period_index = current_period - 1  # Convert to 0-based index
                 
                 # Calculate lost sales
@@ -765,10 +805,11 @@ class ItemService:
         
         # Update forecast values
         item.demand_4weekly = initial_forecast
-        item.demand_weekly = initial_forecast / 4
-        item.demand_monthly = initial_forecast * (365/12) / (365/13)
-        item.demand_quarterly = initial_forecast * 3
-        item.demand_yearly = initial_forecast * 13
+        horizons = calculate_forecast_horizons(initial_forecast)
+        item.demand_weekly = horizons['weekly']
+        item.demand_monthly = horizons['monthly']
+        item.demand_quarterly = horizons['quarterly']
+        item.demand_yearly = horizons['yearly']
         
         # Set initial MADP and track
         item.madp = 20  # Default MADP for new items
@@ -799,7 +840,7 @@ class ItemService:
     
     def get_uninitialized_items(
         self,
-        warehouse_id: Optional[instrt] = None,
+        warehouse_id: Optional[int] = None,
         vendor_id: Optional[int] = None
     ) -> List[Item]:
         """Get all uninitialized items.
@@ -876,38 +917,20 @@ class ItemService:
             raise ItemError(f"Vendor with ID {new_vendor_id} not found")
         
         # Check if item already exists for new vendor
-        existing_item = self.session.query(Item).filter(
-            Item.item_id == item.item_id,
-            Item.vendor_id == new_vendor_id,
-            Item.warehouse_id == item.warehouse_id
-        ).first()
+        item_exists = self.session.query(
+            self.session.query(Item.id).filter(
+                Item.item_id == item.item_id,
+                Item.vendor_id == new_vendor_id,
+                Item.warehouse_id == item.warehouse_id
+            ).exists()
+        ).scalar()
         
-        if existing_item:
+        if item_exists:
             raise ItemError(f"Item with ID {item.item_id} already exists for vendor {new_vendor_id} in warehouse {item.warehouse_id}")
         
         # Store old vendor ID
         old_vendor_id = item.vendor_id
         
-        # Get history data to transfer
-        history_data = []
-        if transfer_history:
-            history_records = self.session.query(DemandHistory).filter(
-                DemandHistory.item_id == item_id
-            ).all()
-            
-            for record in history_records:
-                history_data.append({
-                    'period_number': record.period_number,
-                    'period_year': record.period_year,
-                    'shipped': record.shipped,
-                    'lost_sales': record.lost_sales,
-                    'promotional_demand': record.promotional_demand,
-                    'total_demand': record.total_demand,
-                    'is_ignored': record.is_ignored,
-                    'is_adjusted': record.is_adjusted,
-                    'out_of_stock_days': record.out_of_stock_days
-                })
-        
         # Store stock status
         stock_status = None
         if transfer_stock_status:
@@ -985,46 +1008,46 @@ class ItemService:
         
         # Copy history if needed
         if copy_history:
-            # Get history records for source item
-            history_records = self.session.query(DemandHistory).filter(
-                DemandHistory.item_id == from_item_id
-            ).all()
+            # Copy every source period in one INSERT ... SELECT; periods the
+            # target already has are merged by adding the source quantities
+            history = DemandHistory.__table__
+            insert_stmt = pg_insert(history).from_select(
+                [
+                    'item_id', 'period_number', 'period_year', 'shipped',
+                    'lost_sales', 'promotional_demand', 'total_demand',
+                    'is_ignored', 'is_adjusted', 'out_of_stock_days'
+                ],
+                select(
+                    literal(to_item_id),
+                    history.c.period_number,
+                    history.c.period_year,
+                    history.c.shipped,
+                    history.c.lost_sales,
+                    history.c.promotional_demand,
+                    history.c.total_demand,
+                    history.c.is_ignored,
+                    history.c.is_adjusted,
+                    history.c.out_of_stock_days
+                ).where(history.c.item_id == from_item_id)
+            )
             
-            # Copy history to target item
-            for record in history_records:
-                # Check if history already exists for target item
-                existing_record = self.session.query(DemandHistory).filter(
-                    DemandHistory.item_id == to_item_id,
-                    DemandHistory.period_number == record.period_number,
-                    DemandHistory.period_year == record.period_year
-                ).first()
-                
-                if existing_record:
-                    # Update existing record
-                    existing_record.shipped += record.shipped
-                    existing_record.lost_sales += record.lost_sales
-                    existing_record.promotional_demand += record.promotional_demand
-                    existing_record.total_demand = (
-                        existing_record.shipped + 
-                        existing_record.lost_sales - 
-                        existing_record.promotional_demand
-                    )
-                    existing_record.is_adjusted = True
-                else:
-                    # Create new record
-                    new_record = DemandHistory(
-                        item_id=to_item_id,
-                        period_number=record.period_number,
-                        period_year=record.period_year,
-                        shipped=record.shipped,
-                        lost_sales=record.lost_sales,
-                        promotional_demand=record.promotional_demand,
-                        total_demand=record.total_demand,
-                        is_ignored=record.is_ignored,
-                        is_adjusted=record.is_adjusted,
-                        out_of_stock_days=record.out_of_stock_days
-                    )
-                    self.session.add(new_record)
+            excluded = insert_stmt.excluded
+            shipped = history.c.shipped + excluded.shipped
+            lost_sales = history.c.lost_sales + excluded.lost_sales
+            promotional_demand = history.c.promotional_demand + excluded.promotional_demand
+            
+            self.session.execute(
+                insert_stmt.on_conflict_do_update(
+                    index_elements=['item_id', 'period_year', 'period_number'],
+                    set_={
+                        'shipped': shipped,
+                        'lost_sales': lost_sales,
+                        'promotional_demand': promotional_demand,
+                        'total_demand': shipped + lost_sales - promotional_demand,
+                        'is_adjusted': True
+                    }
+                )
+            )
         
         # Set auxiliary balance on target item
         to_item.auxiliary_balance = from_item.on_hand
@@ -1115,7 +1138,9 @@ class ItemService:
         Returns:
             List of demand history dictionaries
         """
-        query = self.session.query(DemandHistory).filter(
+        query = self.session.query(
+            *[getattr(DemandHistory, column) for column in HISTORY_TRANSFER_COLUMNS]
+        ).filter(
             DemandHistory.item_id == item_id
         )
         
@@ -1134,19 +1159,6 @@ class ItemService:
         results = query.all()
         
         # Convert to dictionaries
-        history = [
-            {
-                'period_number': record.period_number,
-                'period_year': record.period_year,
-                'shipped': record.shipped,
-                'lost_sales': record.lost_sales,
-                'promotional_demand': record.promotional_demand,
-                'total_demand': record.total_demand,
-                'is_ignored': record.is_ignored,
-                'is_adjusted': record.is_adjusted,
-                'out_of_stock_days': record.out_of_stock_days
-            }
-            for record in results
-        ]
+        history = [record._asdict() for record in results]
         
         return history
\ No newline at end of file
@@ -7,7 +7,7 @@ import sys
 import os
 from pathlib import Path
 
-from sqlalchemy import and_, func, or_
+from sqlalchemy import and_, func, or_, update
 from sqlalchemy.orm import Session
 
 # Add the parent directory to the path so we can import our modules
@@ -18,7 +18,7 @@ if parent_dir not in sys.path:
     
 from warehouse_replenishment.models import (
     Item, Order, OrderItem, Vendor, VendorBracket, Company,
-    BuyerClassCode, VendorType
+    BuyerClassCode, VendorType, OrderStatus, ORDER_STATUS_CODES
 )
 from warehouse_replenishment.core.order_policy import (
     analyze_order_policy, calculate_acquisition_cost,
@@ -33,6 +33,12 @@ from warehouse_replenishment.exceptions import OrderError
 from warehouse_replenishment.logging_setup import logger
 logger = logging.getLogger(__name__)
 
+# Maximum number of IDs bound into a single IN (...) clause
+BULK_CHUNK_SIZE = 1000
+
+# Number of rows sent per batched INSERT
+BULK_INSERT_CHUNK_SIZE = 10000
+
 class OrderService:
     """Service for handling order-related operations."""
     
@@ -44,6 +50,7 @@ class OrderService:
         """
         self.session = session
         self._company_settings = None
+        self._vendor_cache = {}
     
     @property
     def company_settings(self) -> Dict:
@@ -67,6 +74,52 @@ class OrderService:
         
         return self._company_settings
     
+    def _get_vendor(self, vendor_id: int) -> Optional[Vendor]:
+        """Get a vendor by ID, reusing previously loaded vendors.
+        
+        Args:
+            vendor_id: Vendor ID
+            
+        Returns:
+            Vendor object or None if not found
+        """
+        if vendor_id not in self._vendor_cache:
+            self._vendor_cache[vendor_id] = self.session.query(Vendor).get(vendor_id)
+        return self._vendor_cache[vendor_id]
+    
+    def _get_vendor_brackets(self, vendor_id: int) -> List[VendorBracket]:
+        """Get a vendor's brackets ordered by bracket number.
+        
+        Brackets are loaded with the cached vendor, so repeated bracket
+        checks while building an order do not query the database again.
+        
+        Args:
+            vendor_id: Vendor ID
+            
+        Returns:
+            List of vendor bracket objects
+        """
+        vendor = self._get_vendor(vendor_id)
+        return list(vendor.brackets) if vendor else []
+    
+    def preload_vendors(self, vendor_ids: List[int]) -> Dict[int, Vendor]:
+        """Load vendors in one query and cache them for later lookups.
+        
+        Args:
+            vendor_ids: List of vendor IDs
+            
+        Returns:
+            Dictionary mapping vendor ID to vendor object
+        """
+        missing = [v_id for v_id in set(vendor_ids) if v_id not in self._vendor_cache]
+        
+        for i in range(0, len(missing), BULK_CHUNK_SIZE):
+            chunk = missing[i:i + BULK_CHUNK_SIZE]
+            for vendor in self.session.query(Vendor).filter(Vendor.id.in_(chunk)):
+                self._vendor_cache[vendor.id] = vendor
+        
+        return {v_id: self._vendor_cache.get(v_id) for v_id in vendor_ids}
+    
     def get_order(self, order_id: int) -> Optional[Order]:
         """Get an order by ID.
         
@@ -163,7 +216,7 @@ class OrderService:
             ID of the created order
         """
         # Check if vendor exists
-        vendor = self.session.query(Vendor).get(vendor_id)
+        vendor = self._get_vendor(vendor_id)
         if not vendor:
             raise OrderError(f"Vendor with ID {vendor_id} not found")
             
@@ -278,6 +331,70 @@ class OrderService:
             self.session.rollback()
             raise OrderError(f"Failed to add item to order: {str(e)}")
     
+    def bulk_add_items_to_order(
+        self,
+        order_id: int,
+        items_data: List[Dict]
+    ) -> int:
+        """Add many items to an order with batched INSERT statements.
+        
+        Order totals are recalculated once after all rows are inserted and the
+        whole batch is committed in a single transaction.
+        
+        Args:
+            order_id: Order ID
+            items_data: List of dictionaries with an 'item' object, 'soq_units'
+                and optional check flags (is_order_point, is_manual, ...)
+            
+        Returns:
+            Number of order items created
+        """
+        order = self.get_order(order_id)
+        if not order:
+            raise OrderError(f"Order with ID {order_id} not found")
+        
+        rows = []
+        for item_data in items_data:
+            item = item_data['item']
+            soq_units = item_data['soq_units']
+            
+            # Calculate SOQ in days
+            daily_demand = item.demand_4weekly / 28  # Assuming 28 days in a 4-weekly period
+            soq_days = round(soq_units / daily_demand, 1) if daily_demand > 0 else 0
+            
+            rows.append({
+                'order_id': order_id,
+                'item_id': item.id,
+                'soq_units': soq_units,
+                'soq_days': soq_days,
+                'is_frozen': item_data.get('is_frozen', False),
+                'is_order_point': item_data.get('is_order_point', False),
+                'is_manual': item_data.get('is_manual', False),
+                'is_deal': item_data.get('is_deal', False),
+                'is_planned': item_data.get('is_planned', False),
+                'is_forward_buy': item_data.get('is_forward_buy', False),
+                'item_order_point_units': item.item_order_point_units,
+                'balance_units': item.on_hand + item.on_order,
+                'order_up_to_level_units': item.order_up_to_level_units
+            })
+        
+        try:
+            # executemany in bounded pages keeps round-trips and memory low
+            for i in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+                self.session.execute(
+                    OrderItem.__table__.insert(),
+                    rows[i:i + BULK_INSERT_CHUNK_SIZE]
+                )
+            
+            # Update order totals
+            self._update_order_totals(order)
+            
+            self.session.commit()
+            return len(rows)
+        except Exception as e:
+            self.session.rollback()
+            raise OrderError(f"Failed to add items to order: {str(e)}")
+    
     def remove_item_from_order(
         self,
         order_id: int,
@@ -412,8 +529,8 @@ class OrderService:
         
         # Calculate totals
         for order_item in order_items:
-            # Get item
-            item = self.session.query(Item).get(order_item.item_id)
+            # Item is joined-loaded with the order item
+            item = order_item.item
             if not item:
                 continue
                 
@@ -467,9 +584,7 @@ class OrderService:
             order: Order object
         """
         # Get vendor brackets
-        brackets = self.session.query(VendorBracket).filter(
-            VendorBracket.vendor_id == order.vendor_id
-        ).order_by(VendorBracket.bracket_number).all()
+        brackets = self._get_vendor_brackets(order.vendor_id)
         
         if not brackets:
             return
@@ -510,8 +625,8 @@ class OrderService:
         
         # Count checks
         for order_item in order_items:
-            # Get item
-            item = self.session.query(Item).get(order_item.item_id)
+            # Item is joined-loaded with the order item
+            item = order_item.item
             if not item:
                 continue
                 
@@ -688,44 +803,114 @@ class OrderService:
     
     def purge_accepted_orders(
         self,
-        age_days: int = 90
+        age_days: int = 90,
+        batch_size: int = BULK_CHUNK_SIZE
     ) -> Dict:
         """Purge old accepted orders.
         
+        Orders are purged and committed in batches so a failing batch does
+        not roll back the batches already processed.
+        
         Args:
             age_days: Age threshold in days
+            batch_size: Number of orders purged per transaction
             
         Returns:
             Dictionary with purge results
         """
         cutoff_date = date.today() - timedelta(days=age_days)
         
-        # Get orders older than cutoff date
-        old_orders = self.session.query(Order).filter(
+        # Only the IDs are needed - walk them in keyset pages so memory stays
+        # bounded, and apply the status change with one UPDATE per page
+        id_query = self.session.query(Order.id).filter(
             Order.status == 'ACCEPTED',
             Order.approval_date < cutoff_date
-        ).all()
+        ).order_by(Order.id)
         
         results = {
-            'total_orders': len(old_orders),
+            'total_orders': 0,
             'purged_orders': 0,
             'errors': 0
         }
         
-        for order in old_orders:
+        last_id = 0
+        
+        while True:
+            chunk = [
+                order_id for (order_id,) in
+                id_query.filter(Order.id > last_id).limit(batch_size)
+            ]
+            if not chunk:
+                break
+            
+            results['total_orders'] += len(chunk)
+            last_id = chunk[-1]
+            
             try:
-                # Mark as purged
-                order.status = 'PURGED'
-                results['purged_orders'] += 1
+                self.session.execute(
+                    update(Order)
+                    .where(Order.id.in_(chunk))
+                    .values(status='PURGED')
+                    .execution_options(synchronize_session=False)
+                )
+                self.session.commit()
+                results['purged_orders'] += len(chunk)
             except Exception as e:
-                logger.error(f"Error purging order {order.id}: {str(e)}")
+                self.session.rollback()
+                logger.error(f"Error purging orders {chunk[0]}-{chunk[-1]}: {str(e)}")
                 results['errors'] += 1
         
+        return results
+    
+    def update_order_delays(
+        self,
+        warehouse_id: Optional[str] = None
+    ) -> Dict:
+        """Recalculate the order delay of open, non-due orders.
+        
+        The delay is the number of days until the vendor's next order date and
+        is computed server-side with a single correlated UPDATE.
+        
+        Args:
+            warehouse_id: Optional warehouse ID filter
+            
+        Returns:
+            Dictionary with update results
+        """
+        delay_expr = (
+            self.session.query(
+                func.coalesce(
+                    func.greatest(Vendor.next_order_date - func.current_date(), 0),
+                    0
+                )
+            )
+            .filter(Vendor.id == Order.vendor_id)
+            .scalar_subquery()
+        )
+        
+        stmt = update(Order).where(
+            Order.status == 'OPEN',
+            Order.is_due.is_(False)
+        )
+        
+        if warehouse_id is not None:
+            stmt = stmt.where(Order.warehouse_id == warehouse_id)
+        
+        results = {
+            'updated_orders': 0,
+            'errors': 0
+        }
+        
         try:
+            result = self.session.execute(
+                stmt.values(order_delay=delay_expr)
+                .execution_options(synchronize_session=False)
+            )
             self.session.commit()
+            results['updated_orders'] = result.rowcount
         except Exception as e:
             self.session.rollback()
-            logger.error(f"Error committing purged orders: {str(e)}")
+            logger.error(f"Error updating order delays: {str(e)}")
             results['errors'] += 1
         
         return results
@@ -795,9 +980,7 @@ class OrderService:
             raise OrderError("Cannot modify an accepted order")
             
         # Get vendor brackets
-        brackets = self.session.query(VendorBracket).filter(
-            VendorBracket.vendor_id == order.vendor_id
-        ).order_by(VendorBracket.bracket_number).all()
+        brackets = self._get_vendor_brackets(order.vendor_id)
         
         # Find target bracket
         target = None
@@ -938,7 +1121,7 @@ class OrderService:
             raise OrderError(f"Item with ID {item_id} not found")
             
         # Get vendor for lead time
-        vendor = self.session.query(Vendor).get(item.vendor_id)
+        vendor = self._get_vendor(item.vendor_id)
         if not vendor:
             raise OrderError(f"Vendor with ID {item.vendor_id} not found")
             
@@ -999,7 +1182,7 @@ class OrderService:
         Returns:
             Dictionary with order generation results
         """
-        vendor = self.session.query(Vendor).get(vendor_id)
+        vendor = self._get_vendor(vendor_id)
         if not vendor:
             raise OrderError(f"Vendor with ID {vendor_id} not found")
             
@@ -1007,27 +1190,17 @@ class OrderService:
         if order_date is None:
             order_date = datetime.now()
             
-        # Get all active items for this vendor
+        # Get all active items for this vendor in a single indexed scan
+        buyer_classes = [BuyerClassCode.REGULAR]
+        if include_watch:
+            buyer_classes.append(BuyerClassCode.WATCH)
+        if include_manual:
+            buyer_classes.append(BuyerClassCode.MANUAL)
+            
         query = self.session.query(Item).filter(
             Item.vendor_id == vendor_id,
-            Item.buyer_class == BuyerClassCode.REGULAR
+            Item.buyer_class.in_(buyer_classes)
         )
-        
-        if include_watch:
-            query = query.union(
-                self.session.query(Item).filter(
-                    Item.vendor_id == vendor_id,
-                    Item.buyer_class == BuyerClassCode.WATCH
-                )
-            )
-            
-        if include_manual:
-            query = query.union(
-                self.session.query(Item).filter(
-                    Item.vendor_id == vendor_id,
-                    Item.buyer_class == BuyerClassCode.MANUAL
-                )
-            )
             
         items = query.all()
         
@@ -1075,17 +1248,11 @@ class OrderService:
             is_order_point=True
         )
         
-        # Add items to the order
-        for item_data in order_point_items:
-            item = item_data['item']
-            soq_units = item_data['soq_units']
-            
-            self.add_item_to_order(
-                order_id=order_id,
-                item_id=item.id,
-                soq_units=soq_units,
-                is_order_point=True
-            )
+        # Add items to the order in one batched insert
+        self.bulk_add_items_to_order(
+            order_id,
+            [dict(item_data, is_order_point=True) for item_data in order_point_items]
+        )
         
         return {
             'success': True,
@@ -1135,7 +1302,14 @@ class OrderService:
             (Vendor.deactivate_until < today)
         )
         
-        vendors = query.all()
+        vendor_ids = [v_id for v_id, in query.with_entities(Vendor.id)]
+        
+        # Load the vendors into the cache in batches so per-vendor order
+        # generation reuses them instead of fetching each one
+        vendors = [
+            vendor for vendor in self.preload_vendors(vendor_ids).values()
+            if vendor is not None
+        ]
         
         # Process results
         results = {
@@ -1183,7 +1357,7 @@ class OrderService:
         Returns:
             Next order date
         """
-        vendor = self.session.query(Vendor).get(vendor_id)
+        vendor = self._get_vendor(vendor_id)
         if not vendor:
             raise OrderError(f"Vendor with ID {vendor_id} not found")
             
@@ -1249,7 +1423,7 @@ class OrderService:
         Returns:
             Dictionary with analysis results
         """
-        vendor = self.session.query(Vendor).get(vendor_id)
+        vendor = self._get_vendor(vendor_id)
         if not vendor:
             raise OrderError(f"Vendor with ID {vendor_id} not found")
             
@@ -1261,12 +1435,17 @@ class OrderService:
             # Default to 90 days before end date
             start_date = end_date - timedelta(days=90)
             
-        # Get all orders for this vendor in the date range
-        orders = self.session.query(Order).filter(
-            Order.vendor_id == vendor_id,
-            Order.order_date >= start_date,
-            Order.order_date <= end_date
-        ).all()
+        # Get plain order rows for this vendor in the date range; only a few
+        # columns are needed so skip ORM hydration entirely
+        conn = self.session.connection()
+        orders = conn.exec_driver_sql(
+            'SELECT o.id, o.status, o.final_adj_amount, o.current_bracket, '
+            '(SELECT COUNT(*) FROM order_item oi WHERE oi.order_id = o.id) '
+            'FROM "order" o '
+            'WHERE o.vendor_id = %(vendor_id)s '
+            'AND o.order_date >= %(start_date)s AND o.order_date <= %(end_date)s',
+            {'vendor_id': vendor_id, 'start_date': start_date, 'end_date': end_date}
+        ).fetchall()
         
         # Process results
         results = {
@@ -1290,17 +1469,16 @@ class OrderService:
         total_items = 0
         bracket_counts = {}
         
-        for order in orders:
-            if order.status == 'ACCEPTED':
+        accepted_code = ORDER_STATUS_CODES[OrderStatus.ACCEPTED]
+        for order_id, status, final_adj_amount, bracket, item_count in orders:
+            if status == accepted_code:
                 results['accepted_orders'] += 1
-                total_amount += order.final_adj_amount
+                total_amount += float(final_adj_amount or 0.0)  # raw numeric arrives as Decimal
                 
                 # Count items
-                items = self.get_order_items(order.id)
-                total_items += len(items)
+                total_items += item_count
                 
                 # Track bracket distribution
-                bracket = order.current_bracket
                 if bracket not in bracket_counts:
                     bracket_counts[bracket] = 0
                     
@@ -1333,25 +1511,26 @@ class OrderService:
         Returns:
             Dictionary with optimization results
         """
-        vendor = self.session.query(Vendor).get(vendor_id)
+        vendor = self._get_vendor(vendor_id)
         if not vendor:
             raise OrderError(f"Vendor with ID {vendor_id} not found")
             
-        # Get active items for this vendor
-        items = self.session.query(Item).filter(
+        # Count the vendor's active items and total their annual demand value
+        # in one aggregate query instead of loading every item
+        item_count, total_demand_value = self.session.query(
+            func.count(Item.id),
+            func.coalesce(func.sum(Item.demand_yearly * Item.purchase_price), 0.0)
+        ).filter(
             Item.vendor_id == vendor_id,
             Item.buyer_class.in_([BuyerClassCode.REGULAR, BuyerClassCode.WATCH])
-        ).all()
+        ).one()
         
-        if not items:
+        if not item_count:
             return {
                 'success': False,
                 'message': 'No active items found for vendor',
                 'vendor_id': vendor_id
             }
-            
-        # Calculate total annual demand value
-        total_demand_value = sum(item.demand_yearly * item.purchase_price for item in items)
         
         # Get acquisition costs
         header_cost = vendor.header_cost or self.company_settings['order_header_cost']
@@ -1359,7 +1538,7 @@ class OrderService:
         
         # Calculate acquisition cost
         acquisition_cost = calculate_acquisition_cost(
-            header_cost, line_cost, len(items)
+            header_cost, line_cost, item_count
         )
         
         # Get carrying rate
@@ -1387,9 +1566,7 @@ class OrderService:
         current_cycle = vendor.order_cycle or 14  # Default to 14 days if not set
         
         # Calculate bracket impact
-        brackets = self.session.query(VendorBracket).filter(
-            VendorBracket.vendor_id == vendor_id
-        ).order_by(VendorBracket.bracket_number).all()
+        brackets = self._get_vendor_brackets(vendor_id)
         
         bracket_impact = {}
         if brackets:
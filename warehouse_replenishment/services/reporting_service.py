@@ -5,14 +5,14 @@ import logging
 import csv
 import io
 import json
-import statistics
+import math
 import sys
 import os
 from pathlib import Path
 
-
-from sqlalchemy import and_, func, or_, text, case, desc, asc
-from sqlalchemy.orm import Session
+import numpy as np
+from sqlalchemy import and_, func, or_, text, case, desc, asc, tuple_
+from sqlalchemy.orm import Session, joinedload
 
 from warehouse_replenishment.models import (
     Item, Order, OrderItem, Vendor, VendorBracket, Company, Warehouse,
@@ -20,7 +20,8 @@ from warehouse_replenishment.models import (
 )
 from warehouse_replenishment.exceptions import ReportingError
 from warehouse_replenishment.utils.date_utils import (
-    get_current_period, get_previous_period, get_period_dates
+    get_current_period, get_previous_period, get_next_period, get_period_dates,
+    get_period_for_date
 )
 from warehouse_replenishment.logging_setup import logger
 logger = logging.getLogger(__name__)
@@ -103,7 +104,7 @@ class ReportingService:
             query = query.filter(Item.buyer_class.in_(buyer_class))
         else:
             # Default to active items
-            query = query.filter(Item.buyer_class.in_(['R', 'W']))
+            query = query.filter(Item.buyer_class.in_([BuyerClassCode.REGULAR, BuyerClassCode.WATCH]))
             
         if system_class:
             query = query.filter(Item.system_class.in_(system_class))
@@ -128,13 +129,14 @@ class ReportingService:
             # Default sort
             query = query.order_by(Item.item_id)
         
-        # Execute query
-        results = query.all()
+        # Stream rows in chunks so Item instances are released as the report
+        # is built instead of materializing the whole item set at once
+        results = query.yield_per(1000)
         
         # Create report data
         report_data = []
         summary = {
-            'total_items': len(results),
+            'total_items': 0,
             'total_value': 0.0,
             'total_on_hand': 0.0,
             'total_on_order': 0.0,
@@ -193,6 +195,7 @@ class ReportingService:
             report_data.append(item_data)
             
             # Update summary
+            summary['total_items'] += 1
             summary['total_value'] += total_value
             summary['total_on_hand'] += item.on_hand
             summary['total_on_order'] += item.on_order
@@ -258,7 +261,9 @@ class ReportingService:
         
         for vendor in vendors:
             # Get accepted orders in date range
-            order_query = self.session.query(Order).filter(
+            order_query = self.session.query(Order).options(
+                joinedload(Order.order_items)
+            ).filter(
                 Order.vendor_id == vendor.id,
                 Order.status.in_(['ACCEPTED', 'RECEIVED']),
                 Order.approval_date >= from_date,
@@ -277,10 +282,8 @@ class ReportingService:
             
             # Get order details
             for order in orders:
-                # Get order items
-                order_items = self.session.query(OrderItem).filter(
-                    OrderItem.order_id == order.id
-                ).all()
+                # Order items are eager-loaded with the order
+                order_items = order.order_items
                 
                 total_lines += len(order_items)
                 
@@ -330,9 +333,9 @@ class ReportingService:
         # Calculate summary metrics
         summary = {
             'total_vendors': len(report_data),
-            'average_service_level': statistics.mean([v['service_level'] for v in report_data]) if report_data else 0,
-            'average_fill_rate': statistics.mean([v['fill_rate'] for v in report_data]) if report_data else 0,
-            'average_lead_time_adherence': statistics.mean([v['lead_time_adherence'] for v in report_data]) if report_data else 0,
+            'average_service_level': math.fsum(v['service_level'] for v in report_data) / len(report_data) if report_data else 0,
+            'average_fill_rate': math.fsum(v['fill_rate'] for v in report_data) / len(report_data) if report_data else 0,
+            'average_lead_time_adherence': math.fsum(v['lead_time_adherence'] for v in report_data) / len(report_data) if report_data else 0,
             'total_orders': sum(v['total_orders'] for v in report_data),
             'total_amount': sum(v['total_amount'] for v in report_data)
         }
@@ -386,7 +389,7 @@ class ReportingService:
             item_query = item_query.filter(Item.id == item_id)
         
         # Only include active items
-        item_query = item_query.filter(Item.buyer_class.in_(['R', 'W']))
+        item_query = item_query.filter(Item.buyer_class.in_([BuyerClassCode.REGULAR, BuyerClassCode.WATCH]))
         
         items = item_query.all()
         
@@ -394,76 +397,100 @@ class ReportingService:
         periodicity = self.company_settings['history_periodicity_default']
         current_period, current_year = get_current_period(periodicity)
         
+        # Work out the last n (year, period) pairs up front
+        period_keys = []
+        period = current_period
+        year = current_year
+        
+        for i in range(periods):
+            period_keys.append((year, period))
+            
+            # Move to previous period
+            period, year = get_previous_period(period, year, periodicity)
+        
+        # Fetch the whole window for all items in one query
+        history_by_item = {}
+        history_rows = self.session.query(
+            DemandHistory.item_id,
+            DemandHistory.period_number,
+            DemandHistory.period_year,
+            DemandHistory.total_demand
+        ).filter(
+            DemandHistory.item_id.in_(item_query.with_entities(Item.id).subquery()),
+            tuple_(DemandHistory.period_year, DemandHistory.period_number).in_(period_keys)
+        ).order_by(
+            # Each item's periods arrive oldest first, so no per-item sort is needed
+            DemandHistory.period_year,
+            DemandHistory.period_number
+        )
+        
+        # Actual demand per item, oldest first and left-aligned; NaN marks
+        # both missing demand and unused trailing slots
+        item_index = {item.id: i for i, item in enumerate(items)}
+        actuals = np.full((len(items), periods), np.nan)
+        filled = [0] * len(items)
+        
+        for row in history_rows:
+            i = item_index[row.item_id]
+            if row.total_demand is not None:
+                actuals[i, filled[i]] = row.total_demand
+            filled[i] += 1
+            
+            history_by_item.setdefault(row.item_id, []).append({
+                'period_number': row.period_number,
+                'period_year': row.period_year,
+                'actual_demand': row.total_demand,
+                'forecast': None,  # Placeholder for forecast
+                'error': None,     # Placeholder for error
+                'abs_error': None, # Placeholder for absolute error
+                'error_pct': None  # Placeholder for error percentage
+            })
+        
+        # Each period is "forecast" by the previous period's actual; in a real
+        # implementation, we would use stored forecasts
+        forecasts = actuals[:, :-1]
+        current = actuals[:, 1:]
+        valid = ~(np.isnan(forecasts) | np.isnan(current))
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            errors = current - forecasts
+            abs_errors = np.abs(errors)
+            error_pcts = np.where(current > 0, abs_errors / current * 100, 0.0)
+        
+        periods_with_data = valid.sum(axis=1)
+        total_abs_errors = np.where(valid, abs_errors, 0.0).sum(axis=1)
+        total_actuals = np.where(valid, current, 0.0).sum(axis=1)
+        
+        # Mean and Weighted Absolute Percentage Errors, 0 where undefined
+        mapes = np.zeros(len(items))
+        np.divide(
+            np.where(valid, error_pcts, 0.0).sum(axis=1), periods_with_data,
+            out=mapes, where=periods_with_data > 0
+        )
+        wapes = np.zeros(len(items))
+        np.divide(
+            total_abs_errors * 100, total_actuals,
+            out=wapes, where=total_actuals > 0
+        )
+        
         # Create report data
         report_data = []
         
-        for item in items:
-            # Get history for the last n periods
-            history_data = []
-            
-            period = current_period
-            year = current_year
-            
-            for i in range(periods):
-                # Get history record
-                history = self.session.query(DemandHistory).filter(
-                    DemandHistory.item_id == item.id,
-                    DemandHistory.period_number == period,
-                    DemandHistory.period_year == year
-                ).first()
-                
-                if history:
-                    history_data.append({
-                        'period_number': period,
-                        'period_year': year,
-                        'actual_demand': history.total_demand,
-                        'forecast': None,  # Placeholder for forecast
-                        'error': None,     # Placeholder for error
-                        'abs_error': None, # Placeholder for absolute error
-                        'error_pct': None  # Placeholder for error percentage
-                    })
-                
-                # Move to previous period
-                period, year = get_previous_period(period, year, periodicity)
-            
-            # Sort by period/year (oldest first)
-            history_data.sort(key=lambda x: (x['period_year'], x['period_number']))
-            
-            # Calculate forecast accuracy
-            total_abs_error = 0
-            total_actual = 0
-            periods_with_data = 0
-            
-            for i, period_data in enumerate(history_data):
-                if i > 0:  # Skip first period (no forecast available)
-                    # Get previous period's actual as "forecast" for current period
-                    # In a real implementation, we would use stored forecasts
-                    forecast = history_data[i-1]['actual_demand']
-                    actual = period_data['actual_demand']
-                    
-                    if actual is not None and forecast is not None:
-                        error = actual - forecast
-                        abs_error = abs(error)
-                        error_pct = (abs_error / actual) * 100 if actual > 0 else 0
-                        
-                        period_data['forecast'] = forecast
-                        period_data['error'] = error
-                        period_data['abs_error'] = abs_error
-                        period_data['error_pct'] = error_pct
-                        
-                        total_abs_error += abs_error
-                        total_actual += actual
-                        periods_with_data += 1
-            
-            # Calculate overall accuracy
-            mape = 0  # Mean Absolute Percentage Error
-            wape = 0  # Weighted Absolute Percentage Error
-            
-            if periods_with_data > 0:
-                mape = sum(p['error_pct'] for p in history_data if p['error_pct'] is not None) / periods_with_data
-                
-            if total_actual > 0:
-                wape = (total_abs_error / total_actual) * 100
+        for idx, item in enumerate(items):
+            # Get history for the last n periods (oldest first)
+            history_data = history_by_item.get(item.id, [])
+            
+            # Fill in per-period errors; the first period has no forecast
+            for j in np.flatnonzero(valid[idx]):
+                period_data = history_data[j + 1]
+                period_data['forecast'] = float(forecasts[idx, j])
+                period_data['error'] = float(errors[idx, j])
+                period_data['abs_error'] = float(abs_errors[idx, j])
+                period_data['error_pct'] = float(error_pcts[idx, j])
+            
+            periods_analyzed = int(periods_with_data[idx])
+            mape = float(mapes[idx])
+            wape = float(wapes[idx])
             
             # Create item data
             item_data = {
@@ -478,7 +505,7 @@ class ReportingService:
                 'current_track': item.track,
                 'mape': round(mape, 2) if mape is not None else None,
                 'wape': round(wape, 2) if wape is not None else None,
-                'periods_analyzed': periods_with_data,
+                'periods_analyzed': periods_analyzed,
                 'periods_data': history_data
             }
             
@@ -493,8 +520,8 @@ class ReportingService:
         summary = {
             'total_items': len(report_data),
             'items_with_data': len(items_with_data),
-            'average_mape': statistics.mean([i['mape'] for i in items_with_data]) if items_with_data else 0,
-            'average_wape': statistics.mean([i['wape'] for i in items_with_data]) if items_with_data else 0,
+            'average_mape': math.fsum(i['mape'] for i in items_with_data) / len(items_with_data) if items_with_data else 0,
+            'average_wape': math.fsum(i['wape'] for i in items_with_data) / len(items_with_data) if items_with_data else 0,
             'best_items': [
                 {'item_id': i['item_id'], 'wape': i['wape']} 
                 for i in sorted(items_with_data, key=lambda x: x['wape'])[:5]
@@ -556,33 +583,57 @@ class ReportingService:
             item_query = item_query.filter(Item.vendor_id == vendor_id)
         
         # Only include active items
-        item_query = item_query.filter(Item.buyer_class.in_(['R', 'W']))
-        
-        items = item_query.all()
+        item_query = item_query.filter(Item.buyer_class.in_([BuyerClassCode.REGULAR, BuyerClassCode.WATCH]))
+        
+        # Read just the columns the report uses and stream them in chunks
+        # instead of materializing full Item instances
+        items = item_query.with_entities(
+            Item.id,
+            Item.item_id,
+            Item.description,
+            Item.vendor_id,
+            Item.warehouse_id,
+            Item.buyer_class,
+            Item.system_class,
+            Item.service_level_goal,
+            Item.sstf,
+            Item.madp,
+            Item.lead_time_forecast,
+            Item.lead_time_variance
+        ).yield_per(1000)
+        
+        # Convert the date range into the (year, period) pairs it covers
+        periodicity = self.company_settings['history_periodicity_default']
+        period, year = get_period_for_date(from_date, periodicity)
+        last_period, last_year = get_period_for_date(to_date, periodicity)
+        
+        period_keys = []
+        while (year, period) <= (last_year, last_period):
+            period_keys.append((year, period))
+            period, year = get_next_period(period, year, periodicity)
+        
+        # Roll up history totals for all selected items in one grouped query
+        # instead of re-aggregating per item, restricted to the date range
+        # with a single row-value IN on the history key
+        item_ids = item_query.with_entities(Item.id).subquery()
+        history_totals = {
+            row.item_id: (row.total_shipped or 0, row.total_lost_sales or 0)
+            for row in self.session.query(
+                DemandHistory.item_id,
+                func.sum(DemandHistory.shipped).label("total_shipped"),
+                func.sum(DemandHistory.lost_sales).label("total_lost_sales")
+            ).filter(
+                DemandHistory.item_id.in_(item_ids),
+                tuple_(DemandHistory.period_year, DemandHistory.period_number).in_(period_keys)
+            ).group_by(DemandHistory.item_id)
+        }
         
         # Create report data
         report_data = []
         
         for item in items:
-            # Get history in date range
-            history_query = self.session.query(
-                func.sum(DemandHistory.shipped).label("total_shipped"),
-                func.sum(DemandHistory.lost_sales).label("total_lost_sales")
-            ).join(
-                Item, DemandHistory.item_id == Item.id
-            ).filter(
-                DemandHistory.item_id == item.id
-            )
-            
-            # Apply date range filters
-            # In a real implementation, we would convert dates to periods
-            # For this example, we'll skip date filtering
-            
-            history_result = history_query.first()
-            
             # Calculate service level
-            total_shipped = history_result.total_shipped or 0
-            total_lost_sales = history_result.total_lost_sales or 0
+            total_shipped, total_lost_sales = history_totals.get(item.id, (0, 0))
             total_demand = total_shipped + total_lost_sales
             
             service_level_attained = 0
@@ -624,7 +675,7 @@ class ReportingService:
         summary = {
             'total_items': len(report_data),
             'items_with_data': len(items_with_data),
-            'average_service_level': statistics.mean([i['service_level_attained'] for i in items_with_data]) if items_with_data else 0,
+            'average_service_level': math.fsum(i['service_level_attained'] for i in items_with_data) / len(items_with_data) if items_with_data else 0,
             'service_level_goal': self.company_settings['service_level_goal'],
             'items_below_goal': len([i for i in items_with_data if i['service_level_attained'] < i['service_level_goal']]),
             'items_at_or_above_goal': len([i for i in items_with_data if i['service_level_attained'] >= i['service_level_goal']]),
@@ -873,41 +924,26 @@ class ReportingService:
         # Calculate average order size
         avg_order_size = total_amount / total_orders if total_orders > 0 else 0
         
-        # Get order items data
-        order_items_data = {}
-        for order in orders:
-            # Get order items
-            order_items = self.session.query(OrderItem).filter(
-                OrderItem.order_id == order.id
-            ).all()
-            
-            for order_item in order_items:
-                item_id = order_item.item_id
-                if item_id not in order_items_data:
-                    order_items_data[item_id] = {
-                        'count': 0,
-                        'total_soq': 0.0
-                    }
-                
-                order_items_data[item_id]['count'] += 1
-                order_items_data[item_id]['total_soq'] += order_item.soq_units
-        
-        # Get top ordered items
-        top_items = []
-        for item_id, data in order_items_data.items():
-            item = self.session.query(Item).get(item_id)
-            if item:
-                top_items.append({
-                    'item_id': item.item_id,
-                    'description': item.description,
-                    'order_count': data['count'],
-                    'total_quantity': data['total_soq'],
-                    'average_quantity': data['total_soq'] / data['count'] if data['count'] > 0 else 0
-                })
-        
-        # Sort by order count (highest first)
-        top_items.sort(key=lambda x: x['order_count'], reverse=True)
-        top_items = top_items[:10]  # Keep only top 10
+        # Get top ordered items, counting and averaging order lines per item
+        # in the database rather than walking every order line in Python
+        order_count = func.count(OrderItem.id).label('order_count')
+        top_item_rows = self.session.query(
+            Item.item_id,
+            Item.description,
+            order_count,
+            func.coalesce(func.sum(OrderItem.soq_units), 0.0).label('total_quantity'),
+            func.coalesce(func.avg(OrderItem.soq_units), 0.0).label('average_quantity')
+        ).join(
+            Item, Item.id == OrderItem.item_id
+        ).filter(
+            OrderItem.order_id.in_(order_query.with_entities(Order.id).subquery())
+        ).group_by(
+            Item.id, Item.item_id, Item.description
+        ).order_by(
+            desc(order_count)  # Sort by order count (highest first)
+        ).limit(10)  # Keep only top 10
+        
+        top_items = [row._asdict() for row in top_item_rows]
         
         # Create report
         report = {
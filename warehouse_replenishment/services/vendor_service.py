@@ -13,6 +13,7 @@ from warehouse_replenishment.models import (
     Vendor, Item, Company, VendorBracket, SuperVendorMember, SubVendorItem
 )
 from warehouse_replenishment.exceptions import VendorError
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 class VendorService:
@@ -35,7 +36,7 @@ class VendorService:
         Returns:
             Vendor object or None if not found
         """
-        return self.session.query(Vendor).filter(Vendor.id == vendor_id).first()
+        return self.session.query(Vendor).get(vendor_id)
     
     def get_all_vendors(self) -> List[Vendor]:
         """Get all vendors.
@@ -65,4 +66,33 @@ class VendorService:
         Returns:
             List of vendor bracket objects
         """
-        return self.session.query(VendorBracket).filter(VendorBracket.vendor_id == vendor_id).all()
\ No newline at end of file
+        return self.session.query(VendorBracket).filter(VendorBracket.vendor_id == vendor_id).all()
+    
+    def get_super_vendor_members(self, super_vendor_id: int) -> List[Vendor]:
+        """Get all member vendors of a super vendor, including nested members.
+        
+        The membership tree is expanded with a single recursive CTE rather
+        than one query per level.
+        
+        Args:
+            super_vendor_id: Super vendor ID
+            
+        Returns:
+            List of member vendor objects
+        """
+        members = select(
+            SuperVendorMember.member_vendor_id.label('vendor_id')
+        ).where(
+            SuperVendorMember.super_vendor_id == super_vendor_id
+        ).cte('super_vendor_members', recursive=True)
+        
+        # UNION (not UNION ALL) stops the recursion on membership cycles
+        members = members.union(
+            select(SuperVendorMember.member_vendor_id).where(
+                SuperVendorMember.super_vendor_id == members.c.vendor_id
+            )
+        )
+        
+        return self.session.query(Vendor).filter(
+            Vendor.id.in_(select(members.c.vendor_id))
+        ).all()
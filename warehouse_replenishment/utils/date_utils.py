@@ -1,5 +1,6 @@
 # warehouse_replenishment/utils/date_utils.py
 from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Tuple, List, Dict, Optional, Union
 import calendar
 
@@ -12,7 +13,21 @@ def get_current_period(periodicity: int) -> Tuple[int, int]:
     Returns:
         Tuple with period number and year
     """
-    today = date.today()
+    # Keyed on today's date so the cached period rolls over at midnight
+    return _get_period_for_day(periodicity, date.today().toordinal())
+
+@lru_cache(maxsize=16)
+def _get_period_for_day(periodicity: int, day_ordinal: int) -> Tuple[int, int]:
+    """Get the current period number and year for a given day.
+    
+    Args:
+        periodicity: Periodicity (12=monthly, 13=4-weekly, 52=weekly)
+        day_ordinal: Proleptic Gregorian ordinal of the day
+        
+    Returns:
+        Tuple with period number and year
+    """
+    today = date.fromordinal(day_ordinal)
     year = today.year
     
     if periodicity == 12:  # Monthly
@@ -56,17 +71,9 @@ def get_previous_period(period: int, year: int, periodicity: int) -> Tuple[int,
     Returns:
         Tuple with previous period number and year
     """
-    if periodicity == 12:  # Monthly
-        if period == 1:
-            return (12, year - 1)
-        else:
-            return (period - 1, year)
-    
-    elif periodicity == 13:  # 4-weekly
-        if period == 1:
-            return (13, year - 1)
-        else:
-            return (period - 1, year)
+    if periodicity in (12, 13):  # Monthly or 4-weekly
+        # Fixed number of periods per year, so wrap with modular arithmetic
+        return ((period - 2) % periodicity + 1, year - (period == 1))
     
     elif periodicity == 52:  # Weekly
         if period == 1:
@@ -99,17 +106,9 @@ def get_next_period(period: int, year: int, periodicity: int) -> Tuple[int, int]
     Returns:
         Tuple with next period number and year
     """
-    if periodicity == 12:  # Monthly
-        if period == 12:
-            return (1, year + 1)
-        else:
-            return (period + 1, year)
-    
-    elif periodicity == 13:  # 4-weekly
-        if period == 13:
-            return (1, year + 1)
-        else:
-            return (period + 1, year)
+    if periodicity in (12, 13):  # Monthly or 4-weekly
+        # Fixed number of periods per year, so wrap with modular arithmetic
+        return (period % periodicity + 1, year + (period == periodicity))
     
     elif periodicity == 52:  # Weekly
         # Check if current year has 53 weeks
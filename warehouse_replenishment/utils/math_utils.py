@@ -38,26 +38,25 @@ def calculate_madp(forecast: float, history: List[float]) -> float:
     Returns:
         MADP value as percentage
     """
-    if not history:
+    if len(history) == 0:
         return 0.0
     
+    values = np.asarray(history, dtype=np.float64)
+    
     if forecast == 0:
         # Avoid division by zero
-        if all(h == 0 for h in history):
+        if not values.any():
             return 0.0
         else:
             return 100.0
     
-    # Calculate deviations
-    deviations = [abs(h - forecast) for h in history]
-    
     # Calculate mean absolute deviation
-    mad = sum(deviations) / len(deviations)
+    mad = np.abs(values - forecast).mean()
     
     # Calculate MADP
     madp = (mad / forecast) * 100.0
     
-    return madp
+    return float(madp)
 
 def calculate_track(forecast: float, history: List[float]) -> float:
     """Calculate tracking signal (track).
@@ -69,30 +68,29 @@ def calculate_track(forecast: float, history: List[float]) -> float:
     Returns:
         Track value as percentage
     """
-    if not history:
+    if len(history) == 0:
         return 0.0
     
+    values = np.asarray(history, dtype=np.float64)
+    
     if forecast == 0:
         # Avoid division by zero
-        if all(h == 0 for h in history):
+        if not values.any():
             return 0.0
         else:
             return 100.0
     
     # Calculate signed deviations
-    deviations = [(h - forecast) for h in history]
-    
-    # Calculate sum of deviations (can be positive or negative)
-    sum_deviations = sum(deviations)
+    deviations = values - forecast
     
-    # Calculate mean absolute deviation
-    mad = sum(abs(d) for d in deviations) / len(deviations)
+    # Sum of absolute deviations (n * mean absolute deviation)
+    sum_abs_deviations = np.abs(deviations).sum()
     
-    if mad == 0:
+    if sum_abs_deviations == 0:
         return 0.0
     
-    # Calculate track
-    track = abs(sum_deviations / (len(deviations) * mad)) * 100.0
+    # Calculate track from the sum of deviations (can be positive or negative)
+    track = abs(float(deviations.sum() / sum_abs_deviations)) * 100.0
     
     # Limit track to 100%
     return min(100.0, track)